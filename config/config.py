@@ -1,6 +1,7 @@
 """
 Configuration settings for the test automation framework
 """
+import json
 import os
 from typing import Dict, Any
 
@@ -18,16 +19,22 @@ class Config:
     # Test credentials
     ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
     ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
+    # Reuse each account's login (cookies and localStorage) within one pytest process
+    AUTH_CACHE = os.getenv("AUTH_CACHE", "false").lower() == "true"
     
     # Browser settings
     HEADLESS = os.getenv("HEADLESS", "false").lower() == "true"
     BROWSER = os.getenv("BROWSER", "chromium")  # chromium, firefox, webkit
+    # Comma-separated engines run side by side in one session, e.g. chromium,firefox,webkit
+    BROWSER_MATRIX = [name.strip() for name in os.getenv("BROWSER_MATRIX", "").split(",") if name.strip()]
     VIEWPORT_WIDTH = int(os.getenv("VIEWPORT_WIDTH", "1920"))
     VIEWPORT_HEIGHT = int(os.getenv("VIEWPORT_HEIGHT", "1080"))
     
     # Timeout settings (in milliseconds)
     DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "30000"))
     NAVIGATION_TIMEOUT = int(os.getenv("NAVIGATION_TIMEOUT", "30000"))
+    # Waits for the UI to react to an action (toasts, modals closing, redirects)
+    ACTION_TIMEOUT = int(os.getenv("ACTION_TIMEOUT", "10000"))
     
     # Screenshot settings
     SCREENSHOT_ON_FAILURE = os.getenv("SCREENSHOT_ON_FAILURE", "true").lower() == "true"
@@ -41,28 +48,261 @@ class Config:
     TRACE_ON = os.getenv("TRACE_ON", "false").lower() == "true"
     TRACE_DIR = os.getenv("TRACE_DIR", "traces")
     
+    # Reports
+    REPORT_DIR = os.getenv("REPORT_DIR", "reports")
+    RESULT_STREAM = os.getenv("RESULT_STREAM", "false").lower() == "true"
+    RESULT_STREAM_KEEP_RUNS = int(os.getenv("RESULT_STREAM_KEEP_RUNS", "20"))
+    
+    # Adaptive timeouts learned from past runs (off, observe, enforce)
+    ADAPTIVE_TIMEOUTS = os.getenv("ADAPTIVE_TIMEOUTS", "off").lower()
+    ADAPTIVE_TIMEOUT_HISTORY = os.getenv("ADAPTIVE_TIMEOUT_HISTORY", os.path.join(REPORT_DIR, "latency_history.json"))
+    ADAPTIVE_TIMEOUT_MARGIN = float(os.getenv("ADAPTIVE_TIMEOUT_MARGIN", "1.5"))
+    ADAPTIVE_TIMEOUT_PADDING_MS = float(os.getenv("ADAPTIVE_TIMEOUT_PADDING_MS", "500"))
+    ADAPTIVE_TIMEOUT_MIN_MS = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_MS", "1000"))
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))
+    ADAPTIVE_TIMEOUT_WINDOW = int(os.getenv("ADAPTIVE_TIMEOUT_WINDOW", "200"))
+    
+    # In-place flaky test retries ("marker=retries" pairs separated by ",", or @pytest.mark.flaky(retries=n))
+    # and the flakiness history that quarantines tests (off, last, exclude, only)
+    FLAKY_RETRY = os.getenv("FLAKY_RETRY", "false").lower() == "true"
+    FLAKY_RETRIES = {
+        marker.strip(): int(retries) for marker, retries in (
+            pair.split("=", 1) for pair in os.getenv("FLAKY_RETRIES", "").split(",") if "=" in pair
+        )
+    }
+    FLAKY_RETRY_EXCEPTIONS = [
+        name.strip() for name in os.getenv("FLAKY_RETRY_EXCEPTIONS", "TimeoutError").split(",") if name.strip()
+    ]
+    FLAKY_HISTORY = os.getenv("FLAKY_HISTORY", os.path.join(REPORT_DIR, "flaky_history.json"))
+    FLAKY_HISTORY_WINDOW = int(os.getenv("FLAKY_HISTORY_WINDOW", "50"))
+    FLAKY_QUARANTINE = os.getenv("FLAKY_QUARANTINE", "last").lower()
+    FLAKY_QUARANTINE_RATE = float(os.getenv("FLAKY_QUARANTINE_RATE", "0.2"))
+    FLAKY_QUARANTINE_MIN_RUNS = int(os.getenv("FLAKY_QUARANTINE_MIN_RUNS", "5"))
+    
+    # Run timeline export (Chrome trace-event format)
+    TRACE_EVENTS = os.getenv("TRACE_EVENTS", "false").lower() == "true"
+    TRACE_EVENTS_GAP_MS = float(os.getenv("TRACE_EVENTS_GAP_MS", "50"))
+    
+    # Fixture setup/teardown cost profiler
+    FIXTURE_PROFILE = os.getenv("FIXTURE_PROFILE", "false").lower() == "true"
+    FIXTURE_PROFILE_TOP = int(os.getenv("FIXTURE_PROFILE_TOP", "15"))
+    
+    # Application CPU/heap profiling through Chromium CDP around page-object flows
+    APP_PROFILE = os.getenv("APP_PROFILE", "false").lower() == "true"
+    APP_PROFILE_METHODS = [
+        name.strip() for name in os.getenv(
+            "APP_PROFILE_METHODS", "OrganizationsPage.create_admin_user,VisualizationPage.save_settings"
+        ).split(",") if name.strip()
+    ]
+    APP_PROFILE_DIR = os.getenv("APP_PROFILE_DIR", os.path.join(REPORT_DIR, "app_profiles"))
+    APP_PROFILE_TOP = int(os.getenv("APP_PROFILE_TOP", "10"))
+    APP_PROFILE_HEAP_SNAPSHOTS = os.getenv("APP_PROFILE_HEAP_SNAPSHOTS", "true").lower() == "true"
+    APP_PROFILE_SAMPLING_US = int(os.getenv("APP_PROFILE_SAMPLING_US", "100"))
+    
+    # Browser memory monitor and recycling (0 disables a threshold)
+    MEMORY_MONITOR = os.getenv("MEMORY_MONITOR", "false").lower() == "true"
+    MEMORY_MONITOR_TOP = int(os.getenv("MEMORY_MONITOR_TOP", "10"))
+    BROWSER_RECYCLE_TESTS = int(os.getenv("BROWSER_RECYCLE_TESTS", "0"))
+    BROWSER_RECYCLE_RSS_MB = float(os.getenv("BROWSER_RECYCLE_RSS_MB", "0"))
+    BROWSER_RECYCLE_JS_HEAP_MB = float(os.getenv("BROWSER_RECYCLE_JS_HEAP_MB", "0"))
+    
+    # Per-test network accounting, with request/byte budgets per marker (budget mode: off, warn, fail)
+    NETWORK_ACCOUNTING = os.getenv("NETWORK_ACCOUNTING", "false").lower() == "true"
+    NETWORK_ACCOUNTING_TOP = int(os.getenv("NETWORK_ACCOUNTING_TOP", "10"))
+    NETWORK_BUDGET_MODE = os.getenv("NETWORK_BUDGET_MODE", "warn").lower()
+    # JSON object of marker -> {"requests": n, "bytes": n}; the strictest limit among a test's markers applies
+    NETWORK_BUDGETS = json.loads(os.getenv("NETWORK_BUDGETS", json.dumps({
+        "smoke": {"requests": 150, "bytes": 10 * 1024 * 1024},
+        "admin": {"requests": 250, "bytes": 15 * 1024 * 1024},
+        "crud": {"requests": 300, "bytes": 20 * 1024 * 1024},
+    })))
+    
+    # UI event capture (utils/ui_events.py) on every context; page objects that read UI events
+    # install it on their context either way
+    UI_EVENTS = os.getenv("UI_EVENTS", "false").lower() == "true"
+    # JSON object of kind -> CSS selector whose elements are reported as they are shown, change
+    # text and hide; native form validation is always reported
+    UI_EVENT_SELECTORS = json.loads(os.getenv("UI_EVENT_SELECTORS", json.dumps({
+        "toast": ".toast, [data-testid='toast']",
+        "modal": ".modal, [role='dialog']",
+        "validation": ".invalid-feedback, .error-message, [role='alert']",
+    })))
+    
+    # Network condition profiles (NETWORK_PROFILE) applied to every context. CDP throttling
+    # (latency_ms, download_kbps, upload_kbps) is Chromium-only; other engines get latency_ms as a
+    # route delay. Route-level settings work on every engine: route_delay_ms (+ jitter_ms) per
+    # request, loss_rate of requests held for retransmit_ms, and offline bursts (offline_for_ms
+    # out of every offline_every_ms) that fail requests
+    NETWORK_PROFILE = os.getenv("NETWORK_PROFILE", "none")
+    NETWORK_PROFILE_SEED = int(os.getenv("NETWORK_PROFILE_SEED", "0"))
+    NETWORK_PROFILES = {
+        "none": {},
+        "3g": {"latency_ms": 150, "download_kbps": 1600, "upload_kbps": 750},
+        "slow-3g": {"latency_ms": 400, "download_kbps": 400, "upload_kbps": 400},
+        "high-latency": {"latency_ms": 600, "download_kbps": 10000, "upload_kbps": 5000},
+        "lossy": {"latency_ms": 80, "loss_rate": 0.05, "retransmit_ms": 1000},
+        "offline-bursts": {"latency_ms": 80, "offline_every_ms": 20000, "offline_for_ms": 1500},
+    }
+    
+    # Persistent browser server daemon (python -m utils.browser_server start)
+    BROWSER_SERVER = os.getenv("BROWSER_SERVER", "false").lower() == "true"
+    BROWSER_SERVER_DIR = os.getenv("BROWSER_SERVER_DIR", ".browser_servers")
+    BROWSER_SERVER_HEALTH_INTERVAL = float(os.getenv("BROWSER_SERVER_HEALTH_INTERVAL", "5"))
+    
+    # HAR record-and-replay (off, record, replay)
+    HAR_MODE = os.getenv("HAR_MODE", "off").lower()
+    HAR_DIR = os.getenv("HAR_DIR", "hars")
+    HAR_FALLBACK = os.getenv("HAR_FALLBACK", "abort").lower()  # network, abort, fail
+    HAR_MAX_AGE_DAYS = float(os.getenv("HAR_MAX_AGE_DAYS", "14"))
+    HAR_MATCH_BODY = os.getenv("HAR_MATCH_BODY", "true").lower() == "true"
+    # Regexes (separated by ";") whose matches are ignored when matching requests,
+    # by default utils.data_factory ids and timestamps in generated emails and names
+    # (testadmin-k3f9a-w0x2p-1f@, testadmin{ts}@) and ISO dates
+    HAR_IGNORE_PATTERNS = [
+        pattern for pattern in os.getenv(
+            "HAR_IGNORE_PATTERNS",
+            r"(?<=[-_])[0-9a-z]{5}-(?:m|w\d+)[0-9a-z]+-[0-9a-z]+\b;\d{9,}(?=@|%40);\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z?;(?<=[?&]_=)\d+"
+        ).split(";") if pattern
+    ]
+    
+    # Declared response stubs that never answered a request (fail, warn)
+    RESPONSE_STUBS_UNUSED = os.getenv("RESPONSE_STUBS_UNUSED", "fail").lower()
+    
+    # Warmed static asset cache served to every context through a route
+    ASSET_CACHE = os.getenv("ASSET_CACHE", "false").lower() == "true"
+    ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", ".asset_cache")
+    ASSET_CACHE_PREWARM_URLS = [
+        url.strip() for url in os.getenv("ASSET_CACHE_PREWARM_URLS", BASE_URL).split(",") if url.strip()
+    ]
+    ASSET_CACHE_MAX_AGE_HOURS = float(os.getenv("ASSET_CACHE_MAX_AGE_HOURS", "24"))
+    
+    # Journey checkpoints: the first test to reach a journey step saves it, later tests restore it
+    CHECKPOINTS = os.getenv("CHECKPOINTS", "false").lower() == "true"
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".checkpoints")
+    CHECKPOINT_MAX_AGE_MINUTES = float(os.getenv("CHECKPOINT_MAX_AGE_MINUTES", "30"))
+    
+    # Visual regression
+    VISUAL_BASELINE_DIR = os.getenv("VISUAL_BASELINE_DIR", "visual_baselines")
+    VISUAL_DIFF_DIR = os.getenv("VISUAL_DIFF_DIR", "visual_diffs")
+    VISUAL_UPDATE_BASELINES = os.getenv("VISUAL_UPDATE_BASELINES", "false").lower() == "true"
+    VISUAL_TILE_SIZE = int(os.getenv("VISUAL_TILE_SIZE", "64"))
+    VISUAL_COLOR_TOLERANCE = int(os.getenv("VISUAL_COLOR_TOLERANCE", "16"))
+    VISUAL_PIXEL_THRESHOLD = int(os.getenv("VISUAL_PIXEL_THRESHOLD", "4"))
+    VISUAL_PHASH_THRESHOLD = int(os.getenv("VISUAL_PHASH_THRESHOLD", "10"))
+    
+    # Staged pipeline (python -m utils.pipeline): "name:marker expression" stages separated by ";",
+    # each started only when every earlier stage passed; the first is the gate
+    PIPELINE_STAGES = [
+        tuple(part.strip() for part in stage.split(":", 1)) for stage in os.getenv(
+            "PIPELINE_STAGES", "smoke:smoke;regression:not smoke"
+        ).split(";") if stage.strip()
+    ]
+    PIPELINE_GATE_WORKERS = os.getenv("PIPELINE_GATE_WORKERS", "auto")
+    PIPELINE_WORKERS = os.getenv("PIPELINE_WORKERS", "")
+    PIPELINE_GATE_MAXFAIL = int(os.getenv("PIPELINE_GATE_MAXFAIL", "1"))
+    
+    # Circuit breaker: skip the remaining tests once this many tests in a row fail inside a
+    # shared dependency ("name=path" pairs separated by ","; a failure's traceback names the path)
+    CIRCUIT_BREAKER = os.getenv("CIRCUIT_BREAKER", "false").lower() == "true"
+    CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "3"))
+    CIRCUIT_BREAKER_DEPENDENCIES = dict(
+        pair.strip().split("=", 1) for pair in os.getenv(
+            "CIRCUIT_BREAKER_DEPENDENCIES", "login=pages/login_page.py"
+        ).split(",") if "=" in pair
+    )
+    
+    # Concurrency conflict tester (python -m utils.concurrency): contexts racing the same write
+    # per round, against the local stand-in by default
+    CONCURRENCY_BASE_URL = os.getenv("CONCURRENCY_BASE_URL", "http://localhost:3000")
+    CONCURRENCY_CONTEXTS = int(os.getenv("CONCURRENCY_CONTEXTS", "5"))
+    CONCURRENCY_ROUNDS = int(os.getenv("CONCURRENCY_ROUNDS", "3"))
+    
+    # Test data factory (utils/data_factory.py): users drawn per process from pools of this size
+    TEST_DATA_POOL_SIZE = int(os.getenv("TEST_DATA_POOL_SIZE", "200"))
+    TEST_DATA_EMAIL_DOMAIN = os.getenv("TEST_DATA_EMAIL_DOMAIN", "bodegaai.com")
+    
+    # Combinatorial test matrices (2 = pairwise, 3 = 3-wise, ...)
+    COMBINATORIAL_STRENGTH = int(os.getenv("COMBINATORIAL_STRENGTH", "2"))
+    
+    # Browser launch/context performance profiles (PERFORMANCE_PROFILE); settings a profile
+    # leaves out fall back to HEADLESS, RECORD_VIDEO and TRACE_ON above
+    PERFORMANCE_PROFILE = os.getenv("PERFORMANCE_PROFILE", "default")
+    PERFORMANCE_PROFILES = {
+        "default": {},
+        "ci-fast": {
+            "headless": True,
+            "slow_mo": 0,
+            "chromium_args": [
+                "--disable-background-timer-throttling",
+                "--disable-backgrounding-occluded-windows",
+                "--disable-renderer-backgrounding",
+                "--disable-gpu",
+                "--disable-extensions",
+                "--disable-dev-shm-usage",
+            ],
+            "reduced_motion": "reduce",
+            "record_video": False,
+            "trace": False,
+        },
+        "debug": {
+            "headless": False,
+            "slow_mo": 250,
+            "trace": True,
+        },
+    }
+    
     @classmethod
-    def get_browser_config(cls) -> Dict[str, Any]:
-        """Get browser configuration"""
-        return {
+    def get_profile(cls, name: str = None) -> Dict[str, Any]:
+        """Get a performance profile with every setting resolved"""
+        name = name or cls.PERFORMANCE_PROFILE
+        if name not in cls.PERFORMANCE_PROFILES:
+            raise ValueError(f"Unknown performance profile '{name}', expected one of {list(cls.PERFORMANCE_PROFILES)}")
+        profile = {
+            "name": name,
             "headless": cls.HEADLESS,
-            "viewport": {
-                "width": cls.VIEWPORT_WIDTH,
-                "height": cls.VIEWPORT_HEIGHT
-            },
-            "record_video_dir": cls.VIDEO_DIR if cls.RECORD_VIDEO else None,
+            "chromium_args": [],
+            "reduced_motion": None,
+            "record_video": cls.RECORD_VIDEO,
+            "trace": cls.TRACE_ON,
+        }
+        profile.update(cls.PERFORMANCE_PROFILES[name])
+        profile.setdefault("slow_mo", 0 if profile["headless"] else 100)
+        return profile
+    
+    @classmethod
+    def get_network_profile(cls, name: str = None) -> Dict[str, Any]:
+        """Get a network condition profile"""
+        name = name or cls.NETWORK_PROFILE
+        if name not in cls.NETWORK_PROFILES:
+            raise ValueError(f"Unknown network profile '{name}', expected one of {list(cls.NETWORK_PROFILES)}")
+        return dict(cls.NETWORK_PROFILES[name], name=name)
+    
+    @classmethod
+    def get_browser_config(cls, browser_name: str = None, profile: str = None) -> Dict[str, Any]:
+        """Get browser launch options for a browser under a performance profile"""
+        settings = cls.get_profile(profile)
+        options = {
+            "headless": settings["headless"],
+            "slow_mo": settings["slow_mo"],
         }
+        if (browser_name or cls.BROWSER) == "chromium" and settings["chromium_args"]:
+            options["args"] = settings["chromium_args"]
+        return options
     
     @classmethod
-    def get_context_config(cls) -> Dict[str, Any]:
-        """Get context configuration"""
-        return {
+    def get_context_config(cls, profile: str = None, video_dir: str = None) -> Dict[str, Any]:
+        """Get browser context options under a performance profile"""
+        settings = cls.get_profile(profile)
+        options = {
             "viewport": {
                 "width": cls.VIEWPORT_WIDTH,
                 "height": cls.VIEWPORT_HEIGHT
             },
-            "record_video_dir": cls.VIDEO_DIR if cls.RECORD_VIDEO else None,
+            "record_video_dir": (video_dir or cls.VIDEO_DIR) if settings["record_video"] else None,
         }
+        if settings["reduced_motion"]:
+            options["reduced_motion"] = settings["reduced_motion"]
+        return options
 
 
 class DevelopmentConfig(Config):
@@ -2,67 +2,291 @@
 Pytest configuration and fixtures
 """
 import pytest
-from playwright.sync_api import Browser, BrowserContext, Page, Playwright, sync_playwright
+from playwright.sync_api import Browser, BrowserContext, Error, Page, Playwright, sync_playwright
 from config.config import get_config
+from utils.adaptive_timeouts import get_adaptive_timeouts
+from utils.app_profiler import APP_PROFILE_PROPERTY, AppProfiler, get_safe_name
+from utils.asset_cache import AssetCache, AssetCacheRouter
+from utils.browser_memory import MEMORY_PROPERTY, BrowserManager
+from utils.browser_server import get_ws_endpoint
+from utils.checkpoints import CheckpointStore, JourneyRun
+from utils.data_factory import DataFactory, get_data_factory
+from utils.har_replay import HarMatcher, HarReplayer, HarReplayReport, get_har_path
+from utils.helpers import get_artifact_dir
 from utils.logger import get_default_logger
+from utils.network_accounting import NETWORK_PROPERTY, NetworkRecorder, check_budget, get_budget
+from utils.network_conditions import NetworkConditions
+from utils.response_stubs import StubRouter
+from utils.run_context import get_run_id
+from utils.ui_events import get_log as get_ui_event_log, install as install_ui_events
+from utils.watch import get_watch_session
 import os
 
 # Get configuration
 config = get_config()
 logger = get_default_logger()
 
+pytest_plugins = [
+    "plugins.browser_matrix",
+    "plugins.streaming_reporter",
+    "plugins.trace_export",
+    "plugins.fixture_profiler",
+    "plugins.memory_monitor",
+    "plugins.network_report",
+    "plugins.timeout_learning",
+    "plugins.app_profiling",
+    "plugins.sharding",
+    "plugins.circuit_breaker",
+    "plugins.flaky_retry",
+]
+
 
 @pytest.fixture(scope="session")
 def playwright_instance():
-    """Create a Playwright instance for the test session"""
+    """Create a Playwright instance for the test session, or reuse watch mode's long-lived one"""
+    watch_session = get_watch_session()
+    if watch_session is not None:
+        yield watch_session.playwright
+        return
     with sync_playwright() as p:
         yield p
 
 
+def launch_browser(playwright_instance: Playwright, browser_engine: str) -> Browser:
+    """Connect to a warm browser server when enabled, otherwise launch a browser"""
+    browser_type = getattr(playwright_instance, browser_engine)
+    launch_options = config.get_browser_config(browser_engine)
+    
+    # Reuse a warm browser server from the daemon when one is available
+    ws_endpoint = get_ws_endpoint(browser_engine, launch_options["headless"]) if config.BROWSER_SERVER else None
+    if ws_endpoint:
+        logger.info(f"Connecting to warm {browser_engine} server at {ws_endpoint}")
+        try:
+            return browser_type.connect(ws_endpoint, slow_mo=launch_options["slow_mo"])
+        except Error as e:
+            logger.warning(f"Could not connect to browser server, launching instead: {e}")
+    elif config.BROWSER_SERVER:
+        logger.warning(f"No healthy {browser_engine} server found, launching instead")
+    
+    logger.info(f"Launching {browser_engine} browser ({config.PERFORMANCE_PROFILE} profile)")
+    return browser_type.launch(**launch_options)
+
+
 @pytest.fixture(scope="session")
-def browser(playwright_instance: Playwright) -> Browser:
-    """Create a browser instance for the test session"""
-    logger.info(f"Launching {config.BROWSER} browser")
-    
-    browser_type = getattr(playwright_instance, config.BROWSER)
-    browser = browser_type.launch(
-        headless=config.HEADLESS,
-        slow_mo=100 if not config.HEADLESS else 0
-    )
-    yield browser
-    browser.close()
-    logger.info("Browser closed")
+def browser_manager(playwright_instance: Playwright, browser_engine: str) -> BrowserManager:
+    """Own the session's browser (one per engine in matrix mode), relaunching it past the recycle thresholds"""
+    def create_manager():
+        return BrowserManager(
+            lambda: launch_browser(playwright_instance, browser_engine),
+            browser_engine,
+            max_tests=config.BROWSER_RECYCLE_TESTS,
+            max_rss_mb=config.BROWSER_RECYCLE_RSS_MB,
+            max_js_heap_mb=config.BROWSER_RECYCLE_JS_HEAP_MB
+        )
+    
+    # Watch mode keeps the browser open between runs
+    watch_session = get_watch_session()
+    if watch_session is not None:
+        yield watch_session.get_browser_manager(browser_engine, create_manager)
+        return
+    
+    manager = create_manager()
+    yield manager
+    manager.close()
+    logger.info(f"{browser_engine} browser closed after {manager.launches} launch(es)")
+
+
+@pytest.fixture(scope="function")
+def browser(browser_manager: BrowserManager) -> Browser:
+    """Provide the session's browser, recycled between tests when a threshold is crossed"""
+    yield browser_manager.browser
+    browser_manager.after_test()
+
+
+@pytest.fixture(scope="session")
+def har_report():
+    """Collect HAR replay results and write the staleness report at the end of the session"""
+    report = HarReplayReport(config.HAR_DIR, config.HAR_MAX_AGE_DAYS)
+    yield report
+    report_path = report.write()
+    if report_path:
+        logger.info(f"HAR replay report saved: {report_path}")
+        for nodeid in report.tests:
+            if report.tests[nodeid]["stale"]:
+                logger.warning(f"Stale or missing HAR recording: {nodeid}")
+
+
+@pytest.fixture(scope="session")
+def asset_cache(browser_manager: BrowserManager) -> AssetCache:
+    """Provide the warmed static asset cache, prewarming it when empty or stale"""
+    cache = AssetCache(config.ASSET_CACHE_DIR)
+    if cache.is_stale(config.ASSET_CACHE_MAX_AGE_HOURS):
+        cache.prewarm(browser_manager.browser, config.ASSET_CACHE_PREWARM_URLS)
+    return cache
+
+
+@pytest.fixture(scope="function")
+def response_stubs(request) -> StubRouter:
+    """Provide the test's response stubs, declared with stub_response/stub_scenario markers or added at runtime"""
+    return StubRouter.from_markers(request.node)
+
+
+@pytest.fixture(scope="session")
+def data_factory() -> DataFactory:
+    """Provide collision-free emails and names and pooled users (see utils/data_factory.py)"""
+    return get_data_factory()
+
+
+@pytest.fixture(scope="session")
+def checkpoint_store() -> CheckpointStore:
+    """Provide the journey checkpoint store (restores and saves nothing unless CHECKPOINTS is on)"""
+    return CheckpointStore(config.CHECKPOINT_DIR, config.CHECKPOINT_MAX_AGE_MINUTES, enabled=config.CHECKPOINTS)
 
 
 @pytest.fixture(scope="function")
-def context(browser: Browser) -> BrowserContext:
+def journey(page: Page, checkpoint_store: CheckpointStore, request):
+    """Provide journey(definition), the test's progress through a journey; run_to(step) restores or replays the prefix"""
+    runs = {}
+    
+    def start(definition) -> JourneyRun:
+        if definition.name not in runs:
+            runs[definition.name] = JourneyRun(definition, page, checkpoint_store)
+        return runs[definition.name]
+    
+    yield start
+    
+    events = [dict(event, journey=name) for name, run in runs.items() for event in run.events]
+    if events:
+        request.node.user_properties.append(("checkpoints", events))
+
+
+@pytest.fixture(scope="function")
+def context(browser: Browser, browser_engine: str, request) -> BrowserContext:
     """Create a new browser context for each test"""
+    har_path = get_har_path(config.HAR_DIR, request.node.nodeid)
+    record_har = config.HAR_MODE == "record"
+    if record_har:
+        os.makedirs(config.HAR_DIR, exist_ok=True)
+    
     context = browser.new_context(
-        viewport={
-            "width": config.VIEWPORT_WIDTH,
-            "height": config.VIEWPORT_HEIGHT
-        },
-        record_video_dir=config.VIDEO_DIR if config.RECORD_VIDEO else None
+        **config.get_context_config(video_dir=get_artifact_dir(config.VIDEO_DIR, browser_engine)),
+        record_har_path=har_path if record_har else None,
+        record_har_content="embed" if record_har else None
     )
     
-    if config.TRACE_ON:
+    # Registered first so it runs last: only requests nothing else answers get the profile's delays
+    network_conditions = None
+    if config.NETWORK_PROFILE != "none":
+        network_conditions = NetworkConditions(config.get_network_profile(), browser_engine, config.NETWORK_PROFILE_SEED)
+        network_conditions.apply(context)
+    
+    replayer = None
+    if config.HAR_MODE == "replay":
+        matcher = HarMatcher(config.HAR_IGNORE_PATTERNS, match_body=config.HAR_MATCH_BODY)
+        replayer = HarReplayer(har_path, matcher, fallback=config.HAR_FALLBACK)
+        replay_report = request.getfixturevalue("har_report")
+        context.route("**/*", replayer.handle)
+    
+    # Registered last so it runs first; anything it doesn't serve falls through to HAR replay or the network
+    asset_router = None
+    if config.ASSET_CACHE:
+        # Replayed runs stay off the network, so cached ETags are not checked against the server
+        asset_router = AssetCacheRouter(request.getfixturevalue("asset_cache"), revalidate=config.HAR_MODE != "replay")
+        context.route("**/*", asset_router.handle)
+    
+    # Registered after HAR replay and the asset cache so declared stubs win over both
+    stub_router = None
+    if request.node.get_closest_marker("stub_response") or request.node.get_closest_marker("stub_scenario") \
+            or "response_stubs" in request.fixturenames:
+        stub_router = request.getfixturevalue("response_stubs")
+        context.route("**/*", stub_router.handle)
+    
+    network_recorder = NetworkRecorder(context) if config.NETWORK_ACCOUNTING else None
+    
+    # Toasts, modals and validation messages stream into a log that page objects assert against
+    if config.UI_EVENTS:
+        install_ui_events(context)
+    
+    trace_on = config.get_profile()["trace"]
+    if trace_on:
         context.tracing.start(screenshots=True, snapshots=True)
     
     yield context
     
-    if config.TRACE_ON:
-        os.makedirs(config.TRACE_DIR, exist_ok=True)
-        trace_file = os.path.join(config.TRACE_DIR, f"trace_{pytest.timestamp()}.zip")
+    if trace_on:
+        trace_dir = get_artifact_dir(config.TRACE_DIR, browser_engine)
+        os.makedirs(trace_dir, exist_ok=True)
+        trace_file = os.path.join(trace_dir, f"trace_{pytest.timestamp()}.zip")
         context.tracing.stop(path=trace_file)
+        request.node.user_properties.append(("trace", trace_file))
+    
+    network_summary = None
+    if network_recorder is not None:
+        network_summary = network_recorder.get_summary()
+        budget = get_budget((marker.name for marker in request.node.iter_markers()), config.NETWORK_BUDGETS)
+        network_summary["budget"] = budget
+        network_summary["budget_violations"] = check_budget(network_summary, budget)
+        request.node.user_properties.append((NETWORK_PROPERTY, network_summary))
     
     context.close()
+    
+    # Also set when a page object installed the capture during the test
+    ui_events = get_ui_event_log(context)
+    if ui_events is not None and ui_events.events:
+        request.node.user_properties.append(("ui_events", ui_events.get_summary()))
+    
+    if network_conditions is not None:
+        request.node.user_properties.append(("network_conditions", network_conditions.get_stats()))
+    
+    if asset_router is not None:
+        request.node.user_properties.append(("asset_cache", asset_router.get_stats()))
+    
+    # Fail once, after every check has reported, so one failure does not hide the others
+    failures = []
+    
+    if replayer is not None:
+        replay_report.add(request.node.nodeid, replayer)
+        if config.HAR_FALLBACK == "fail" and replayer.unmatched:
+            failures.append(f"{len(replayer.unmatched)} request(s) not found in {har_path}")
+    
+    if stub_router is not None:
+        request.node.user_properties.append(("response_stubs", stub_router.get_summary()))
+        unused = stub_router.get_unused()
+        if unused:
+            message = f"{len(unused)} response stub(s) never used: {'; '.join(stub.name for stub in unused)}"
+            if config.RESPONSE_STUBS_UNUSED == "fail":
+                failures.append(message)
+            else:
+                logger.warning(message)
+    
+    if network_summary is not None and network_summary["budget_violations"] and config.NETWORK_BUDGET_MODE != "off":
+        message = f"Network budget exceeded: {'; '.join(network_summary['budget_violations'])}"
+        if config.NETWORK_BUDGET_MODE == "fail":
+            failures.append(message)
+        else:
+            logger.warning(message)
+    
+    if failures:
+        pytest.fail("\n".join(failures), pytrace=False)
 
 
 @pytest.fixture(scope="function")
-def page(context: BrowserContext) -> Page:
+def page(context: BrowserContext, browser_engine: str, browser_manager: BrowserManager, request) -> Page:
     """Create a new page for each test"""
     page = context.new_page()
-    page.set_default_timeout(config.DEFAULT_TIMEOUT)
+    # Playwright calls without an explicit timeout still cannot outlive the test's learned budget
+    page.set_default_timeout(get_adaptive_timeouts().clamp_to_budget(config.DEFAULT_TIMEOUT))
+    
+    # CDP profiling is Chromium-only; other engines run the selected flows unprofiled
+    app_profiler = None
+    if config.APP_PROFILE and browser_engine == "chromium":
+        app_profiler = AppProfiler(
+            page,
+            os.path.join(config.APP_PROFILE_DIR, get_run_id(), get_safe_name(request.node.nodeid)),
+            top_n=config.APP_PROFILE_TOP,
+            heap_snapshots=config.APP_PROFILE_HEAP_SNAPSHOTS,
+            sampling_interval_us=config.APP_PROFILE_SAMPLING_US
+        )
     
     yield page
     
@@ -70,14 +294,27 @@ def page(context: BrowserContext) -> Page:
     if config.SCREENSHOT_ON_FAILURE:
         test_failed = hasattr(pytest, "test_failed") and pytest.test_failed
         if test_failed:
-            os.makedirs(config.SCREENSHOT_DIR, exist_ok=True)
+            screenshot_dir = get_artifact_dir(config.SCREENSHOT_DIR, browser_engine)
+            os.makedirs(screenshot_dir, exist_ok=True)
             screenshot_path = os.path.join(
-                config.SCREENSHOT_DIR,
+                screenshot_dir,
                 f"failure_{pytest.current_test_name()}_{pytest.timestamp()}.png"
             )
             page.screenshot(path=screenshot_path)
+            request.node.user_properties.append(("screenshot", screenshot_path))
             logger.error(f"Screenshot saved: {screenshot_path}")
     
+    if app_profiler is not None:
+        if app_profiler.flows:
+            request.node.user_properties.append((APP_PROFILE_PROPERTY, app_profiler.flows))
+        app_profiler.detach()
+    
+    # Samples also drive RSS / JS heap recycling, which works without the report
+    if config.MEMORY_MONITOR or browser_manager.has_memory_thresholds():
+        sample = browser_manager.sample(page)
+        if config.MEMORY_MONITOR:
+            request.node.user_properties.append((MEMORY_PROPERTY, sample))
+    
     page.close()
 
 
@@ -100,6 +337,21 @@ def base_url():
     return config.BASE_URL
 
 
+@pytest.fixture(scope="session")
+def visual_regression(browser_engine: str):
+    """Provide the visual regression engine, with baselines kept per browser"""
+    from utils.visual_regression import VisualRegressionEngine
+    return VisualRegressionEngine(
+        baseline_dir=os.path.join(config.VISUAL_BASELINE_DIR, browser_engine),
+        diff_dir=os.path.join(config.VISUAL_DIFF_DIR, browser_engine),
+        tile_size=config.VISUAL_TILE_SIZE,
+        color_tolerance=config.VISUAL_COLOR_TOLERANCE,
+        pixel_threshold=config.VISUAL_PIXEL_THRESHOLD,
+        phash_threshold=config.VISUAL_PHASH_THRESHOLD,
+        update_baselines=config.VISUAL_UPDATE_BASELINES
+    )
+
+
 @pytest.fixture(scope="session")
 def admin_credentials():
     """Provide admin credentials from config"""
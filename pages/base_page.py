@@ -3,6 +3,11 @@ Base Page class that all page objects will inherit from.
 Contains common methods and properties shared across all pages.
 """
 from playwright.sync_api import Page, expect
+from config.config import get_config
+from utils.adaptive_timeouts import get_adaptive_timeouts
+from utils.ui_events import UiEventLog, get_ui_events
+
+config = get_config()
 
 
 class BasePage:
@@ -11,6 +16,11 @@ class BasePage:
     def __init__(self, page: Page):
         self.page = page
     
+    @property
+    def ui_events(self) -> UiEventLog:
+        """Toasts, modals and validation messages pushed from the page (see utils/ui_events.py)"""
+        return get_ui_events(self.page)
+    
     def navigate_to(self, url: str):
         """Navigate to a specific URL"""
         self.page.goto(url)
@@ -19,9 +29,10 @@ class BasePage:
         """Get the page title"""
         return self.page.title()
     
-    def wait_for_element(self, selector: str, timeout: int = 30000):
-        """Wait for an element to be visible"""
-        self.page.wait_for_selector(selector, timeout=timeout)
+    def wait_for_element(self, selector: str, timeout: int = None, state: str = "visible"):
+        """Wait for an element to reach a state (visible by default), within its learned deadline"""
+        with get_adaptive_timeouts().measure(f"wait_for_{state}", selector, timeout or config.DEFAULT_TIMEOUT) as deadline:
+            self.page.wait_for_selector(selector, state=state, timeout=deadline)
     
     def click_element(self, selector: str):
         """Click on an element"""
@@ -39,6 +50,17 @@ class BasePage:
         """Check if an element is visible"""
         return self.page.is_visible(selector)
     
-    def wait_for_url(self, url: str, timeout: int = 30000):
-        """Wait for URL to match"""
-        self.page.wait_for_url(url, timeout=timeout)
+    def wait_for_url(self, url: str, timeout: int = None):
+        """Wait for URL to match, within its learned deadline"""
+        with get_adaptive_timeouts().measure("wait_for_url", url, timeout or config.NAVIGATION_TIMEOUT) as deadline:
+            self.page.wait_for_url(url, timeout=deadline)
+    
+    def expect_url(self, url: str, timeout: int = None):
+        """Assert the page URL, within its learned deadline"""
+        with get_adaptive_timeouts().measure("expect_url", url, timeout or config.NAVIGATION_TIMEOUT) as deadline:
+            expect(self.page).to_have_url(url, timeout=deadline)
+    
+    def expect_visible(self, selector: str, timeout: int = None):
+        """Assert an element is visible, within its learned deadline"""
+        with get_adaptive_timeouts().measure("expect_visible", selector, timeout or config.DEFAULT_TIMEOUT) as deadline:
+            expect(self.page.locator(selector)).to_be_visible(timeout=deadline)
@@ -0,0 +1,50 @@
+"""
+Page Object Journeys
+Shared test prefixes, defined as checkpointed steps over the page objects (see utils/checkpoints.py)
+"""
+from playwright.sync_api import Page
+from config.config import get_config
+from pages.login_page import LoginPage
+from pages.organizations_page import OrganizationsPage
+from utils.checkpoints import Journey, Step
+
+config = get_config()
+
+QA_AUTOMATION_EMAIL = "qa_automation@bodegaai.com"
+
+
+def log_in(page: Page):
+    """Log in as the QA automation account"""
+    login_page = LoginPage(page)
+    login_page.navigate_to(config.BASE_URL)
+    login_page.login_with_email_verification(QA_AUTOMATION_EMAIL)
+
+
+def verify_logged_in(page: Page):
+    """Verify the app kept the session (an expired one redirects to /login)"""
+    LoginPage(page).expect_url("**/stores", timeout=config.ACTION_TIMEOUT)
+
+
+def verify_organization_detail(page: Page):
+    """Verify an organization detail page is displayed"""
+    organizations_page = OrganizationsPage(page)
+    organizations_page.expect_url("**/organizations/*", timeout=config.ACTION_TIMEOUT)
+    organizations_page.expect_visible(organizations_page.ADD_USER_BUTTON, timeout=config.ACTION_TIMEOUT)
+
+
+def verify_add_user_modal(page: Page):
+    """Verify the Add User modal is open"""
+    organizations_page = OrganizationsPage(page)
+    organizations_page.expect_visible(organizations_page.ADD_ISO_USER_MODAL, timeout=config.ACTION_TIMEOUT)
+
+
+# Login -> /organizations -> first organization -> Add User modal
+ADMIN_USER_JOURNEY = Journey("admin_user", [
+    Step("logged_in", log_in, validate=verify_logged_in, sources=[LoginPage]),
+    Step("organization_detail", lambda page: OrganizationsPage(page).open_first_organization(),
+         validate=verify_organization_detail, sources=[OrganizationsPage]),
+    # A modal is not part of the URL, so a restore reopens it
+    Step("add_user_modal", lambda page: OrganizationsPage(page).open_add_user_modal(),
+         validate=verify_add_user_modal, sources=[OrganizationsPage],
+         reenter=lambda page: OrganizationsPage(page).open_add_user_modal()),
+])
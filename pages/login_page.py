@@ -3,8 +3,12 @@ Login Page Object
 Handles all interactions with the login page
 Supports both traditional username/password and ISO2 email/verification code flows
 """
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError, expect
+from config.config import get_config
 from pages.base_page import BasePage
+from utils.auth_cache import apply_storage_state, get_auth_state, invalidate_auth_state, set_auth_state
+
+config = get_config()
 
 
 class LoginPage(BasePage):
@@ -34,10 +38,39 @@ class LoginPage(BasePage):
         self.click_element(self.LOGIN_BUTTON)
     
     def login_with_email_verification(self, email: str, verification_code: str = "123456"):
-        """Perform ISO2 login with email and verification code"""
+        """Perform ISO2 login with email and verification code, reusing a cached session when AUTH_CACHE is on"""
+        if config.AUTH_CACHE and self.restore_session(email):
+            return
         self.enter_email(email)
         self.enter_verification_code(verification_code)
-        self.wait_for_url("**/stores", timeout=30000)
+        self.wait_for_url("**/stores")
+        if config.AUTH_CACHE:
+            set_auth_state(email, self.page.context.storage_state())
+    
+    def restore_session(self, email: str) -> bool:
+        """
+        Restore a cached login into this page's context
+        
+        Returns:
+            True if the app accepted the session, False if none was cached or it has expired
+        """
+        state = get_auth_state(email)
+        if state is None:
+            return False
+        if not self.page.url.startswith("http"):
+            self.navigate_to(config.BASE_URL)
+        start_url = self.page.url
+        apply_storage_state(self.page, state)
+        # A logged-in visit to the start page redirects to the stores page
+        self.page.goto(start_url)
+        try:
+            self.page.wait_for_url("**/stores", timeout=config.ACTION_TIMEOUT)
+        except PlaywrightTimeoutError:
+            invalidate_auth_state(email)
+            self.page.context.clear_cookies()
+            self.page.goto(start_url)
+            return False
+        return True
     
     def enter_email(self, email: str):
         """Enter email and proceed to verification page"""
@@ -4,12 +4,16 @@ Handles all interactions with the organizations and admin user management pages
 """
 from playwright.sync_api import Page, expect
 from pages.base_page import BasePage
+from config.config import get_config
+
+config = get_config()
 
 
 class OrganizationsPage(BasePage):
     """Organizations page object for admin user management"""
     
     ORGANIZATIONS_GRID = "#organizations-grid, table"
+    ORGANIZATION_ROWS = "table tbody tr"
     ORGANIZATION_TITLE = ".organization-title, h1"
     ADD_USER_BUTTON = 'button:has-text("Add")'
     USERS_GRID = "#organization-users-grid"
@@ -29,6 +33,7 @@ class OrganizationsPage(BasePage):
     
     def __init__(self, page: Page):
         super().__init__(page)
+        self.submitted_at = None
     
     def navigate_to_organizations(self):
         """Navigate to organizations page"""
@@ -38,6 +43,12 @@ class OrganizationsPage(BasePage):
         """Navigate to specific organization detail page"""
         self.navigate_to(f"/organizations/{organization_id}")
     
+    def open_first_organization(self):
+        """Open the first organization in the organizations grid"""
+        self.navigate_to_organizations()
+        self.page.locator(self.ORGANIZATION_ROWS).first.click()
+        self.page.wait_for_url("**/organizations/*")
+    
     def verify_organizations_page(self):
         """Verify organizations page is displayed"""
         expect(self.page.locator(self.ORGANIZATIONS_GRID)).to_be_visible()
@@ -75,7 +86,8 @@ class OrganizationsPage(BasePage):
                 checkbox.click()
     
     def submit_user_form(self):
-        """Submit the user form"""
+        """Submit the user form; toasts are looked up from this submit on"""
+        self.submitted_at = self.ui_events.mark()
         self.click_element(self.SUBMIT_BUTTON)
     
     def cancel_user_form(self):
@@ -88,11 +100,8 @@ class OrganizationsPage(BasePage):
         self.fill_user_form(user_data)
         self.submit_user_form()
         
-        toast = self.page.locator(self.TOAST_MESSAGE)
-        toast.wait_for(state="visible", timeout=10000)
-        
-        modal = self.page.locator(self.ADD_ISO_USER_MODAL)
-        modal.wait_for(state="hidden", timeout=10000)
+        self.wait_for_toast()
+        self.wait_for_element(self.ADD_ISO_USER_MODAL, timeout=config.ACTION_TIMEOUT, state="hidden")
     
     def verify_user_in_grid(self, email: str):
         """Verify user appears in the users grid"""
@@ -110,17 +119,17 @@ class OrganizationsPage(BasePage):
         expect(self.page.locator(self.SUBMIT_BUTTON)).to_be_visible()
         expect(self.page.locator(self.CANCEL_BUTTON)).to_be_visible()
     
+    def wait_for_toast(self, text: str = None, timeout: int = None) -> dict:
+        """Wait for a toast (containing text) shown since the last submit, even one already gone"""
+        return self.ui_events.wait_for(self.page, "toast", text=text, since=self.submitted_at, timeout=timeout)
+    
     def verify_success_toast(self):
         """Verify success toast message is displayed"""
-        toast = self.page.locator(self.TOAST_MESSAGE)
-        expect(toast).to_be_visible(timeout=10000)
-        expect(toast).to_contain_text("success")
+        self.wait_for_toast("success")
     
     def verify_error_toast(self, error_text: str):
         """Verify error toast message is displayed with specific text"""
-        toast = self.page.locator(self.TOAST_MESSAGE)
-        expect(toast).to_be_visible(timeout=10000)
-        expect(toast).to_contain_text(error_text)
+        self.wait_for_toast(error_text)
     
     def is_modal_visible(self) -> bool:
         """Check if Add User modal is visible"""
@@ -16,6 +16,15 @@ class PermissionsPage(BasePage):
     RESET_BUTTON = "button[data-action='reset']"
     SUCCESS_MESSAGE = ".success-message"
     
+    # Permissions that can be configured per user type
+    PERMISSION_CATALOG = [
+        "create_user",
+        "create_content",
+        "edit_content",
+        "delete_content",
+        "publish_content"
+    ]
+    
     def __init__(self, page: Page):
         super().__init__(page)
     
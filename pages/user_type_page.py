@@ -19,6 +19,10 @@ class UserTypePage(BasePage):
     EDIT_BUTTON = "button[data-action='edit']"
     USER_TYPE_TABLE = "table.user-types"
     SUCCESS_MESSAGE = ".success-message"
+    ERROR_MESSAGE = ".error-message"
+    
+    # User types available out of the box
+    USER_TYPES = ["Admin", "Manager", "Editor", "Viewer"]
     
     def __init__(self, page: Page):
         super().__init__(page)
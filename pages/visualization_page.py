@@ -16,6 +16,18 @@ class VisualizationPage(BasePage):
     SAVE_SETTINGS_BUTTON = "button[data-action='save-settings']"
     SUCCESS_MESSAGE = ".success-message"
     
+    # UI elements whose visibility can be configured per user type
+    VISIBILITY_CATALOG = [
+        "dashboard",
+        "reports",
+        "admin_panel",
+        "user_management",
+        "edit_button"
+    ]
+    
+    # Regions whose content changes between runs, masked in visual comparisons
+    DYNAMIC_REGIONS = [".toast", "[data-testid='toast']", "time", "[data-dynamic]"]
+    
     def __init__(self, page: Page):
         super().__init__(page)
     
@@ -61,3 +73,26 @@ class VisualizationPage(BasePage):
     def get_success_message(self) -> str:
         """Get success message text"""
         return self.get_text(self.SUCCESS_MESSAGE)
+    
+    def get_dynamic_regions(self) -> list:
+        """Get bounding boxes of dynamic regions to mask in screenshots"""
+        regions = []
+        for selector in self.DYNAMIC_REGIONS:
+            for element in self.page.locator(selector).all():
+                box = element.bounding_box()
+                if box:
+                    regions.append(box)
+        return regions
+    
+    def verify_visual_baseline(self, visual_regression, name: str):
+        """
+        Verify what the page renders matches its visual baseline
+        
+        Args:
+            visual_regression: VisualRegressionEngine used for the comparison
+            name: Baseline name
+        """
+        screenshot = self.page.screenshot(animations="disabled")
+        result = visual_regression.compare(name, screenshot, self.get_dynamic_regions())
+        assert result.passed, f"Visual regression in {name}: {result.reason} (diff: {result.diff_path})"
+        return result
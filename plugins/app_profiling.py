@@ -0,0 +1,64 @@
+"""
+Application profiling plugin
+When APP_PROFILE is enabled, the page-object methods listed in
+APP_PROFILE_METHODS are wrapped so that, on Chromium, each call records the
+app's CPU profile and heap snapshots (see utils/app_profiler.py). Flow
+summaries are attached to each test's result and the hottest functions per
+flow are printed at the end of the run
+"""
+import pytest
+
+from config.config import get_config
+from plugins.trace_export import get_page_object_classes
+from utils.app_profiler import APP_PROFILE_PROPERTY, get_summary_lines, profile_method
+
+app_config = get_config()
+
+
+def resolve_methods(specs):
+    """Resolve "Class.method" names to (class, method name) pairs among the page objects"""
+    classes = {cls.__name__: cls for cls in get_page_object_classes()}
+    resolved = []
+    for spec in specs:
+        class_name, _, method_name = spec.partition(".")
+        cls = classes.get(class_name)
+        if cls is None or not callable(getattr(cls, method_name, None)):
+            raise pytest.UsageError(f"APP_PROFILE_METHODS: no page-object method {spec}")
+        resolved.append((cls, method_name))
+    return resolved
+
+
+class AppProfileReport:
+    """Wraps the selected methods and reports flow summaries"""
+
+    def __init__(self, methods):
+        self.methods = methods
+        self.flows = []
+        for cls, name in methods:
+            setattr(cls, name, profile_method(getattr(cls, name)))
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "teardown":
+            return
+        for name, flows in report.user_properties:
+            if name == APP_PROFILE_PROPERTY:
+                self.flows.extend(dict(record, test=report.nodeid) for record in flows)
+
+    def pytest_unconfigure(self, config):
+        for cls, name in self.methods:
+            original = getattr(vars(cls).get(name), "__wrapped_original__", None)
+            if original is not None:
+                setattr(cls, name, original)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput") or not self.flows:
+            return
+        terminalreporter.write_sep("=", "app CPU profiles (hottest functions by self time)")
+        for line in get_summary_lines(self.flows):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Profiles and heap snapshots: {app_config.APP_PROFILE_DIR}")
+
+
+def pytest_configure(config):
+    if app_config.APP_PROFILE:
+        config.pluginmanager.register(AppProfileReport(resolve_methods(app_config.APP_PROFILE_METHODS)), "app_profile_report")
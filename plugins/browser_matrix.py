@@ -0,0 +1,154 @@
+"""
+Multi-browser matrix plugin
+Parametrizes every browser-based test by engine when BROWSER_MATRIX lists more
+than one engine, groups each engine's tests for concurrent execution with
+pytest-xdist (-n <engines> --dist loadgroup) and writes one merged report with
+a per-engine timing comparison
+"""
+import json
+import os
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+import pytest
+
+from config.config import get_config
+
+app_config = get_config()
+
+ENGINE_PROPERTY = "browser_engine"
+# The test without its engine parameter, to line up one test's results across engines
+MATRIX_TEST_PROPERTY = "matrix_test"
+
+
+def is_matrix_mode() -> bool:
+    """Whether tests are parametrized across several engines"""
+    return len(app_config.BROWSER_MATRIX) > 1
+
+
+@pytest.fixture(scope="session")
+def browser_engine(request) -> str:
+    """Browser engine for the current test: the matrix parameter or Config.BROWSER"""
+    return getattr(request, "param", app_config.BROWSER)
+
+
+def get_matrix_test_id(item) -> str:
+    """A test's id with the engine parameter left out (other parameters by value, or by index if not a scalar)"""
+    test_id = f"{item.parent.nodeid}::{item.originalname}"
+    params = []
+    for name, value in item.callspec.params.items():
+        if name == ENGINE_PROPERTY:
+            continue
+        is_scalar = isinstance(value, (str, int, float, bool, type(None)))
+        params.append(f"{name}={value}" if is_scalar else f"{name}#{item.callspec.indices[name]}")
+    return f"{test_id}[{'-'.join(params)}]" if params else test_id
+
+
+def pytest_configure(config):
+    # Registered here so --strict-markers accepts it with or without pytest-xdist installed
+    config.addinivalue_line("markers", "xdist_group(name): run tests of the same group on one xdist worker")
+
+
+def pytest_generate_tests(metafunc):
+    if is_matrix_mode() and ENGINE_PROPERTY in metafunc.fixturenames:
+        metafunc.parametrize(ENGINE_PROPERTY, app_config.BROWSER_MATRIX, indirect=True, scope="session")
+
+
+def pytest_collection_modifyitems(session, config, items):
+    if not is_matrix_mode():
+        return
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        engine = callspec.params.get(ENGINE_PROPERTY) if callspec else None
+        if engine:
+            # One group per engine lets --dist loadgroup run the engines side by side
+            item.add_marker(pytest.mark.xdist_group(name=engine))
+            item.user_properties.append((ENGINE_PROPERTY, engine))
+            item.user_properties.append((MATRIX_TEST_PROPERTY, get_matrix_test_id(item)))
+
+
+class MatrixReport:
+    """Collects per-engine results and timings"""
+
+    def __init__(self):
+        self.results = defaultdict(dict)
+
+    def add(self, report):
+        properties = dict(report.user_properties)
+        engine = properties.get(ENGINE_PROPERTY)
+        if not engine:
+            return
+        test_id = properties[MATRIX_TEST_PROPERTY]
+        result = self.results[engine].setdefault(test_id, {"outcome": "passed", "duration": 0.0})
+        result["duration"] += report.duration
+        if report.failed:
+            result["outcome"] = "failed" if report.when == "call" else "error"
+        elif report.skipped:
+            result["outcome"] = "skipped"
+
+    def get_engine_summary(self, engine: str) -> Dict:
+        """Summarize outcomes and timings for one engine"""
+        tests = self.results[engine]
+        durations = sorted(test["duration"] for test in tests.values())
+        outcomes = defaultdict(int)
+        for test in tests.values():
+            outcomes[test["outcome"]] += 1
+        return {
+            "tests": len(tests),
+            "outcomes": dict(outcomes),
+            "total_duration": round(sum(durations), 3),
+            "mean_duration": round(statistics.mean(durations), 3) if durations else 0.0,
+            "median_duration": round(statistics.median(durations), 3) if durations else 0.0,
+            "p95_duration": round(durations[int(0.95 * (len(durations) - 1))], 3) if durations else 0.0,
+        }
+
+    def get_comparison(self) -> List[Dict]:
+        """Per-test durations side by side, slowest spread first"""
+        test_ids = sorted({test_id for tests in self.results.values() for test_id in tests})
+        rows = []
+        for test_id in test_ids:
+            durations = {
+                engine: round(tests[test_id]["duration"], 3)
+                for engine, tests in self.results.items() if test_id in tests
+            }
+            spread = max(durations.values()) - min(durations.values())
+            rows.append({"test": test_id, "durations": durations, "spread": round(spread, 3)})
+        return sorted(rows, key=lambda row: row["spread"], reverse=True)
+
+    def write(self, report_dir: str) -> str:
+        """Write the merged matrix report"""
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = os.path.join(report_dir, "browser_matrix.json")
+        with open(report_path, "w") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "engines": {engine: self.get_engine_summary(engine) for engine in sorted(self.results)},
+                "comparison": self.get_comparison(),
+            }, f, indent=2)
+        return report_path
+
+
+_matrix_report = MatrixReport()
+
+
+def pytest_runtest_logreport(report):
+    # On the xdist controller this receives the reports of every worker
+    if is_matrix_mode():
+        _matrix_report.add(report)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not is_matrix_mode() or hasattr(config, "workerinput") or not _matrix_report.results:
+        return
+    report_path = _matrix_report.write(app_config.REPORT_DIR)
+    terminalreporter.write_sep("=", "browser matrix")
+    for engine in sorted(_matrix_report.results):
+        summary = _matrix_report.get_engine_summary(engine)
+        outcomes = ", ".join(f"{count} {outcome}" for outcome, count in sorted(summary["outcomes"].items()))
+        terminalreporter.write_line(
+            f"{engine:<10} {outcomes:<40} total {summary['total_duration']:>8.2f}s  "
+            f"median {summary['median_duration']:.2f}s  p95 {summary['p95_duration']:.2f}s"
+        )
+    terminalreporter.write_line(f"Merged report: {report_path}")
@@ -0,0 +1,111 @@
+"""
+Circuit breaker plugin
+When CIRCUIT_BREAKER is enabled, a test failing inside a shared dependency
+(a failure whose traceback passes through the dependency's code, e.g.
+pages/login_page.py for login) counts against that dependency, and any passing
+test resets the count. Once CIRCUIT_BREAKER_THRESHOLD tests in a row fail in
+the same dependency the circuit opens and every remaining test is skipped
+instead of running into its timeout. The state lives in one file per run, so
+xdist workers trip the breaker together
+"""
+import os
+from typing import Dict, List, Optional
+
+import pytest
+
+from config.config import get_config
+from utils.logger import get_default_logger
+from utils.result_stream import get_stream_root
+from utils.run_context import get_run_id
+
+app_config = get_config()
+logger = get_default_logger()
+
+PASSED = "passed"
+
+
+def get_failed_dependency(excinfo, dependencies: Dict[str, str]) -> Optional[str]:
+    """Name the dependency whose code a failure's traceback passes through, innermost first"""
+    for entry in reversed(excinfo.traceback):
+        path = str(entry.path).replace(os.sep, "/")
+        for name, fragment in dependencies.items():
+            if path.endswith(fragment):
+                return name
+    return None
+
+
+class CircuitBreaker:
+    """Counts consecutive dependency failures across the run's processes and opens the circuit"""
+
+    def __init__(self, state_path: str, dependencies: Dict[str, str], threshold: int):
+        self.state_path = state_path
+        self.dependencies = dependencies
+        self.threshold = threshold
+        self.open_reason = None
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    def _record(self, outcome: str):
+        # One short O_APPEND write per test keeps concurrent workers from interleaving lines
+        with open(self.state_path, "a") as f:
+            f.write(outcome + "\n")
+
+    def _read(self) -> List[str]:
+        try:
+            with open(self.state_path) as f:
+                return f.read().split()
+        except OSError:
+            return []
+
+    def check(self) -> Optional[str]:
+        """Get why the circuit is open, or None while it is closed"""
+        if self.open_reason:
+            return self.open_reason
+        outcomes = self._read()
+        trailing = []
+        for outcome in reversed(outcomes):
+            if outcome == PASSED:
+                break
+            trailing.append(outcome)
+        for name in self.dependencies:
+            count = trailing.count(name)
+            if count >= self.threshold:
+                self.open_reason = f"circuit breaker open: {count} tests in a row failed in {name}"
+                return self.open_reason
+        return None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        # Raised before fixtures are set up, so a skipped test costs nothing
+        reason = self.check()
+        if reason:
+            pytest.skip(reason)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.skipped:
+            return
+        if report.failed and call.excinfo is not None:
+            dependency = get_failed_dependency(call.excinfo, self.dependencies)
+            if dependency:
+                self._record(dependency)
+                if self.check():
+                    logger.error(f"{self.open_reason}; skipping the remaining tests")
+        elif report.when == "call" and report.passed:
+            self._record(PASSED)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput"):
+            return
+        reason = self.check()
+        if reason:
+            terminalreporter.write_sep("=", reason, red=True)
+
+
+def pytest_configure(config):
+    if app_config.CIRCUIT_BREAKER:
+        state_path = os.path.join(get_stream_root(), get_run_id(), "circuit_breaker.log")
+        config.pluginmanager.register(CircuitBreaker(
+            state_path, app_config.CIRCUIT_BREAKER_DEPENDENCIES, app_config.CIRCUIT_BREAKER_THRESHOLD
+        ), "circuit_breaker")
@@ -0,0 +1,174 @@
+"""
+Fixture cost profiler plugin
+When FIXTURE_PROFILE is enabled, times the setup and teardown of every fixture
+for every test. Timings travel with each test's teardown report (so they reach
+the xdist controller and the result stream) and are aggregated per fixture and
+per scope into REPORT_DIR/fixture_profile.json and a terminal summary
+"""
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+import pytest
+
+from config.config import get_config
+from utils.helpers import TeardownClock
+
+app_config = get_config()
+
+PROFILE_PROPERTY = "fixture_profile"
+
+
+def get_fixture_name(fixturedef) -> str:
+    """Name a fixture, qualified by where it is defined (e.g. each class's login setup)"""
+    if fixturedef.baseid not in ("", "."):
+        return f"{fixturedef.argname} ({fixturedef.baseid})"
+    return fixturedef.argname
+
+
+class FixtureStats:
+    """Aggregated cost of one fixture"""
+
+    def __init__(self, name: str, scope: str):
+        self.name = name
+        self.scope = scope
+        self.setup_count = 0
+        self.setup_total = 0.0
+        self.setup_max = 0.0
+        self.teardown_count = 0
+        self.teardown_total = 0.0
+        self.teardown_max = 0.0
+
+    def add(self, phase: str, seconds: float):
+        """Add one setup or teardown timing"""
+        if phase == "setup":
+            self.setup_count += 1
+            self.setup_total += seconds
+            self.setup_max = max(self.setup_max, seconds)
+        else:
+            self.teardown_count += 1
+            self.teardown_total += seconds
+            self.teardown_max = max(self.teardown_max, seconds)
+
+    @property
+    def total(self) -> float:
+        """Total cost attributable to the fixture"""
+        return self.setup_total + self.teardown_total
+
+    def to_dict(self) -> Dict:
+        """Serialize the stats, estimating what running the fixture once would save"""
+        runs = max(self.setup_count, 1)
+        mean_cost = self.total / runs
+        return {
+            "fixture": self.name,
+            "scope": self.scope,
+            "runs": self.setup_count,
+            "total": round(self.total, 4),
+            "setup_total": round(self.setup_total, 4),
+            "setup_mean": round(self.setup_total / runs, 4),
+            "setup_max": round(self.setup_max, 4),
+            "teardown_total": round(self.teardown_total, 4),
+            "teardown_mean": round(self.teardown_total / max(self.teardown_count, 1), 4),
+            "teardown_max": round(self.teardown_max, 4),
+            # Upper bound on savings from caching the fixture or widening its scope to session
+            "widen_scope_savings": round(self.total - mean_cost, 4) if self.scope != "session" else 0.0,
+        }
+
+
+class FixtureProfiler:
+    """Times fixtures in test processes and aggregates them where reports arrive"""
+
+    def __init__(self):
+        self._current = []
+        self._teardowns = TeardownClock(time.perf_counter)
+        self.fixtures = {}
+        self.tests = {}
+        self.report_path = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = time.perf_counter()
+        outcome = yield
+        self._current.append([get_fixture_name(fixturedef), fixturedef.scope, "setup", time.perf_counter() - start])
+        if outcome.excinfo is None:
+            self._teardowns.arm(fixturedef)
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        start = self._teardowns.pop_start(fixturedef)
+        if start is not None:
+            self._current.append([get_fixture_name(fixturedef), fixturedef.scope, "teardown", time.perf_counter() - start])
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when == "teardown":
+            # Fixtures set up or torn down around this test, including wider scopes it triggered
+            outcome.get_result().user_properties.append((PROFILE_PROPERTY, self._current))
+            self._current = []
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "teardown":
+            return
+        for name, timings in report.user_properties:
+            if name != PROFILE_PROPERTY:
+                continue
+            test_total = 0.0
+            for fixture, scope, phase, seconds in timings:
+                stats = self.fixtures.get(fixture)
+                if stats is None:
+                    stats = self.fixtures[fixture] = FixtureStats(fixture, scope)
+                stats.add(phase, seconds)
+                test_total += seconds
+            self.tests[report.nodeid] = test_total
+
+    def get_scope_totals(self) -> Dict[str, Dict]:
+        """Aggregate fixture cost per scope"""
+        totals = defaultdict(lambda: {"fixtures": 0, "runs": 0, "total": 0.0})
+        for stats in self.fixtures.values():
+            totals[stats.scope]["fixtures"] += 1
+            totals[stats.scope]["runs"] += stats.setup_count
+            totals[stats.scope]["total"] = round(totals[stats.scope]["total"] + stats.total, 4)
+        return dict(totals)
+
+    def get_ranked_fixtures(self) -> List[Dict]:
+        """Fixtures ordered by total cost"""
+        return sorted((stats.to_dict() for stats in self.fixtures.values()), key=lambda row: row["total"], reverse=True)
+
+    def write(self, report_dir: str) -> str:
+        """Write the fixture profile report"""
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = os.path.join(report_dir, "fixture_profile.json")
+        slowest_tests = sorted(self.tests.items(), key=lambda item: item[1], reverse=True)[:25]
+        with open(report_path, "w") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "scopes": self.get_scope_totals(),
+                "fixtures": self.get_ranked_fixtures(),
+                "tests_with_most_fixture_overhead": [
+                    {"test": nodeid, "fixture_seconds": round(seconds, 4)} for nodeid, seconds in slowest_tests
+                ],
+            }, f, indent=2)
+        return report_path
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput") or not self.fixtures:
+            return
+        self.report_path = self.write(app_config.REPORT_DIR)
+        terminalreporter.write_sep("=", "fixture cost profile")
+        terminalreporter.write_line(
+            f"{'fixture':<60} {'scope':<9} {'runs':>5} {'total s':>9} {'setup avg':>10} {'teardown avg':>13}"
+        )
+        for row in self.get_ranked_fixtures()[:app_config.FIXTURE_PROFILE_TOP]:
+            terminalreporter.write_line(
+                f"{row['fixture'][:60]:<60} {row['scope']:<9} {row['runs']:>5} {row['total']:>9.3f} "
+                f"{row['setup_mean']:>10.3f} {row['teardown_mean']:>13.3f}"
+            )
+        terminalreporter.write_line(f"Full profile: {self.report_path}")
+
+
+def pytest_configure(config):
+    if app_config.FIXTURE_PROFILE:
+        config.pluginmanager.register(FixtureProfiler(), "fixture_profiler")
@@ -0,0 +1,145 @@
+"""
+Flaky test retry plugin
+Retries a failed test body in place when the test has a retry policy, from
+@pytest.mark.flaky(retries=n) or its markers in FLAKY_RETRIES, and the failure
+is one of FLAKY_RETRY_EXCEPTIONS. Fixtures are not rebuilt: the page is reset
+to the URL and logged-in storage state it had when the body started. Outcomes
+go to the flakiness history (FLAKY_HISTORY), and tests whose flake rate
+reaches FLAKY_QUARANTINE_RATE are quarantined: run last, left out, or run on
+their own (--quarantine last|exclude|only). Enabled with FLAKY_RETRY
+"""
+import time
+
+import pytest
+
+from config.config import get_config
+from utils.logger import get_default_logger
+from utils.retry import FAILED, FLAKY, PASSED, FlakinessHistory, is_retryable, reset_page, take_page_snapshot
+
+app_config = get_config()
+logger = get_default_logger()
+
+RETRY_PROPERTY = "retries"
+QUARANTINE_PROPERTY = "quarantined"
+QUARANTINE_MODES = ("off", "last", "exclude", "only")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("flaky")
+    group.addoption("--quarantine", choices=QUARANTINE_MODES,
+                    help="Run quarantined flaky tests last, exclude them or run only them (default: FLAKY_QUARANTINE)")
+
+
+def get_retries(item) -> int:
+    """Retries allowed for a test: its flaky marker, else the most generous of its markers in FLAKY_RETRIES"""
+    marker = item.get_closest_marker("flaky")
+    if marker is not None:
+        return int(marker.kwargs.get("retries", marker.args[0] if marker.args else 1))
+    return max((app_config.FLAKY_RETRIES[mark.name] for mark in item.iter_markers()
+                if mark.name in app_config.FLAKY_RETRIES), default=0)
+
+
+def describe_error(error: BaseException) -> str:
+    """One-line description of a failure"""
+    message = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {message[0]}" if message else type(error).__name__
+
+
+class FlakyRetry:
+    """Retries test bodies in place and keeps the flakiness history"""
+
+    def __init__(self, history: FlakinessHistory, history_path: str):
+        self.history = history
+        self.history_path = history_path
+        self.quarantined = history.get_quarantined(app_config.FLAKY_QUARANTINE_MIN_RUNS, app_config.FLAKY_QUARANTINE_RATE)
+        self.flaky = {}
+        self.exhausted = {}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        mode = config.getoption("quarantine") or app_config.FLAKY_QUARANTINE
+        if mode == "off" or not self.quarantined:
+            return
+        quarantined = [item for item in items if item.nodeid in self.quarantined]
+        stable = [item for item in items if item.nodeid not in self.quarantined]
+        for item in quarantined:
+            item.user_properties.append((QUARANTINE_PROPERTY, self.quarantined[item.nodeid]))
+        if mode == "last":
+            items[:] = stable + quarantined
+            return
+        deselected = quarantined if mode == "exclude" else stable
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = stable if mode == "exclude" else quarantined
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_pyfunc_call(self, pyfuncitem):
+        retries = get_retries(pyfuncitem)
+        if not retries:
+            return None
+        page = pyfuncitem.funcargs.get("page")
+        snapshot = take_page_snapshot(page) if page is not None else None
+        testargs = {arg: pyfuncitem.funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames}
+        attempts = []
+        try:
+            for attempt in range(1, retries + 2):
+                start = time.perf_counter()
+                try:
+                    pyfuncitem.obj(**testargs)
+                    return True
+                except Exception as e:
+                    attempts.append({"attempt": attempt, "error": describe_error(e),
+                                     "duration": round(time.perf_counter() - start, 3)})
+                    if attempt > retries or not is_retryable(e, app_config.FLAKY_RETRY_EXCEPTIONS):
+                        raise
+                    logger.warning(f"Retrying {pyfuncitem.nodeid} in place ({attempt} of {retries} retries): "
+                                   f"{attempts[-1]['error']}")
+                    if snapshot is not None:
+                        reset_page(page, snapshot)
+        finally:
+            if attempts:
+                pyfuncitem.user_properties.append((RETRY_PROPERTY, attempts))
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "call" or report.skipped:
+            return
+        attempts = dict(report.user_properties).get(RETRY_PROPERTY)
+        if report.passed:
+            outcome = FLAKY if attempts else PASSED
+            if attempts:
+                self.flaky[report.nodeid] = attempts
+        else:
+            outcome = FAILED
+            if attempts and len(attempts) > 1:
+                self.exhausted[report.nodeid] = attempts
+        self.history.add(report.nodeid, outcome)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        if not hasattr(session.config, "workerinput") and not session.config.option.collectonly:
+            self.history.save(self.history_path)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput") or not (self.flaky or self.exhausted or self.quarantined):
+            return
+        terminalreporter.write_sep("=", "flaky tests")
+        for nodeid, attempts in self.flaky.items():
+            terminalreporter.write_line(f"passed on retry {len(attempts)}: {nodeid} ({attempts[0]['error'][:100]})")
+        for nodeid, attempts in self.exhausted.items():
+            terminalreporter.write_line(f"failed after {len(attempts) - 1} retries: {nodeid}")
+        for nodeid, rate in sorted(self.quarantined.items(), key=lambda row: row[1], reverse=True):
+            terminalreporter.write_line(f"quarantined ({rate:.0%} flaky): {nodeid}")
+        terminalreporter.write_line(f"Flakiness history: {self.history_path}")
+
+
+def pytest_report_teststatus(report, config):
+    # Mark tests that only passed after a retry, without changing their outcome
+    if report.when == "call" and report.passed and dict(report.user_properties).get(RETRY_PROPERTY):
+        return "flaky", "R", ("PASSED (flaky)", {"yellow": True})
+    return None
+
+
+def pytest_configure(config):
+    if app_config.FLAKY_RETRY:
+        history = FlakinessHistory.load(app_config.FLAKY_HISTORY, window=app_config.FLAKY_HISTORY_WINDOW)
+        config.pluginmanager.register(FlakyRetry(history, app_config.FLAKY_HISTORY), "flaky_retry")
@@ -0,0 +1,77 @@
+"""
+Browser memory report plugin
+When MEMORY_MONITOR is enabled the page fixture samples browser memory after
+every test and attaches it to the test's report. This plugin collects those
+samples (on the xdist controller or in a plain run) and lists the tests with
+the biggest memory growth in REPORT_DIR/memory_report.json and the terminal
+"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, List
+
+from config.config import get_config
+from utils.browser_memory import MEMORY_PROPERTY
+
+app_config = get_config()
+
+
+class MemoryReport:
+    """Collects per-test memory samples from reports"""
+
+    def __init__(self):
+        self.samples = {}
+        self.report_path = None
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "teardown":
+            return
+        for name, sample in report.user_properties:
+            if name == MEMORY_PROPERTY:
+                self.samples[report.nodeid] = sample
+
+    def get_growth_ranking(self) -> List[Dict]:
+        """Tests ordered by browser RSS growth, largest first"""
+        rows = [dict(sample, test=nodeid) for nodeid, sample in self.samples.items()
+                if sample.get("rss_growth_mb") is not None]
+        return sorted(rows, key=lambda row: row["rss_growth_mb"], reverse=True)
+
+    def get_js_heap_ranking(self) -> List[Dict]:
+        """Tests ordered by the JS heap their page held at the end of the test"""
+        rows = [dict(sample, test=nodeid) for nodeid, sample in self.samples.items()
+                if sample.get("js_heap_mb") is not None]
+        return sorted(rows, key=lambda row: row["js_heap_mb"], reverse=True)
+
+    def write(self, report_dir: str) -> str:
+        """Write the memory report"""
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = os.path.join(report_dir, "memory_report.json")
+        rss_values = [sample["rss_mb"] for sample in self.samples.values() if sample.get("rss_mb") is not None]
+        with open(report_path, "w") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "tests": len(self.samples),
+                "peak_rss_mb": max(rss_values) if rss_values else None,
+                "biggest_rss_growth": self.get_growth_ranking()[:25],
+                "largest_js_heap": self.get_js_heap_ranking()[:25],
+                "samples": self.samples,
+            }, f, indent=2)
+        return report_path
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput") or not self.samples:
+            return
+        self.report_path = self.write(app_config.REPORT_DIR)
+        terminalreporter.write_sep("=", "browser memory growth")
+        terminalreporter.write_line(f"{'test':<80} {'growth MB':>10} {'RSS MB':>9} {'JS heap MB':>11}")
+        for row in self.get_growth_ranking()[:app_config.MEMORY_MONITOR_TOP]:
+            js_heap = f"{row['js_heap_mb']:.1f}" if row.get("js_heap_mb") is not None else "-"
+            terminalreporter.write_line(
+                f"{row['test'][:80]:<80} {row['rss_growth_mb']:>10.1f} {row['rss_mb']:>9.1f} {js_heap:>11}"
+            )
+        terminalreporter.write_line(f"Full memory report: {self.report_path}")
+
+
+def pytest_configure(config):
+    if app_config.MEMORY_MONITOR:
+        config.pluginmanager.register(MemoryReport(), "memory_report")
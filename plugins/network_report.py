@@ -0,0 +1,82 @@
+"""
+Network accounting report plugin
+When NETWORK_ACCOUNTING is enabled the context fixture summarizes each test's
+traffic and checks it against the budgets of the test's markers. This plugin
+collects those summaries (on the xdist controller or in a plain run) and lists
+the heaviest tests and every budget violation in REPORT_DIR/network_report.json
+and the terminal
+"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, List
+
+from config.config import get_config
+from utils.network_accounting import MB, NETWORK_PROPERTY
+
+app_config = get_config()
+
+
+class NetworkReport:
+    """Collects per-test network summaries from reports"""
+
+    def __init__(self):
+        self.tests = {}
+        self.report_path = None
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "teardown":
+            return
+        for name, summary in report.user_properties:
+            if name == NETWORK_PROPERTY:
+                self.tests[report.nodeid] = summary
+
+    def get_heaviest(self) -> List[Dict]:
+        """Tests ordered by transferred bytes, largest first"""
+        rows = [dict(summary, test=nodeid) for nodeid, summary in self.tests.items()]
+        return sorted(rows, key=lambda row: row["bytes"], reverse=True)
+
+    def get_violations(self) -> Dict[str, List[str]]:
+        """Budget violations by test"""
+        return {nodeid: summary["budget_violations"] for nodeid, summary in self.tests.items()
+                if summary.get("budget_violations")}
+
+    def write(self, report_dir: str) -> str:
+        """Write the network report"""
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = os.path.join(report_dir, "network_report.json")
+        with open(report_path, "w") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "tests": len(self.tests),
+                "total_requests": sum(summary["requests"] for summary in self.tests.values()),
+                "total_bytes": sum(summary["bytes"] for summary in self.tests.values()),
+                "budgets": app_config.NETWORK_BUDGETS,
+                "budget_violations": self.get_violations(),
+                "heaviest": [{key: row[key] for key in ("test", "requests", "bytes", "duplicate_requests")}
+                             for row in self.get_heaviest()[:25]],
+                "samples": self.tests,
+            }, f, indent=2)
+        return report_path
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput") or not self.tests:
+            return
+        self.report_path = self.write(app_config.REPORT_DIR)
+        terminalreporter.write_sep("=", "network usage per test")
+        terminalreporter.write_line(f"{'test':<80} {'requests':>9} {'MB':>7} {'dupes':>6}")
+        for row in self.get_heaviest()[:app_config.NETWORK_ACCOUNTING_TOP]:
+            terminalreporter.write_line(
+                f"{row['test'][:80]:<80} {row['requests']:>9} {row['bytes'] / MB:>7.2f} {row['duplicate_requests']:>6}"
+            )
+        violations = self.get_violations()
+        if violations:
+            terminalreporter.write_sep("-", f"network budget violations ({app_config.NETWORK_BUDGET_MODE})")
+            for nodeid, messages in violations.items():
+                terminalreporter.write_line(f"{nodeid}: {'; '.join(messages)}")
+        terminalreporter.write_line(f"Full network report: {self.report_path}")
+
+
+def pytest_configure(config):
+    if app_config.NETWORK_ACCOUNTING:
+        config.pluginmanager.register(NetworkReport(), "network_report")
@@ -0,0 +1,48 @@
+"""
+Sharding plugin
+--shard-collect PATH writes the collected test ids and their markers for the
+shard planner; --shard-manifest PATH runs only the tests listed in a shard
+manifest written by python -m utils.sharding plan
+"""
+import json
+
+import pytest
+
+from utils.logger import get_default_logger
+
+logger = get_default_logger()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("sharding")
+    group.addoption("--shard-manifest", help="Run only the tests of this shard manifest")
+    group.addoption("--shard-collect", help="Write collected test ids and markers to this JSON file")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    manifest_path = config.getoption("shard_manifest")
+    if not manifest_path:
+        return
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    selected = set(manifest["tests"])
+    keep = [item for item in items if item.nodeid in selected]
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = keep
+    missing = selected - {item.nodeid for item in keep}
+    if missing and not hasattr(config, "workerinput"):
+        # Tests renamed or removed since the plan was made
+        logger.warning(f"{len(missing)} test(s) in {manifest_path} were not collected: {sorted(missing)[:5]}")
+
+
+def pytest_collection_finish(session):
+    output_path = session.config.getoption("shard_collect")
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump([
+                {"nodeid": item.nodeid, "markers": sorted({marker.name for marker in item.iter_markers()})}
+                for item in session.items
+            ], f)
@@ -0,0 +1,102 @@
+"""
+Streaming result reporter plugin
+Appends every finished test, with phase timings and artifact references from
+user_properties, to a per-worker JSON lines stream as soon as it completes.
+The process that owns the session (the xdist controller or a plain run) merges
+the worker streams when the session ends
+"""
+import os
+import shutil
+
+import pytest
+
+from config.config import get_config
+from utils.helpers import is_xdist_controller
+from utils.result_stream import STREAM_PREFIX, ResultStreamWriter, get_stream_root, list_runs, merge_run
+from utils.run_context import get_run_id, get_worker_id
+
+app_config = get_config()
+
+LONGREPR_LIMIT = 4000
+
+
+def prune_runs(keep: int):
+    """Remove all but the newest `keep` runs"""
+    runs = list_runs()
+    for run_dir in runs[:max(len(runs) - keep, 0)]:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+class StreamingReporter:
+    """Writes one result record per test as its teardown finishes"""
+
+    def __init__(self, run_id: str, worker: str, write_results: bool):
+        self.run_id = run_id
+        self.worker = worker
+        self.run_dir = os.path.join(get_stream_root(), run_id)
+        self.merged_path = None
+        self._pending = {}
+        self.writer = None
+        if write_results:
+            self.writer = ResultStreamWriter(os.path.join(self.run_dir, f"{STREAM_PREFIX}{worker}.jsonl"))
+            self.writer.write({"type": "session", "run_id": run_id, "worker": worker, "pid": os.getpid()})
+
+    def pytest_runtest_logreport(self, report):
+        if self.writer is None:
+            return
+        pending = self._pending.setdefault(report.nodeid, {
+            "start": report.start,
+            "phases": {},
+            "outcome": "passed",
+            "longrepr": None,
+        })
+        pending["phases"][report.when] = round(report.duration, 4)
+        if report.failed:
+            pending["outcome"] = "failed" if report.when == "call" else "error"
+            pending["longrepr"] = str(report.longrepr)[-LONGREPR_LIMIT:]
+        elif report.skipped and pending["outcome"] == "passed":
+            pending["outcome"] = "skipped"
+            longrepr = report.longrepr
+            pending["longrepr"] = str(longrepr[2] if isinstance(longrepr, tuple) else longrepr)
+
+        if report.when == "teardown":
+            self._pending.pop(report.nodeid)
+            self.writer.write({
+                "type": "result",
+                "run_id": self.run_id,
+                "worker": self.worker,
+                "nodeid": report.nodeid,
+                "outcome": pending["outcome"],
+                "start": pending["start"],
+                "stop": report.stop,
+                "duration": round(sum(pending["phases"].values()), 4),
+                "phases": pending["phases"],
+                "properties": [list(prop) for prop in report.user_properties],
+                "longrepr": pending["longrepr"],
+            })
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        if self.writer is not None:
+            self.writer.close()
+        if not hasattr(session.config, "workerinput") and os.path.isdir(self.run_dir):
+            self.merged_path = merge_run(self.run_dir)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.merged_path:
+            terminalreporter.write_line(f"Result stream: {self.merged_path}")
+
+
+def pytest_configure(config):
+    if not app_config.RESULT_STREAM or config.option.collectonly:
+        return
+    if not hasattr(config, "workerinput"):
+        prune_runs(max(app_config.RESULT_STREAM_KEEP_RUNS - 1, 0))
+    # Workers inherit the run id from the controller's environment,
+    # so they all write into the same run directory
+    reporter = StreamingReporter(
+        run_id=get_run_id(),
+        worker=get_worker_id(),
+        write_results=not is_xdist_controller(config),
+    )
+    config.pluginmanager.register(reporter, "streaming_reporter")
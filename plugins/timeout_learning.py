@@ -0,0 +1,91 @@
+"""
+Adaptive timeout learning plugin
+When ADAPTIVE_TIMEOUTS is observe or enforce, starts each test's time budget,
+attaches the test's wait latencies and anomalies to its teardown report, and
+folds them into the latency history (ADAPTIVE_TIMEOUT_HISTORY) where reports
+arrive, so the next run learns from this one
+"""
+import pytest
+
+from config.config import get_config
+from utils.adaptive_timeouts import AdaptiveTimeouts, LatencyHistory, configure_adaptive_timeouts
+
+app_config = get_config()
+
+TIMING_PROPERTY = "timing"
+
+
+class TimeoutLearner:
+    """Feeds test timings to the adaptive timeout manager and its history"""
+
+    def __init__(self, timeouts: AdaptiveTimeouts, history_path: str):
+        self.timeouts = timeouts
+        self.history_path = history_path
+        self.anomalies = {}
+        self._passed = {}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        self.timeouts.start_test(item.nodeid)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when == "teardown":
+            duration_ms = self.timeouts.finish_test(item.nodeid)
+            outcome.get_result().user_properties.append((TIMING_PROPERTY, {
+                "duration_ms": round(duration_ms, 1),
+                "budget_ms": self.timeouts.test_budget_ms,
+                "waits": self.timeouts.observations,
+                "anomalies": self.timeouts.anomalies,
+            }))
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == "call":
+            self._passed[report.nodeid] = report.passed
+            return
+        if report.when != "teardown":
+            return
+        for name, timing in report.user_properties:
+            if name != TIMING_PROPERTY:
+                continue
+            # Only successful waits and passing tests teach the history what normal looks like
+            for key, elapsed_ms in timing["waits"]:
+                self.timeouts.history.add_wait(key, elapsed_ms)
+            if self._passed.pop(report.nodeid, False):
+                self.timeouts.history.add_test(report.nodeid, timing["duration_ms"])
+            if timing["anomalies"]:
+                self.anomalies[report.nodeid] = timing["anomalies"]
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        if not hasattr(session.config, "workerinput"):
+            self.timeouts.history.save(self.history_path)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if hasattr(config, "workerinput") or not self.anomalies:
+            return
+        terminalreporter.write_sep("=", "performance anomalies (over learned deadline)")
+        for nodeid, anomalies in self.anomalies.items():
+            terminalreporter.write_line(nodeid)
+            for anomaly in anomalies:
+                status = "timed out" if anomaly["timed_out"] else "slow"
+                terminalreporter.write_line(
+                    f"  {anomaly['action']} {anomaly['selector']}: {anomaly['elapsed_ms']:.0f} ms "
+                    f"(deadline {anomaly['deadline_ms']:.0f} ms, {status})"
+                )
+
+
+def pytest_configure(config):
+    if app_config.ADAPTIVE_TIMEOUTS == "off":
+        return
+    history = LatencyHistory.load(app_config.ADAPTIVE_TIMEOUT_HISTORY, window=app_config.ADAPTIVE_TIMEOUT_WINDOW)
+    timeouts = configure_adaptive_timeouts(AdaptiveTimeouts(
+        app_config.ADAPTIVE_TIMEOUTS,
+        history,
+        margin=app_config.ADAPTIVE_TIMEOUT_MARGIN,
+        padding_ms=app_config.ADAPTIVE_TIMEOUT_PADDING_MS,
+        min_ms=app_config.ADAPTIVE_TIMEOUT_MIN_MS,
+        min_samples=app_config.ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ))
+    config.pluginmanager.register(TimeoutLearner(timeouts, app_config.ADAPTIVE_TIMEOUT_HISTORY), "timeout_learner")
@@ -0,0 +1,144 @@
+"""
+Run timeline export plugin
+When TRACE_EVENTS is enabled every pytest process records spans for tests and
+their phases, every fixture setup and teardown, every page-object method and
+every Playwright call. Idle gaps between top-level calls are drawn on their own
+track. Worker files are merged into REPORT_DIR/trace/<run>.json, which opens in
+Perfetto (ui.perfetto.dev) or chrome://tracing
+"""
+import glob
+import importlib
+import os
+import pkgutil
+
+import pytest
+
+import pages
+from config.config import get_config
+from pages.base_page import BasePage
+from utils.helpers import TeardownClock, is_xdist_controller
+from utils.run_context import get_run_id, get_worker_id
+from utils.trace_events import TraceRecorder, instrument_class, merge_trace_files, uninstrument_class
+
+app_config = get_config()
+
+
+def get_page_object_classes():
+    """Import every page module and return BasePage and all its subclasses"""
+    for module in pkgutil.iter_modules(pages.__path__):
+        importlib.import_module(f"pages.{module.name}")
+    classes = [BasePage]
+    pending = list(BasePage.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def get_playwright_classes():
+    """Get the sync API classes whose calls are traced"""
+    from playwright.sync_api import _generated
+    names = ["Browser", "BrowserContext", "Page", "Frame", "Locator", "FrameLocator",
+             "Keyboard", "Mouse", "PageAssertions", "LocatorAssertions"]
+    return [getattr(_generated, name) for name in names if hasattr(_generated, name)]
+
+
+class TraceMerger:
+    """Merges the worker trace files of a run once the session ends"""
+
+    def __init__(self, trace_dir: str):
+        self.trace_dir = trace_dir
+        self.merged_path = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        if not hasattr(session.config, "workerinput"):
+            worker_files = sorted(glob.glob(os.path.join(self.trace_dir, "*.trace.json")))
+            self.merged_path = merge_trace_files(worker_files, f"{self.trace_dir}.json")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.merged_path:
+            terminalreporter.write_line(f"Run timeline: {self.merged_path} (open in ui.perfetto.dev)")
+
+
+class TraceExporter(TraceMerger):
+    """Turns pytest and fixture activity into trace spans"""
+
+    def __init__(self, recorder: TraceRecorder, trace_dir: str):
+        super().__init__(trace_dir)
+        self.recorder = recorder
+        self._teardowns = TeardownClock(recorder.now)
+        self._instrumented = get_page_object_classes() + get_playwright_classes()
+        for cls in self._instrumented:
+            if issubclass(cls, BasePage):
+                instrument_class(cls, recorder, category="page_object", use_instance_class=True)
+            else:
+                instrument_class(cls, recorder)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        with self.recorder.span(item.nodeid, "test"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        with self.recorder.span("setup", "phase"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        with self.recorder.span("call", "phase"):
+            # Idle gaps only matter inside the test body, where the runner should be busy
+            self.recorder.start_gap_tracking()
+            try:
+                yield
+            finally:
+                self.recorder.stop_gap_tracking()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        with self.recorder.span("teardown", "phase"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = self.recorder.now()
+        outcome = yield
+        self.recorder.complete(
+            f"setup {fixturedef.argname}", "fixture", start, self.recorder.now(),
+            {"scope": fixturedef.scope, "test": request.node.nodeid},
+        )
+        if outcome.excinfo is None:
+            self._teardowns.arm(fixturedef)
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        start = self._teardowns.pop_start(fixturedef)
+        if start is not None:
+            self.recorder.complete(
+                f"teardown {fixturedef.argname}", "fixture", start, self.recorder.now(),
+                {"scope": fixturedef.scope},
+            )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        for cls in self._instrumented:
+            uninstrument_class(cls)
+        self.recorder.close()
+        super().pytest_sessionfinish(session)
+
+
+def pytest_configure(config):
+    if not app_config.TRACE_EVENTS:
+        return
+    trace_dir = os.path.join(app_config.REPORT_DIR, "trace", get_run_id())
+    if is_xdist_controller(config):
+        config.pluginmanager.register(TraceMerger(trace_dir), "trace_exporter")
+        return
+    worker = get_worker_id()
+    recorder = TraceRecorder(
+        os.path.join(trace_dir, f"{worker}.trace.json"),
+        process_name=f"pytest {worker}",
+        gap_threshold_ms=app_config.TRACE_EVENTS_GAP_MS,
+    )
+    config.pluginmanager.register(TraceExporter(recorder, trace_dir), "trace_exporter")
@@ -3,8 +3,8 @@ Admin User Management Tests
 Tests for ISO2 admin user creation, login, and logout functionality
 """
 import pytest
-import time
 from playwright.sync_api import Page, expect
+from pages.journeys import ADMIN_USER_JOURNEY
 from pages.login_page import LoginPage
 from pages.organizations_page import OrganizationsPage
 from config.config import get_config
@@ -29,7 +29,7 @@ class TestISO2Authentication:
         
         login_page.enter_verification_code('123456')
         
-        expect(page).to_have_url('**/stores', timeout=30000)
+        login_page.expect_url('**/stores')
 
     def test_maintain_session_after_refresh(self, page: Page, base_url: str):
         """Test that session is maintained after page refresh"""
@@ -43,6 +43,7 @@ class TestISO2Authentication:
         expect(page).not_to_have_url('**/login')
         expect(page).to_have_url('**/stores')
 
+    @pytest.mark.stub_scenario("invalid_verification_code")
     def test_invalid_verification_code(self, page: Page, base_url: str):
         """Test handling of invalid verification code"""
         login_page = LoginPage(page)
@@ -71,9 +72,10 @@ class TestLogoutFunctionality:
 
     def test_successful_logout(self, page: Page):
         """Test successful logout from the application"""
+        login_page = LoginPage(page)
         page.goto('/logout')
         
-        expect(page).to_have_url('**/login', timeout=10000)
+        login_page.expect_url('**/login', timeout=config.ACTION_TIMEOUT)
         expect(page.locator('h1:has-text("Welcome to Bodega Ai")')).to_be_visible()
 
     def test_session_cleared_after_logout(self, page: Page):
@@ -97,7 +99,7 @@ class TestLogoutFunctionality:
         
         login_page.enter_email('qa_automation@bodegaai.com')
         login_page.enter_verification_code('123456')
-        expect(page).to_have_url('**/stores', timeout=30000)
+        login_page.expect_url('**/stores')
 
 
 @pytest.mark.admin
@@ -105,47 +107,28 @@ class TestLogoutFunctionality:
 class TestAdminUserCreation:
     """Test cases for admin user creation"""
 
-    @pytest.fixture(autouse=True)
-    def setup(self, page: Page, base_url: str):
-        """Setup: Login before each test"""
-        login_page = LoginPage(page)
-        login_page.navigate_to(base_url)
-        login_page.login_with_email_verification('qa_automation@bodegaai.com')
-        yield
-
-    def test_display_add_user_modal_fields(self, page: Page):
+    def test_display_add_user_modal_fields(self, page: Page, journey):
         """Test that Add User modal displays all required fields"""
         organizations_page = OrganizationsPage(page)
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
-        
-        organizations_page.open_add_user_modal()
+        journey(ADMIN_USER_JOURNEY).run_to('add_user_modal')
         organizations_page.verify_add_user_modal_fields()
 
     @pytest.mark.smoke
-    def test_create_new_admin_user_successfully(self, page: Page):
+    def test_create_new_admin_user_successfully(self, page: Page, journey, data_factory):
         """Test successful creation of a new admin user"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
         
         test_user = {
             'first_name': 'Test',
             'last_name': 'Admin',
-            'email': f'testadmin{timestamp}@bodegaai.com',
+            'email': data_factory.email('testadmin'),
             'phone': '(555) 123-4567',
             'notifications_enabled': True,
             'is_owner': False
         }
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
+        journey(ADMIN_USER_JOURNEY).run_to('organization_detail')
         
         organizations_page.create_admin_user(test_user)
         organizations_page.verify_success_toast()
@@ -153,17 +136,11 @@ class TestAdminUserCreation:
         page.wait_for_load_state('networkidle')
         organizations_page.verify_user_in_grid(test_user['email'])
 
-    def test_validate_required_fields(self, page: Page):
+    def test_validate_required_fields(self, page: Page, journey):
         """Test validation of required fields when creating admin user"""
         organizations_page = OrganizationsPage(page)
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
-        
-        organizations_page.open_add_user_modal()
+        journey(ADMIN_USER_JOURNEY).run_to('add_user_modal')
         organizations_page.submit_user_form()
         
         assert organizations_page.is_modal_visible()
@@ -172,17 +149,11 @@ class TestAdminUserCreation:
         is_invalid = first_name_input.evaluate('el => !el.validity.valid')
         assert is_invalid
 
-    def test_validate_email_format(self, page: Page):
+    def test_validate_email_format(self, page: Page, journey):
         """Test email format validation when creating admin user"""
         organizations_page = OrganizationsPage(page)
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
-        
-        organizations_page.open_add_user_modal()
+        journey(ADMIN_USER_JOURNEY).run_to('add_user_modal')
         organizations_page.fill_input(organizations_page.FIRST_NAME_INPUT, 'Test')
         organizations_page.fill_input(organizations_page.LAST_NAME_INPUT, 'User')
         organizations_page.fill_input(organizations_page.EMAIL_INPUT, 'invalid-email')
@@ -194,76 +165,57 @@ class TestAdminUserCreation:
         is_invalid = email_input.evaluate('el => !el.validity.valid')
         assert is_invalid
 
-    def test_prevent_duplicate_email(self, page: Page):
-        """Test that duplicate email addresses are prevented"""
+    @pytest.mark.stub_scenario("duplicate_admin_email")
+    def test_prevent_duplicate_email(self, page: Page, journey, data_factory):
+        """Test that duplicate email addresses are prevented (the create-user POST is stubbed to 409)"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
         
         test_user = {
             'first_name': 'Duplicate',
             'last_name': 'Test',
-            'email': f'duplicate{timestamp}@bodegaai.com',
+            'email': data_factory.email('duplicate'),
             'phone': '(555) 999-8888',
             'notifications_enabled': True,
             'is_owner': False
         }
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
-        
-        organizations_page.create_admin_user(test_user)
-        page.wait_for_load_state('networkidle')
-        
-        organizations_page.open_add_user_modal()
+        journey(ADMIN_USER_JOURNEY).run_to('add_user_modal')
         organizations_page.fill_user_form(test_user)
         organizations_page.submit_user_form()
         
         organizations_page.verify_error_toast('already exists')
 
-    def test_create_user_with_minimal_fields(self, page: Page):
+    def test_create_user_with_minimal_fields(self, page: Page, journey, data_factory):
         """Test creating admin user with only required fields"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
         
         test_user = {
             'first_name': 'Minimal',
             'last_name': 'User',
-            'email': f'minimal{timestamp}@bodegaai.com'
+            'email': data_factory.email('minimal')
         }
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
+        journey(ADMIN_USER_JOURNEY).run_to('organization_detail')
         
         organizations_page.create_admin_user(test_user)
         
         page.wait_for_load_state('networkidle')
         organizations_page.verify_user_in_grid(test_user['email'])
 
-    def test_create_user_with_all_fields(self, page: Page):
+    def test_create_user_with_all_fields(self, page: Page, journey, data_factory):
         """Test creating admin user with all optional fields"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
         
         test_user = {
             'first_name': 'Complete',
             'last_name': 'User',
-            'email': f'complete{timestamp}@bodegaai.com',
+            'email': data_factory.email('complete'),
             'phone': '(555) 777-6666',
             'notifications_enabled': False,
             'is_owner': True
         }
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
+        journey(ADMIN_USER_JOURNEY).run_to('organization_detail')
         
         organizations_page.create_admin_user(test_user)
         
@@ -273,17 +225,11 @@ class TestAdminUserCreation:
         user_row = page.locator(f'{organizations_page.USERS_GRID} tr:has-text("{test_user["email"]}")')
         expect(user_row).to_contain_text('Complete User')
 
-    def test_cancel_user_creation(self, page: Page):
+    def test_cancel_user_creation(self, page: Page, journey):
         """Test canceling admin user creation"""
         organizations_page = OrganizationsPage(page)
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
-        
-        organizations_page.open_add_user_modal()
+        journey(ADMIN_USER_JOURNEY).run_to('add_user_modal')
         organizations_page.fill_input(organizations_page.FIRST_NAME_INPUT, 'Cancel')
         organizations_page.fill_input(organizations_page.LAST_NAME_INPUT, 'Test')
         organizations_page.fill_input(organizations_page.EMAIL_INPUT, 'cancel@test.com')
@@ -302,75 +248,44 @@ class TestAdminUserCreation:
 class TestAdminUserEdgeCases:
     """Test cases for admin user creation edge cases"""
 
-    @pytest.fixture(autouse=True)
-    def setup(self, page: Page, base_url: str):
-        """Setup: Login before each test"""
-        login_page = LoginPage(page)
-        login_page.navigate_to(base_url)
-        login_page.login_with_email_verification('qa_automation@bodegaai.com')
-        yield
-
-    def test_special_characters_in_names(self, page: Page):
+    def test_special_characters_in_names(self, page: Page, journey, data_factory):
         """Test handling of special characters in user names"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
-        
-        test_user = {
-            'first_name': "O'Brien",
-            'last_name': 'Smith-Jones',
-            'email': f'special{timestamp}@bodegaai.com'
-        }
         
-        organizations_page.navigate_to_organizations()
+        test_user = data_factory.user(edge_case='apostrophe', minimal=True)
         
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
+        journey(ADMIN_USER_JOURNEY).run_to('organization_detail')
         
         organizations_page.create_admin_user(test_user)
         
         page.wait_for_load_state('networkidle')
         organizations_page.verify_user_in_grid(test_user['email'])
 
-    def test_long_names(self, page: Page):
+    def test_long_names(self, page: Page, journey, data_factory):
         """Test handling of long names within limits"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
         
-        test_user = {
-            'first_name': 'VeryLongFirstNameThatIsStillValid',
-            'last_name': 'VeryLongLastNameThatIsStillValid',
-            'email': f'longname{timestamp}@bodegaai.com'
-        }
+        test_user = data_factory.user(edge_case='long', minimal=True)
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
+        journey(ADMIN_USER_JOURNEY).run_to('organization_detail')
         
         organizations_page.create_admin_user(test_user)
         
         page.wait_for_load_state('networkidle')
         organizations_page.verify_user_in_grid(test_user['email'])
 
-    def test_phone_number_formatting(self, page: Page):
+    def test_phone_number_formatting(self, page: Page, journey, data_factory):
         """Test that phone numbers are formatted correctly"""
         organizations_page = OrganizationsPage(page)
-        timestamp = int(time.time())
         
         test_user = {
             'first_name': 'Phone',
             'last_name': 'Test',
-            'email': f'phone{timestamp}@bodegaai.com',
+            'email': data_factory.email('phone'),
             'phone': '5551234567'
         }
         
-        organizations_page.navigate_to_organizations()
-        
-        first_org_row = page.locator('table tbody tr').first
-        first_org_row.click()
-        page.wait_for_url('**/organizations/*')
+        journey(ADMIN_USER_JOURNEY).run_to('organization_detail')
         
         organizations_page.create_admin_user(test_user)
         
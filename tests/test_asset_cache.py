@@ -0,0 +1,98 @@
+"""
+Test cases for the warmed asset cache
+"""
+import pytest
+
+from utils.asset_cache import AssetCache, AssetCacheRouter
+
+ASSET_URL = "https://app.example.com/static/main.js"
+
+
+class FakeRequest:
+    """A static asset request"""
+    
+    def __init__(self, url: str = ASSET_URL):
+        self.url = url
+        self.method = "GET"
+        self.resource_type = "script"
+        self.headers = {"accept": "*/*"}
+
+
+class FakeResponse:
+    """What route.fetch got from the server"""
+    
+    def __init__(self, status: int, body: bytes = b"", etag: str = None):
+        self.status = status
+        self.headers = {"content-type": "application/javascript", **({"etag": etag} if etag else {})}
+        self._body = body
+    
+    def body(self) -> bytes:
+        return self._body
+
+
+class FakeRoute:
+    """Records how the router answered, fetching from a canned server response"""
+    
+    def __init__(self, server_response: FakeResponse):
+        self.server_response = server_response
+        self.fetched_headers = []
+        self.fulfilled = None
+        self.fell_back = False
+    
+    def fetch(self, headers=None):
+        self.fetched_headers.append(headers)
+        return self.server_response
+    
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+    
+    def fallback(self):
+        self.fell_back = True
+
+
+@pytest.fixture
+def cache(tmp_path) -> AssetCache:
+    cache = AssetCache(str(tmp_path / "assets"))
+    cache.store(ASSET_URL, 200, {"etag": '"v1"', "content-type": "application/javascript"}, b"console.log(1)")
+    return cache
+
+
+@pytest.mark.unit
+class TestAssetCacheRevalidation:
+    """Cached assets are checked against the server's ETag on their first hit"""
+    
+    def test_not_modified_serves_cached_body(self, cache):
+        """Test that a 304 serves the cached body, and later hits skip the check"""
+        router = AssetCacheRouter(cache)
+        first, second = FakeRoute(FakeResponse(304)), FakeRoute(FakeResponse(304))
+        
+        router.handle(first, FakeRequest())
+        router.handle(second, FakeRequest())
+        
+        assert first.fetched_headers[0]["if-none-match"] == '"v1"'
+        assert first.fulfilled["body"] == b"console.log(1)"
+        assert second.fetched_headers == []
+        assert router.get_stats()["hits"] == 2
+    
+    def test_redeployed_asset_replaces_entry(self, cache):
+        """Test that a changed asset is served from the server and cached under its new ETag"""
+        router = AssetCacheRouter(cache)
+        redeployed = FakeResponse(200, b"console.log(2)", etag='"v2"')
+        route = FakeRoute(redeployed)
+        
+        router.handle(route, FakeRequest())
+        
+        assert route.fulfilled == {"response": redeployed}
+        assert cache.get(ASSET_URL)["etag"] == '"v2"'
+        assert cache.read_body(cache.get(ASSET_URL)) == b"console.log(2)"
+        assert router.get_stats()["refreshed"] == 1
+    
+    def test_revalidation_off(self, cache):
+        """Test that a router without revalidation serves the cached copy without asking the server"""
+        router = AssetCacheRouter(cache, revalidate=False)
+        route = FakeRoute(FakeResponse(200, b"console.log(2)"))
+        
+        router.handle(route, FakeRequest())
+        
+        assert route.fetched_headers == []
+        assert route.fulfilled["body"] == b"console.log(1)"
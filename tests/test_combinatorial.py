@@ -0,0 +1,78 @@
+"""
+Test cases for the covering-array generator
+"""
+import itertools
+
+import pytest
+
+from pages.permissions_page import PermissionsPage
+from pages.user_type_page import UserTypePage
+from utils.combinatorial import generate_configuration_cases, generate_covering_array, get_missing_interactions
+
+MIXED_PARAMETERS = {
+    "browser": ["chromium", "firefox", "webkit"],
+    "role": ["admin", "editor", "viewer", "guest"],
+    "locale": ["en", "es"],
+    "theme": ["light", "dark"],
+    "density": ["compact", "comfortable", "spacious"],
+}
+
+
+@pytest.mark.unit
+class TestCoveringArray:
+    """Covering arrays cover every t-way interaction with fewer rows than the full product"""
+    
+    @pytest.mark.parametrize("strength", [1, 2, 3])
+    def test_covers_every_interaction(self, strength):
+        """Test that no value combination of any `strength` parameters is missing"""
+        rows = generate_covering_array(MIXED_PARAMETERS, strength=strength)
+        
+        assert get_missing_interactions(rows, MIXED_PARAMETERS, strength=strength) == []
+    
+    def test_smaller_than_full_product(self):
+        """Test that a pairwise array is far smaller than the cartesian product"""
+        rows = generate_covering_array(MIXED_PARAMETERS, strength=2)
+        full_size = len(list(itertools.product(*MIXED_PARAMETERS.values())))
+        
+        # At least the two largest domains multiplied, well under the product
+        assert 12 <= len(rows) < full_size / 5
+    
+    def test_rows_use_declared_values(self):
+        """Test that every row assigns each parameter one of its values"""
+        for row in generate_covering_array(MIXED_PARAMETERS, strength=2):
+            assert set(row) == set(MIXED_PARAMETERS)
+            assert all(row[name] in values for name, values in MIXED_PARAMETERS.items())
+    
+    def test_same_seed_same_rows(self):
+        """Test that cases are reproducible across runs and workers"""
+        assert generate_covering_array(MIXED_PARAMETERS, seed=7) == generate_covering_array(MIXED_PARAMETERS, seed=7)
+    
+    def test_strength_at_least_parameter_count_is_full_product(self):
+        """Test that strength >= the number of parameters falls back to the cartesian product"""
+        parameters = {"a": [1, 2], "b": ["x", "y", "z"]}
+        
+        assert len(generate_covering_array(parameters, strength=2)) == 6
+    
+    def test_missing_interactions_reported(self):
+        """Test that an incomplete array reports what it misses"""
+        parameters = {"a": [1, 2], "b": [1, 2], "c": [1, 2]}
+        rows = [{"a": 1, "b": 1, "c": 1}, {"a": 2, "b": 2, "c": 2}]
+        
+        missing = get_missing_interactions(rows, parameters, strength=2)
+        
+        assert {"a": 1, "b": 2} in missing
+        assert len(missing) == 6
+    
+    def test_empty_parameter_rejected(self):
+        """Test that a parameter without values is an error"""
+        with pytest.raises(ValueError):
+            generate_covering_array({"a": [], "b": [1]})
+    
+    def test_permission_cases_cover_pairs(self):
+        """Test that the permission matrix covers every user type and permission pair"""
+        cases = generate_configuration_cases(UserTypePage.USER_TYPES, PermissionsPage.PERMISSION_CATALOG)
+        rows = [dict(case.values[1], user_type=case.values[0]) for case in cases]
+        parameters = {"user_type": list(UserTypePage.USER_TYPES)}
+        parameters.update({name: [True, False] for name in PermissionsPage.PERMISSION_CATALOG})
+        
+        assert get_missing_interactions(rows, parameters, strength=2) == []
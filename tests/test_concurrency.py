@@ -0,0 +1,32 @@
+"""
+Concurrency Conflict Tests
+Races the same admin user and user type writes from several contexts against the local stand-in
+"""
+import pytest
+from config.config import get_config
+from utils.concurrency import OPERATIONS, is_reachable, run_conflicts
+
+config = get_config()
+
+
+@pytest.mark.concurrency
+@pytest.mark.slow
+class TestConcurrentWrites:
+    """Test cases for simultaneous writes of the same record"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Skip when the local stand-in is not running"""
+        if not is_reachable(config.CONCURRENCY_BASE_URL):
+            pytest.skip(f"Local stand-in not reachable at {config.CONCURRENCY_BASE_URL}")
+
+    @pytest.mark.parametrize("operation", list(OPERATIONS))
+    def test_exactly_one_write_wins(self, operation: str, record_property):
+        """Test that only one of several simultaneous identical writes succeeds and the rest are told why"""
+        report = run_conflicts(operation, config.CONCURRENCY_CONTEXTS, config.CONCURRENCY_ROUNDS,
+                               config.CONCURRENCY_BASE_URL)
+        record_property("concurrency", {"latency": report["latency"],
+                                        "release_skew_ms": [result["release_skew_ms"] for result in report["rounds"]]})
+
+        assert not report["errors"], report["errors"]
+        assert not report["violations"], report["violations"]
@@ -0,0 +1,90 @@
+"""
+Test cases for the collision-free test data factory
+"""
+import re
+
+import pytest
+
+from utils.data_factory import EDGE_CASE_NAMES, DataFactory, get_namespace
+
+POOL_SIZE = 12
+
+
+@pytest.fixture
+def factory() -> DataFactory:
+    return DataFactory(get_namespace("run-1", "gw0", 4242), pool_size=POOL_SIZE, domain="example.com")
+
+
+@pytest.mark.unit
+class TestUniqueIds:
+    """Ids are unique within a process and namespaced across workers, processes and runs"""
+    
+    def test_unique_and_monotonic(self, factory):
+        """Test that ids from one factory never repeat and their counters increase"""
+        ids = [factory.unique_id() for _ in range(1000)]
+        
+        assert len(set(ids)) == len(ids)
+        counters = [int(unique_id.rsplit("-", 1)[1], 36) for unique_id in ids]
+        assert counters == sorted(counters)
+        assert all(unique_id.startswith(f"{factory.namespace}-") for unique_id in ids)
+    
+    def test_namespaces_distinct(self):
+        """Test that another worker, process or run gets another namespace"""
+        namespaces = {
+            get_namespace("run-1", "gw0", 4242),
+            get_namespace("run-1", "gw1", 4242),
+            get_namespace("run-1", "gw0", 4243),
+            get_namespace("run-2", "gw0", 4242),
+            get_namespace("run-1", "main", 4242),
+        }
+        
+        assert len(namespaces) == 5
+    
+    def test_same_counter_different_namespace(self):
+        """Test that two processes at the same point of their counters produce different emails"""
+        first = DataFactory(get_namespace("run-1", "gw0", 100), pool_size=1)
+        second = DataFactory(get_namespace("run-1", "gw1", 100), pool_size=1)
+        
+        assert first.email("admin") != second.email("admin")
+
+
+@pytest.mark.unit
+class TestUserPools:
+    """Users come from prebuilt pools that refill when drained"""
+    
+    def test_valid_pool_refills(self, factory):
+        """Test that drawing more than pool_size users refills the pool with fresh emails"""
+        users = [factory.user() for _ in range(POOL_SIZE + 3)]
+        
+        assert factory.get_pool_sizes()["valid"] == POOL_SIZE - 3
+        assert len({user["email"] for user in users}) == len(users)
+    
+    def test_edge_case_pool_refills(self, factory):
+        """Test that an edge-case pool refills after it is drained"""
+        per_case = max(POOL_SIZE // len(EDGE_CASE_NAMES), 1)
+        
+        users = [factory.user(edge_case="short") for _ in range(per_case + 1)]
+        
+        assert len(users) == per_case + 1
+        assert factory.get_pool_sizes()["short"] == per_case - 1
+    
+    def test_apostrophe_names_have_ascii_email(self, factory):
+        """Test that apostrophe names keep their spelling while the email local part is plain ASCII"""
+        user = factory.user(edge_case="apostrophe")
+        
+        assert (user["first_name"], user["last_name"]) == ("O'Brien", "Smith-Jones")
+        local_part = user["email"].split("@")[0]
+        assert local_part.startswith("obrien.smith-jones-")
+        assert re.fullmatch(r"[a-z0-9.-]+", local_part)
+    
+    def test_minimal_user_and_overrides(self, factory):
+        """Test that a minimal user keeps only the required fields and overrides apply"""
+        user = factory.user(minimal=True, last_name="Override")
+        
+        assert set(user) == {"first_name", "last_name", "email"}
+        assert user["last_name"] == "Override"
+    
+    def test_unknown_edge_case(self, factory):
+        """Test that an unknown edge case is refused"""
+        with pytest.raises(ValueError):
+            factory.user(edge_case="emoji")
@@ -0,0 +1,88 @@
+"""
+Test cases for per-test network accounting
+"""
+import pytest
+from playwright.sync_api import Error
+
+from utils.network_accounting import NetworkRecorder, check_budget, get_endpoint
+
+SIZES = {"requestHeadersSize": 300, "requestBodySize": 0, "responseHeadersSize": 200, "responseBodySize": 1500}
+
+
+class FakeContext:
+    """Holds the handlers NetworkRecorder registers, for the test to emit events"""
+    
+    def __init__(self):
+        self.handlers = {}
+    
+    def on(self, event: str, handler):
+        self.handlers[event] = handler
+
+
+class FakeRequest:
+    """A finished request whose sizes are gone once its page is closed, as with the Playwright driver"""
+    
+    def __init__(self, url: str, method: str = "GET", resource_type: str = "fetch", duration: float = 40.0):
+        self.url = url
+        self.method = method
+        self.resource_type = resource_type
+        self.timing = {"responseEnd": duration}
+        self.disposed = False
+    
+    def sizes(self):
+        if self.disposed:
+            raise Error("Target page, context or browser has been closed")
+        return dict(SIZES)
+
+
+@pytest.mark.unit
+class TestNetworkRecorder:
+    """NetworkRecorder summaries built after the page has closed"""
+    
+    def test_bytes_survive_page_close(self):
+        """Test that transfer sizes are kept although the requests are disposed before the summary"""
+        context = FakeContext()
+        recorder = NetworkRecorder(context)
+        requests = [FakeRequest(f"https://app.example.com/api/users/{index}") for index in range(3)]
+        for request in requests:
+            context.handlers["requestfinished"](request)
+        for request in requests:
+            request.disposed = True
+        
+        summary = recorder.get_summary()
+        
+        assert summary["bytes"] == 3 * sum(SIZES.values())
+        assert summary["requests"] == 3
+        assert summary["slowest_endpoints"][0]["endpoint"] == "GET app.example.com/api/users/{id}"
+    
+    def test_byte_budget_fires(self):
+        """Test that a byte budget is enforced from the recorded sizes"""
+        context = FakeContext()
+        recorder = NetworkRecorder(context)
+        context.handlers["requestfinished"](FakeRequest("https://app.example.com/app.js", resource_type="script"))
+        
+        violations = check_budget(recorder.get_summary(), {"bytes": 1000})
+        
+        assert len(violations) == 1
+        assert "MB over the budget" in violations[0]
+    
+    def test_duplicates_and_failures(self):
+        """Test that repeated requests are counted as duplicates and failed requests count towards the total"""
+        context = FakeContext()
+        recorder = NetworkRecorder(context)
+        for _ in range(3):
+            context.handlers["requestfinished"](FakeRequest("https://app.example.com/api/me"))
+        context.handlers["requestfailed"](FakeRequest("https://app.example.com/api/broken"))
+        
+        summary = recorder.get_summary()
+        
+        assert summary["requests"] == 4
+        assert summary["failed"] == 1
+        assert summary["duplicate_requests"] == 2
+
+
+@pytest.mark.unit
+def test_endpoint_folds_ids():
+    """Test that numeric and uuid path segments are folded into {id}"""
+    assert get_endpoint("PUT", "https://app.example.com/api/users/42/roles/0f8fad5b-d9cb-469f-a165-70867728950e") == \
+        "PUT app.example.com/api/users/{id}/roles/{id}"
@@ -5,6 +5,18 @@ import pytest
 from playwright.sync_api import Page
 from pages.login_page import LoginPage
 from pages.permissions_page import PermissionsPage
+from pages.user_type_page import UserTypePage
+from config.config import get_config
+from utils.combinatorial import generate_configuration_cases
+
+config = get_config()
+
+# Covering array of user types x permissions instead of the exponential full matrix
+PERMISSION_CASES = generate_configuration_cases(
+    UserTypePage.USER_TYPES,
+    PermissionsPage.PERMISSION_CATALOG,
+    strength=config.COMBINATORIAL_STRENGTH
+)
 
 
 class TestPermissions:
@@ -73,3 +85,11 @@ class TestPermissions:
         
         # Verify success message or default state
         # This will depend on your application's behavior
+    
+    @pytest.mark.parametrize("user_type,permissions", PERMISSION_CASES)
+    def test_permission_matrix(self, user_type, permissions):
+        """Test permission combinations from the covering array"""
+        self.permissions_page.configure_permissions(user_type, permissions)
+        
+        for permission_name, expected_state in permissions.items():
+            assert self.permissions_page.is_permission_enabled(permission_name) == expected_state
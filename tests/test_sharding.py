@@ -0,0 +1,129 @@
+"""
+Test cases for the shard planner
+"""
+import os
+
+import pytest
+
+from utils.sharding import AUTH_CACHE_MARKER, KEEP_TOGETHER_MARKER, get_exit_code, get_shard_env, plan_shards, write_plan
+
+
+def make_tests(count: int, markers=(), prefix: str = "tests/test_x.py::test"):
+    return [{"nodeid": f"{prefix}_{index}", "markers": list(markers)} for index in range(count)]
+
+
+def get_shard_of(shards, nodeid: str) -> dict:
+    return next(shard for shard in shards if nodeid in shard["tests"])
+
+
+@pytest.mark.unit
+class TestPlanShards:
+    """plan_shards keeps the marker constraints and balances expected durations"""
+    
+    def test_every_test_planned_once(self):
+        """Test that each collected test lands on exactly one shard"""
+        tests = make_tests(23)
+        shards = plan_shards(tests, {}, 4)
+        
+        planned = [nodeid for shard in shards for nodeid in shard["tests"]]
+        assert sorted(planned) == sorted(test["nodeid"] for test in tests)
+    
+    def test_shard_keeps_collection_order(self):
+        """Test that each shard runs its tests in collection order"""
+        tests = make_tests(12)
+        order = [test["nodeid"] for test in tests]
+        durations = {test["nodeid"]: float(12 - index) for index, test in enumerate(tests)}
+        
+        for shard in plan_shards(tests, durations, 3):
+            assert shard["tests"] == sorted(shard["tests"], key=order.index)
+    
+    def test_smoke_tests_stay_together(self):
+        """Test that all smoke tests go to a single shard"""
+        smoke = make_tests(5, markers=[KEEP_TOGETHER_MARKER, "admin"], prefix="tests/test_smoke.py::test")
+        tests = smoke + make_tests(20)
+        
+        shards = plan_shards(tests, {}, 4)
+        
+        assert len({get_shard_of(shards, test["nodeid"])["index"] for test in smoke}) == 1
+    
+    def test_admin_tests_only_on_auth_cache_shards(self):
+        """Test that admin tests only go to shards sharing the admin auth cache"""
+        admin = make_tests(6, markers=[AUTH_CACHE_MARKER], prefix="tests/test_admin.py::test")
+        tests = admin + make_tests(18)
+        
+        shards = plan_shards(tests, {}, 4)
+        
+        auth_shards = [shard for shard in shards if shard["auth_cache"] == AUTH_CACHE_MARKER]
+        assert 1 <= len(auth_shards) < len(shards)
+        for test in admin:
+            assert get_shard_of(shards, test["nodeid"])["auth_cache"] == AUTH_CACHE_MARKER
+    
+    def test_no_auth_cache_shards_without_admin_tests(self):
+        """Test that no shard is reserved when there is nothing to share a login"""
+        shards = plan_shards(make_tests(8), {}, 3)
+        
+        assert all(shard["auth_cache"] is None for shard in shards)
+    
+    def test_balanced_by_duration(self):
+        """Test that the slowest shard is within one test of the fastest (longest processing time first)"""
+        tests = make_tests(40)
+        durations = {test["nodeid"]: float(1 + index % 7) for index, test in enumerate(tests)}
+        
+        shards = plan_shards(tests, durations, 4)
+        
+        expected = [shard["expected_duration"] for shard in shards]
+        assert max(expected) - min(expected) <= max(durations.values())
+        assert sum(expected) == pytest.approx(sum(durations.values()))
+    
+    def test_unknown_durations_use_median(self):
+        """Test that tests without history are estimated at the median of known durations"""
+        tests = make_tests(3)
+        durations = {"tests/test_x.py::test_0": 2.0, "tests/test_x.py::test_1": 4.0}
+        
+        shards = plan_shards(tests, durations, 1)
+        
+        assert shards[0]["expected_duration"] == pytest.approx(2.0 + 4.0 + 3.0)
+    
+    @pytest.mark.parametrize("shard_count", [0, -1])
+    def test_rejects_fewer_than_one_shard(self, shard_count):
+        """Test that a shard count below 1 is refused"""
+        with pytest.raises(ValueError):
+            plan_shards(make_tests(3), {}, shard_count)
+    
+    def test_more_shards_than_tests(self):
+        """Test that extra shards are planned empty"""
+        shards = plan_shards(make_tests(2), {}, 4)
+        
+        assert sorted(len(shard["tests"]) for shard in shards) == [0, 0, 1, 1]
+
+
+@pytest.mark.unit
+class TestShardEnv:
+    """The environment each shard's pytest runs in"""
+    
+    def test_auth_cache_shards_share_logins(self, tmp_path, monkeypatch):
+        """Test that only the shards marked for the admin auth cache run with AUTH_CACHE on"""
+        monkeypatch.delenv("AUTH_CACHE", raising=False)
+        tests = make_tests(4, markers=[AUTH_CACHE_MARKER], prefix="tests/test_admin.py::test") + make_tests(12)
+        shards = plan_shards(tests, {}, 3)
+        write_plan(shards, str(tmp_path / "plan"), ["-m", "regression"], 0)
+        
+        for shard in shards:
+            manifest_path = str(tmp_path / "plan" / f"shard-{shard['index']}.json")
+            env = get_shard_env(manifest_path, str(tmp_path / "out"))
+            if shard["auth_cache"] == AUTH_CACHE_MARKER:
+                assert env["AUTH_CACHE"] == "true"
+            else:
+                assert "AUTH_CACHE" not in env
+            assert env["RESULT_STREAM"] == "true"
+            assert env["REPORT_DIR"].startswith(os.path.abspath(str(tmp_path / "out")))
+
+
+@pytest.mark.unit
+class TestShardExitCode:
+    """Shard exit codes as seen by the merged run"""
+    
+    @pytest.mark.parametrize("exit_code,expected", [(0, 0), (5, 0), (1, 1), (2, 2)])
+    def test_empty_shard_passes(self, exit_code, expected):
+        """Test that a shard with no tests (exit code 5) does not fail the merged run"""
+        assert get_exit_code(exit_code) == expected
@@ -11,9 +11,10 @@ class TestUserTypeCRUD:
     """Test suite for User Type CRUD operations"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page):
+    def setup(self, page: Page, data_factory):
         """Setup before each test"""
         self.page = page
+        self.data_factory = data_factory
         self.login_page = LoginPage(page)
         self.user_type_page = UserTypePage(page)
         
@@ -26,7 +27,7 @@ class TestUserTypeCRUD:
     
     def test_create_user_type(self):
         """Test creating a new user type"""
-        user_type_name = "Test User Type"
+        user_type_name = self.data_factory.unique_name("Test User Type")
         user_type_description = "This is a test user type"
         
         self.user_type_page.create_user_type(user_type_name, user_type_description)
@@ -37,7 +38,7 @@ class TestUserTypeCRUD:
     def test_read_user_type(self):
         """Test reading/viewing user types"""
         # Create a user type first
-        user_type_name = "Read Test Type"
+        user_type_name = self.data_factory.unique_name("Read Test Type")
         self.user_type_page.create_user_type(user_type_name, "Description")
         
         # Verify it's visible in the list
@@ -46,11 +47,11 @@ class TestUserTypeCRUD:
     def test_update_user_type(self):
         """Test updating an existing user type"""
         # Create a user type first
-        original_name = "Original Type"
+        original_name = self.data_factory.unique_name("Original Type")
         self.user_type_page.create_user_type(original_name, "Original description")
         
         # Update the user type
-        new_name = "Updated Type"
+        new_name = self.data_factory.unique_name("Updated Type")
         new_description = "Updated description"
         self.user_type_page.edit_user_type(original_name, new_name, new_description)
         
@@ -60,7 +61,7 @@ class TestUserTypeCRUD:
     def test_delete_user_type(self):
         """Test deleting a user type"""
         # Create a user type first
-        user_type_name = "Type to Delete"
+        user_type_name = self.data_factory.unique_name("Type to Delete")
         self.user_type_page.create_user_type(user_type_name, "Will be deleted")
         
         # Delete the user type
@@ -5,6 +5,18 @@ import pytest
 from playwright.sync_api import Page
 from pages.login_page import LoginPage
 from pages.visualization_page import VisualizationPage
+from pages.user_type_page import UserTypePage
+from config.config import get_config
+from utils.combinatorial import generate_configuration_cases
+
+config = get_config()
+
+# Covering array of user types x visibility settings instead of the exponential full matrix
+VISIBILITY_CASES = generate_configuration_cases(
+    UserTypePage.USER_TYPES,
+    VisualizationPage.VISIBILITY_CATALOG,
+    strength=config.COMBINATORIAL_STRENGTH
+)
 
 
 class TestVisualization:
@@ -75,3 +87,20 @@ class TestVisualization:
         
         # Verify success message
         # This will depend on your application's behavior
+    
+    @pytest.mark.parametrize("user_type,visibility_settings", VISIBILITY_CASES)
+    def test_visibility_matrix(self, user_type, visibility_settings):
+        """Test visibility combinations from the covering array"""
+        self.visualization_page.configure_visualization(user_type, visibility_settings)
+        
+        for element_name, expected_visibility in visibility_settings.items():
+            assert self.visualization_page.is_element_visible_for_user_type(element_name) == expected_visibility
+    
+    @pytest.mark.parametrize("user_type", UserTypePage.USER_TYPES)
+    def test_visual_baseline_for_user_type(self, visual_regression, user_type):
+        """Test that what each user type sees matches its visual baseline"""
+        self.visualization_page.select_user_type(user_type)
+        
+        self.visualization_page.verify_visual_baseline(
+            visual_regression, f"visualization_{user_type.lower()}"
+        )
@@ -0,0 +1,206 @@
+"""
+Adaptive timeouts
+Learns latency distributions of waits (per action and per selector) and of
+whole tests from past runs. Once a wait has enough history it gets a deadline
+of p99 * margin + padding instead of the fixed default, every test gets a
+total time budget learned the same way, and a wait that runs past its learned
+deadline is flagged as a performance anomaly
+
+Modes (ADAPTIVE_TIMEOUTS):
+    off      fixed defaults, nothing recorded
+    observe  fixed defaults, latencies recorded and anomalies flagged
+    enforce  learned deadlines and test budgets applied
+"""
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from utils.logger import get_default_logger
+
+logger = get_default_logger()
+
+MODES = ("off", "observe", "enforce")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LatencyHistory:
+    """Bounded latency samples per wait key and per test, persisted as JSON"""
+
+    def __init__(self, waits: Dict[str, List[float]] = None, tests: Dict[str, List[float]] = None,
+                 window: int = 200):
+        self.waits = waits or {}
+        self.tests = tests or {}
+        self.window = window
+
+    @classmethod
+    def load(cls, path: str, window: int = 200) -> "LatencyHistory":
+        """Load history, starting empty when the file is missing or unreadable"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(window=window)
+        return cls(data.get("waits"), data.get("tests"), window)
+
+    def save(self, path: str):
+        """Write history atomically so concurrent readers never see a partial file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"updated_at": datetime.now().isoformat(), "waits": self.waits, "tests": self.tests}, f)
+        os.replace(tmp_path, path)
+
+    def _add(self, bucket: Dict[str, List[float]], key: str, value: float):
+        samples = bucket.setdefault(key, [])
+        samples.append(round(value, 1))
+        del samples[:-self.window]
+
+    def add_wait(self, key: str, elapsed_ms: float):
+        """Record a successful wait"""
+        self._add(self.waits, key, elapsed_ms)
+
+    def add_test(self, nodeid: str, duration_ms: float):
+        """Record a passed test's duration"""
+        self._add(self.tests, nodeid, duration_ms)
+
+    def get_action_samples(self, action: str) -> List[float]:
+        """All samples of an action across selectors"""
+        prefix = f"{action}:"
+        return [value for key, samples in self.waits.items() if key.startswith(prefix) for value in samples]
+
+
+class AdaptiveTimeouts:
+    """Hands out wait deadlines and tracks the current test's time budget"""
+
+    def __init__(self, mode: str = "off", history: LatencyHistory = None, margin: float = 1.5,
+                 padding_ms: float = 500, min_ms: float = 1000, min_samples: int = 20):
+        if mode not in MODES:
+            raise ValueError(f"Unknown adaptive timeout mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.history = history or LatencyHistory()
+        self.margin = margin
+        self.padding_ms = padding_ms
+        self.min_ms = min_ms
+        self.min_samples = min_samples
+        self.observations = []
+        self.anomalies = []
+        self.test_budget_ms = None
+        self._test_start = None
+
+    def _deadline_from(self, samples: List[float]) -> Optional[float]:
+        if len(samples) < self.min_samples:
+            return None
+        return max(percentile(samples, 99) * self.margin + self.padding_ms, self.min_ms)
+
+    def get_learned_deadline(self, action: str, selector: str) -> Optional[float]:
+        """Learned deadline for a wait, from its selector's history or else its action's"""
+        deadline = self._deadline_from(self.history.waits.get(f"{action}:{selector}", []))
+        if deadline is None:
+            deadline = self._deadline_from(self.history.get_action_samples(action))
+        return deadline
+
+    def get_remaining_budget(self) -> Optional[float]:
+        """Milliseconds left in the current test's budget, if it has one"""
+        if self.test_budget_ms is None or self._test_start is None:
+            return None
+        return self.test_budget_ms - (time.perf_counter() - self._test_start) * 1000
+
+    def clamp_to_budget(self, timeout_ms: float) -> int:
+        """Shorten a timeout so it cannot outlive the current test's budget"""
+        remaining = self.get_remaining_budget() if self.mode == "enforce" else None
+        if remaining is not None:
+            timeout_ms = min(timeout_ms, max(remaining, self.min_ms))
+        return int(timeout_ms)
+
+    def get_timeout(self, action: str, selector: str, default_ms: float) -> int:
+        """Timeout to use for a wait: the learned deadline when enforcing, otherwise the default"""
+        timeout = default_ms
+        if self.mode == "enforce":
+            learned = self.get_learned_deadline(action, selector)
+            if learned is not None:
+                timeout = min(learned, default_ms)
+        return self.clamp_to_budget(timeout)
+
+    def start_test(self, nodeid: str):
+        """Start the budget clock for a test"""
+        self.observations = []
+        self.anomalies = []
+        self._test_start = time.perf_counter()
+        self.test_budget_ms = self._deadline_from(self.history.tests.get(nodeid, [])) if self.mode != "off" else None
+
+    def finish_test(self, nodeid: str) -> float:
+        """Stop the budget clock, flagging a test that ran over its budget"""
+        duration_ms = (time.perf_counter() - self._test_start) * 1000 if self._test_start else 0.0
+        if self.test_budget_ms is not None and duration_ms > self.test_budget_ms:
+            self._flag("test", nodeid, duration_ms, self.test_budget_ms)
+        self._test_start = None
+        return duration_ms
+
+    def _flag(self, action: str, selector: str, elapsed_ms: float, deadline_ms: float, timed_out: bool = False):
+        anomaly = {
+            "action": action,
+            "selector": selector,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "deadline_ms": round(deadline_ms, 1),
+            "timed_out": timed_out,
+        }
+        self.anomalies.append(anomaly)
+        logger.warning(
+            f"Performance anomaly: {action} '{selector}' took {anomaly['elapsed_ms']} ms, "
+            f"learned deadline {anomaly['deadline_ms']} ms"
+        )
+
+    @contextmanager
+    def measure(self, action: str, selector: str, default_ms: float) -> Iterator[int]:
+        """
+        Time a wait and yield the timeout it should use
+
+        Args:
+            action: Kind of wait, e.g. wait_for_element or expect_url
+            selector: Selector or URL pattern waited on
+            default_ms: Timeout used until enough history exists
+        """
+        timeout = self.get_timeout(action, selector, default_ms)
+        if self.mode == "off":
+            yield timeout
+            return
+        learned = self.get_learned_deadline(action, selector)
+        start = time.perf_counter()
+        try:
+            yield timeout
+        except (PlaywrightTimeoutError, AssertionError):
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if learned is not None:
+                self._flag(action, selector, elapsed_ms, learned, timed_out=True)
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.observations.append([f"{action}:{selector}", round(elapsed_ms, 1)])
+        if learned is not None and elapsed_ms > learned:
+            self._flag(action, selector, elapsed_ms, learned)
+
+
+_adaptive_timeouts = AdaptiveTimeouts()
+
+
+def get_adaptive_timeouts() -> AdaptiveTimeouts:
+    """Get the adaptive timeout manager of this process"""
+    return _adaptive_timeouts
+
+
+def configure_adaptive_timeouts(timeouts: AdaptiveTimeouts) -> AdaptiveTimeouts:
+    """Replace the adaptive timeout manager of this process"""
+    global _adaptive_timeouts
+    _adaptive_timeouts = timeouts
+    return timeouts
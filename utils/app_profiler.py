@@ -0,0 +1,211 @@
+"""
+Application-side profiling through Chromium CDP
+Records the app's JavaScript CPU profile and heap snapshots around page-object
+flows, so a slow flow can be attributed to the app's JS or to the runner. CPU
+profiles (.cpuprofile) and heap snapshots (.heapsnapshot) open in Chrome
+DevTools; each flow also gets a JSON summary of its hottest functions
+"""
+import functools
+import json
+import os
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from playwright.sync_api import Error, Page
+
+from utils.logger import get_default_logger
+
+logger = get_default_logger()
+
+# CPU profile nodes that are not app functions
+IDLE_NODE = "(idle)"
+SPECIAL_NODES = {IDLE_NODE, "(program)", "(garbage collector)", "(root)"}
+
+# Result property holding each test's profiled flows
+APP_PROFILE_PROPERTY = "app_profile"
+
+_profilers = {}
+
+
+def get_app_profiler(page: Page) -> Optional["AppProfiler"]:
+    """Get the profiler attached to a page, if any"""
+    return _profilers.get(id(page))
+
+
+def get_safe_name(name: str) -> str:
+    """Make a test id or flow name usable as a file name"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")
+
+
+def summarize_cpu_profile(profile: Dict, top_n: int = 10) -> Dict:
+    """
+    Summarize a CDP CPU profile into self and total time per function
+
+    Args:
+        profile: Profile returned by Profiler.stop
+        top_n: Number of hottest functions to keep
+
+    Returns:
+        Totals for the flow (busy, idle, GC) and the top functions by self time
+    """
+    nodes = {node["id"]: node for node in profile["nodes"]}
+    parents = {child: node["id"] for node in profile["nodes"] for child in node.get("children", [])}
+    samples = profile.get("samples", [])
+    deltas = profile.get("timeDeltas", [])
+
+    # Each delta is the time before its sample, so a sample lasts until the next delta
+    sample_us = defaultdict(float)
+    for index, node_id in enumerate(samples):
+        if index + 1 < len(deltas):
+            sample_us[node_id] += deltas[index + 1]
+
+    def function_key(node_id):
+        frame = nodes[node_id]["callFrame"]
+        name = frame.get("functionName") or "(anonymous)"
+        return name, frame.get("url", ""), frame.get("lineNumber", -1) + 1
+
+    self_us = defaultdict(float)
+    total_us = defaultdict(float)
+    special_us = defaultdict(float)
+    for node_id, duration in sample_us.items():
+        key = function_key(node_id)
+        if key[0] in SPECIAL_NODES:
+            special_us[key[0]] += duration
+            continue
+        self_us[key] += duration
+        # Count each function once per stack, however deep its recursion
+        seen = set()
+        current = node_id
+        while current is not None:
+            ancestor = function_key(current)
+            if ancestor[0] not in SPECIAL_NODES and ancestor not in seen:
+                total_us[ancestor] += duration
+                seen.add(ancestor)
+            current = parents.get(current)
+
+    profile_us = profile.get("endTime", 0) - profile.get("startTime", 0)
+    idle_us = special_us[IDLE_NODE]
+    hottest = sorted(self_us.items(), key=lambda item: item[1], reverse=True)[:top_n]
+    return {
+        "duration_ms": round(profile_us / 1000, 1),
+        "busy_ms": round((profile_us - idle_us) / 1000, 1),
+        "idle_ms": round(idle_us / 1000, 1),
+        "gc_ms": round(special_us["(garbage collector)"] / 1000, 1),
+        "program_ms": round(special_us["(program)"] / 1000, 1),
+        "hottest_functions": [
+            {
+                "function": name,
+                "url": url,
+                "line": line,
+                "self_ms": round(duration / 1000, 2),
+                "total_ms": round(total_us[(name, url, line)] / 1000, 2),
+            }
+            for (name, url, line), duration in hottest
+        ],
+    }
+
+
+class AppProfiler:
+    """Profiles the app running in one page through a CDP session"""
+
+    def __init__(self, page: Page, output_dir: str, top_n: int = 10,
+                 heap_snapshots: bool = True, sampling_interval_us: int = 100):
+        self.page = page
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.heap_snapshots = heap_snapshots
+        self.flows = []
+        self.active = False
+        self._counts = defaultdict(int)
+        self._snapshot_file = None
+        self.cdp = page.context.new_cdp_session(page)
+        self.cdp.send("Profiler.enable")
+        self.cdp.send("Profiler.setSamplingInterval", {"interval": sampling_interval_us})
+        if heap_snapshots:
+            self.cdp.send("HeapProfiler.enable")
+            self.cdp.on("HeapProfiler.addHeapSnapshotChunk", self._write_snapshot_chunk)
+        _profilers[id(page)] = self
+
+    def _write_snapshot_chunk(self, params: Dict):
+        if self._snapshot_file is not None:
+            self._snapshot_file.write(params["chunk"])
+
+    def take_heap_snapshot(self, path: str) -> str:
+        """Write a heap snapshot of the page, streamed to disk chunk by chunk"""
+        with open(path, "w", encoding="utf-8") as f:
+            self._snapshot_file = f
+            try:
+                # Chunks arrive as events before the command returns
+                self.cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+            finally:
+                self._snapshot_file = None
+        return path
+
+    @contextmanager
+    def profile(self, flow: str) -> Iterator[None]:
+        """Record a CPU profile (and heap snapshots before and after) around a flow"""
+        self._counts[flow] += 1
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{get_safe_name(flow)}_{self._counts[flow]}")
+        record = {"flow": flow, "cpuprofile": f"{base}.cpuprofile"}
+        if self.heap_snapshots:
+            record["heap_before"] = self.take_heap_snapshot(f"{base}.before.heapsnapshot")
+        self.active = True
+        self.cdp.send("Profiler.start")
+        try:
+            yield
+        finally:
+            self.active = False
+            profile = self.cdp.send("Profiler.stop")["profile"]
+            with open(record["cpuprofile"], "w", encoding="utf-8") as f:
+                json.dump(profile, f)
+            if self.heap_snapshots:
+                record["heap_after"] = self.take_heap_snapshot(f"{base}.after.heapsnapshot")
+            record["summary"] = summarize_cpu_profile(profile, self.top_n)
+            with open(f"{base}.summary.json", "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2)
+            self.flows.append(record)
+            logger.info(f"App profile for {flow}: {record['summary']['busy_ms']} ms busy of "
+                        f"{record['summary']['duration_ms']} ms, saved to {record['cpuprofile']}")
+
+    def detach(self):
+        """Stop profiling the page"""
+        _profilers.pop(id(self.page), None)
+        try:
+            self.cdp.detach()
+        except Error as e:
+            logger.debug(f"CDP session already closed: {e}")
+
+
+def profile_method(func):
+    """Wrap a page-object method so it is profiled when its page has a profiler attached"""
+    if getattr(func, "__app_profiled__", False):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = get_app_profiler(self.page)
+        # Nested selected flows run inside the outer flow's profile
+        if profiler is None or profiler.active:
+            return func(self, *args, **kwargs)
+        with profiler.profile(f"{type(self).__name__}.{func.__name__}"):
+            return func(self, *args, **kwargs)
+
+    wrapper.__app_profiled__ = True
+    wrapper.__wrapped_original__ = func
+    return wrapper
+
+
+def get_summary_lines(flows: List[Dict], top_n: int = 3) -> List[str]:
+    """Format flow summaries for the terminal"""
+    lines = []
+    for record in flows:
+        summary = record["summary"]
+        lines.append(f"{record['flow']}: {summary['busy_ms']} ms app JS of {summary['duration_ms']} ms "
+                     f"(GC {summary['gc_ms']} ms)")
+        for function in summary["hottest_functions"][:top_n]:
+            location = f"{function['url']}:{function['line']}" if function["url"] else "native"
+            lines.append(f"    {function['self_ms']:>8.1f} ms  {function['function']}  {location}")
+    return lines
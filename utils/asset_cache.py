@@ -0,0 +1,268 @@
+"""
+Warmed static asset cache
+A prewarm step loads the app once and stores its static assets (scripts,
+stylesheets, fonts, images) in a local content-addressed cache: bodies live in
+blobs/<sha256>, and index.json maps each URL to its ETag, headers and blob.
+Contexts then serve those assets read-only through a route, since a fresh
+BrowserContext (and any context with routes) never reuses the HTTP cache. The
+first hit on an asset in each process revalidates it with If-None-Match, so an
+asset redeployed under the same URL is picked up without waiting for the cache
+to expire
+
+Usage:
+    python -m utils.asset_cache prewarm [URL ...]
+    python -m utils.asset_cache info
+    python -m utils.asset_cache clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from playwright.sync_api import Browser, Error, Request, Route, sync_playwright
+
+from config.config import get_config
+from utils.har_replay import DROPPED_RESPONSE_HEADERS
+from utils.logger import get_default_logger
+
+config = get_config()
+logger = get_default_logger()
+
+STATIC_RESOURCE_TYPES = {"script", "stylesheet", "font", "image"}
+INDEX_FILE = "index.json"
+
+
+def is_static_request(request: Request) -> bool:
+    """Whether a request is for a cacheable static asset"""
+    return request.method == "GET" and request.resource_type in STATIC_RESOURCE_TYPES
+
+
+class AssetCache:
+    """Content-addressed asset store with a URL index"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.index = {}
+        self.created_at = None
+        self._bodies = {}
+        # URLs whose ETag the server confirmed (or whose entry was refreshed) in this process
+        self._revalidated = set()
+        self.load()
+
+    def load(self):
+        """Load the index, starting empty when there is none"""
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.index = data.get("assets", {})
+        self.created_at = data.get("created_at")
+
+    def is_stale(self, max_age_hours: float) -> bool:
+        """Whether the cache is empty or older than max_age_hours"""
+        if not self.index or not os.path.exists(self.index_path):
+            return True
+        return (time.time() - os.path.getmtime(self.index_path)) / 3600 > max_age_hours
+
+    def _write_atomic(self, path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """Store an asset body by content hash and index it by URL and ETag"""
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = os.path.join(self.blob_dir, digest)
+        # Identical bodies under different URLs (e.g. the same font) share one blob
+        if not os.path.exists(blob_path):
+            os.makedirs(self.blob_dir, exist_ok=True)
+            self._write_atomic(blob_path, body)
+        self.index[url] = {
+            "etag": headers.get("etag"),
+            "sha256": digest,
+            "size": len(body),
+            "status": status,
+            "headers": {name: value for name, value in headers.items() if name.lower() not in DROPPED_RESPONSE_HEADERS},
+        }
+
+    def save(self):
+        """Write the index atomically so concurrent readers never see a partial file"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.created_at = datetime.now().isoformat()
+        payload = json.dumps({"created_at": self.created_at, "assets": self.index}, indent=2)
+        self._write_atomic(self.index_path, payload.encode("utf-8"))
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Get the index entry for a URL"""
+        return self.index.get(url)
+
+    def needs_revalidation(self, url: str) -> bool:
+        """Whether an entry has an ETag the server has not confirmed in this process yet"""
+        entry = self.index.get(url)
+        return bool(entry and entry.get("etag")) and url not in self._revalidated
+
+    def mark_revalidated(self, url: str):
+        """Record that the server confirmed, or replaced, an entry"""
+        self._revalidated.add(url)
+
+    def forget(self, url: str):
+        """Drop an entry the server no longer serves"""
+        self.index.pop(url, None)
+
+    def read_body(self, entry: Dict) -> bytes:
+        """Read an asset body, kept in memory after the first read"""
+        body = self._bodies.get(entry["sha256"])
+        if body is None:
+            with open(os.path.join(self.blob_dir, entry["sha256"]), "rb") as f:
+                body = self._bodies[entry["sha256"]] = f.read()
+        return body
+
+    def clear(self):
+        """Delete the cache"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.index = {}
+        self._bodies = {}
+
+    def prewarm(self, browser: Browser, urls: List[str]) -> int:
+        """
+        Load pages once and store every cacheable static asset they fetch
+
+        Returns:
+            Number of assets in the cache
+        """
+        context = browser.new_context()
+        page = context.new_page()
+        responses = []
+        page.on("response", responses.append)
+        try:
+            for url in urls:
+                logger.info(f"Prewarming asset cache from {url}")
+                page.goto(url, wait_until="networkidle")
+            for response in responses:
+                if not is_static_request(response.request) or response.status != 200:
+                    continue
+                headers = response.headers
+                if "no-store" in headers.get("cache-control", ""):
+                    continue
+                try:
+                    body = response.body()
+                except Error as e:
+                    logger.debug(f"Could not read {response.url}: {e}")
+                    continue
+                self.store(response.url, response.status, headers, body)
+        finally:
+            context.close()
+        self.save()
+        logger.info(f"Asset cache holds {len(self.index)} assets in {self.cache_dir}")
+        return len(self.index)
+
+
+class AssetCacheRouter:
+    """Serves cached static assets to one context and counts hits and misses"""
+
+    def __init__(self, cache: AssetCache, revalidate: bool = True):
+        self.cache = cache
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.bytes_served = 0
+        self.missed_urls = []
+
+    def handle(self, route: Route, request: Request):
+        """Route handler fulfilling static assets from the cache"""
+        if not is_static_request(request):
+            route.fallback()
+            return
+        entry = self.cache.get(request.url)
+        if entry is None:
+            self.misses += 1
+            self.missed_urls.append(request.url)
+            route.fallback()
+            return
+        if self.revalidate and self.cache.needs_revalidation(request.url):
+            if not self._revalidate(route, request, entry):
+                return
+        body = self.cache.read_body(entry)
+        self.hits += 1
+        self.bytes_served += len(body)
+        route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+
+    def _revalidate(self, route: Route, request: Request, entry: Dict) -> bool:
+        """
+        Check a cached asset's ETag with the server, answering the request itself when the asset changed
+
+        Returns:
+            True if the cached entry is current and still has to be served
+        """
+        try:
+            response = route.fetch(headers=dict(request.headers, **{"if-none-match": entry["etag"]}))
+        except Error as e:
+            logger.debug(f"Could not revalidate {request.url}: {e}")
+            self.misses += 1
+            self.missed_urls.append(request.url)
+            route.fallback()
+            return False
+        self.cache.mark_revalidated(request.url)
+        if response.status == 304:
+            return True
+        # Redeployed under the same URL: replace the entry for the rest of the run (prewarm rewrites the index)
+        if response.status == 200 and "no-store" not in response.headers.get("cache-control", ""):
+            self.cache.store(request.url, response.status, response.headers, response.body())
+        else:
+            self.cache.forget(request.url)
+        self.refreshed += 1
+        route.fulfill(response=response)
+        return False
+
+    def get_stats(self) -> Dict:
+        """Hit rate of static asset requests in this context"""
+        requests = self.hits + self.misses + self.refreshed
+        return {
+            "static_requests": requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshed": self.refreshed,
+            "hit_rate": round(self.hits / requests, 3) if requests else None,
+            "bytes_served": self.bytes_served,
+            "missed_urls": self.missed_urls[:20],
+        }
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Manage the warmed static asset cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prewarm_parser = subparsers.add_parser("prewarm", help="Load the app once and cache its static assets")
+    prewarm_parser.add_argument("urls", nargs="*", help="Pages to load (defaults to ASSET_CACHE_PREWARM_URLS)")
+    subparsers.add_parser("info", help="Show what the cache holds")
+    subparsers.add_parser("clear", help="Delete the cache")
+    args = parser.parse_args(argv)
+
+    cache = AssetCache(config.ASSET_CACHE_DIR)
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared {config.ASSET_CACHE_DIR}")
+    elif args.command == "info":
+        total = sum(entry["size"] for entry in cache.index.values())
+        blobs = len({entry["sha256"] for entry in cache.index.values()})
+        print(f"{len(cache.index)} assets ({blobs} blobs, {total / 1024:.0f} KB), created {cache.created_at}")
+    else:
+        with sync_playwright() as p:
+            browser = getattr(p, config.BROWSER).launch(headless=True)
+            try:
+                cache.prewarm(browser, args.urls or config.ASSET_CACHE_PREWARM_URLS)
+            finally:
+                browser.close()
+
+
+if __name__ == "__main__":
+    main()
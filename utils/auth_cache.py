@@ -0,0 +1,41 @@
+"""
+In-process login cache
+Keeps the storage state (cookies and localStorage) of each logged-in account so
+later tests in the same process, and every iteration of watch mode, can restore
+the session instead of logging in again. Deliberately has no project imports,
+so watch mode's hot reload never resets it
+"""
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+SET_LOCAL_STORAGE_SCRIPT = "items => { for (const item of items) localStorage.setItem(item.name, item.value); }"
+
+_states = {}
+
+
+def get_auth_state(key: str) -> Optional[Dict]:
+    """Get the cached storage state for an account"""
+    return _states.get(key)
+
+
+def set_auth_state(key: str, state: Dict):
+    """Cache the storage state of a logged-in account"""
+    _states[key] = state
+
+
+def invalidate_auth_state(key: str = None):
+    """Forget one account's storage state, or every account's"""
+    if key is None:
+        _states.clear()
+    else:
+        _states.pop(key, None)
+
+
+def apply_storage_state(page, state: Dict):
+    """Load a storage state's cookies, and its localStorage for the page's current origin, into the page's context"""
+    page.context.add_cookies(state["cookies"])
+    parts = urlsplit(page.url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    for entry in state.get("origins", []):
+        if entry["origin"] == origin:
+            page.evaluate(SET_LOCAL_STORAGE_SCRIPT, entry["localStorage"])
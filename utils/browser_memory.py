@@ -0,0 +1,167 @@
+"""
+Browser memory monitoring and recycling
+Samples browser process RSS (the process tree of the browser this manager
+launched, so other engines of a matrix run are not charged to it) and, on
+Chromium, the page's JS heap through CDP after each test.
+BrowserManager relaunches the session's browser when memory or test-count
+thresholds are crossed
+"""
+import os
+from typing import Callable, Dict, List, Optional, Set
+
+from playwright.sync_api import Browser, Error, Page
+
+from utils.logger import get_default_logger
+from utils.run_context import get_worker_id
+
+logger = get_default_logger()
+
+MB = 1024 * 1024
+
+# Result property holding each test's memory sample
+MEMORY_PROPERTY = "memory"
+
+# Processes between pytest and the browser that are not part of the browser itself
+NON_BROWSER_PROCESSES = {"node", "node.exe", "python", "python.exe", "python3", "sh", "bash"}
+
+
+def get_child_pids() -> Set[int]:
+    """PIDs of every process started, directly or not, by this process"""
+    import psutil
+    return {process.pid for process in psutil.Process().children(recursive=True)}
+
+
+def find_browser_roots(known_pids: Set[int]) -> List[int]:
+    """
+    Find the browser processes started since known_pids was taken
+
+    Returns:
+        PIDs of the top browser processes, started by the Playwright driver (or a launch script) rather
+        than by another browser; empty when the browser is not local (e.g. a browser server)
+    """
+    import psutil
+    roots = []
+    for process in psutil.Process().children(recursive=True):
+        if process.pid in known_pids:
+            continue
+        try:
+            if process.name() in NON_BROWSER_PROCESSES:
+                continue
+            parent = process.parent()
+            if parent is not None and (parent.pid == os.getpid() or parent.name() in NON_BROWSER_PROCESSES):
+                roots.append(process.pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return sorted(roots)
+
+
+def get_browser_rss_mb(root_pids: List[int]) -> Optional[float]:
+    """
+    Get the combined RSS of browser processes and everything they started
+
+    Returns:
+        RSS in MB, or None when none of the processes is found (e.g. a remote browser server)
+    """
+    import psutil
+    total = 0
+    found = False
+    for pid in root_pids:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+                found = True
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    return round(total / MB, 1) if found else None
+
+
+def get_js_heap_mb(page: Page) -> Optional[float]:
+    """Get the used JS heap of a Chromium page through CDP"""
+    try:
+        cdp = page.context.new_cdp_session(page)
+        try:
+            usage = cdp.send("Runtime.getHeapUsage")
+        finally:
+            cdp.detach()
+    except Error:
+        return None
+    return round(usage["usedSize"] / MB, 1)
+
+
+class BrowserManager:
+    """Owns the session's browser and relaunches it when it has served too much"""
+
+    def __init__(self, launcher: Callable[[], Browser], browser_engine: str,
+                 max_tests: int = 0, max_rss_mb: float = 0, max_js_heap_mb: float = 0):
+        self.launcher = launcher
+        self.browser_engine = browser_engine
+        self.max_tests = max_tests
+        self.max_rss_mb = max_rss_mb
+        self.max_js_heap_mb = max_js_heap_mb
+        self.launches = 0
+        self.tests_served = 0
+        self.last_sample = {}
+        self._browser = None
+        self._browser_pids = []
+        self._previous_rss = None
+        self._recycle_reason = None
+
+    @property
+    def browser(self) -> Browser:
+        """The current browser, launched on first use and after recycling"""
+        if self._browser is None or not self._browser.is_connected():
+            # The processes that appear during the launch are this browser's, whatever else runs here
+            known_pids = get_child_pids()
+            self._browser = self.launcher()
+            self._browser_pids = find_browser_roots(known_pids)
+            self.launches += 1
+            self.tests_served = 0
+            self._previous_rss = None
+        return self._browser
+
+    def has_memory_thresholds(self) -> bool:
+        """Whether recycling depends on memory, so every test has to be sampled"""
+        return bool(self.max_rss_mb or self.max_js_heap_mb)
+
+    def sample(self, page: Optional[Page] = None) -> Dict:
+        """Sample browser memory after a test, recording growth since the previous test"""
+        rss = get_browser_rss_mb(self._browser_pids)
+        js_heap = get_js_heap_mb(page) if page is not None and self.browser_engine == "chromium" else None
+        growth = round(rss - self._previous_rss, 1) if rss is not None and self._previous_rss is not None else None
+        if rss is not None:
+            self._previous_rss = rss
+        self.last_sample = {
+            "rss_mb": rss,
+            "rss_growth_mb": growth,
+            "js_heap_mb": js_heap,
+            # Growth is measured against the previous test on the same worker and browser launch
+            "worker": get_worker_id(),
+            "browser_launch": self.launches,
+        }
+        if self.max_rss_mb and rss is not None and rss > self.max_rss_mb:
+            self._recycle_reason = f"RSS {rss} MB over {self.max_rss_mb} MB"
+        elif self.max_js_heap_mb and js_heap is not None and js_heap > self.max_js_heap_mb:
+            self._recycle_reason = f"JS heap {js_heap} MB over {self.max_js_heap_mb} MB"
+        return self.last_sample
+
+    def after_test(self):
+        """Count a finished test and recycle the browser when a threshold was crossed"""
+        self.tests_served += 1
+        if self.max_tests and self.tests_served >= self.max_tests:
+            self._recycle_reason = f"served {self.tests_served} tests"
+        if self._recycle_reason:
+            logger.info(f"Recycling {self.browser_engine} browser: {self._recycle_reason}")
+            self.close()
+            self._recycle_reason = None
+
+    def close(self):
+        """Close the current browser"""
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+            self._browser_pids = []
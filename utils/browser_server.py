@@ -0,0 +1,349 @@
+"""
+Persistent browser server daemon
+Keeps Playwright browser servers warm between pytest invocations so the
+`browser` fixture can connect over a websocket instead of launching a browser
+
+Usage:
+    python -m utils.browser_server start [--browsers chromium firefox webkit] [--headless|--headed]
+    python -m utils.browser_server status
+    python -m utils.browser_server stop
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from config.config import get_config
+
+config = get_config()
+
+SUPPORTED_BROWSERS = ("chromium", "firefox", "webkit")
+
+# Node script run with the driver's bundled node; launches one browser server
+# through BrowserType.launchServer and keeps it alive until terminated
+LAUNCH_SCRIPT = """
+const playwright = require(process.argv[1]);
+const browserName = process.argv[2];
+const options = JSON.parse(process.argv[3]);
+playwright[browserName].launchServer(options).then(server => {
+  process.stdout.write(JSON.stringify({ wsEndpoint: server.wsEndpoint() }) + "\\n");
+  const shutdown = () => server.close().then(() => process.exit(0));
+  process.on("SIGTERM", shutdown);
+  process.on("SIGINT", shutdown);
+}).catch(error => {
+  process.stderr.write(String(error && error.stack || error) + "\\n");
+  process.exit(1);
+});
+"""
+
+
+def get_playwright_version() -> str:
+    """Get the installed Playwright client version"""
+    from playwright._repo_version import version
+    return version
+
+
+def get_driver_paths() -> Tuple[str, str]:
+    """
+    Locate the node executable and playwright-core package bundled with the Python driver
+
+    Returns:
+        Tuple of (node executable path, driver package directory)
+    """
+    from playwright._impl._driver import compute_driver_executable
+    driver = compute_driver_executable()
+    if isinstance(driver, tuple):
+        node_path, cli_path = driver
+        return str(node_path), os.path.dirname(str(cli_path))
+    driver_dir = os.path.dirname(str(driver))
+    node_name = "node.exe" if sys.platform == "win32" else "node"
+    return os.path.join(driver_dir, node_name), os.path.join(driver_dir, "package")
+
+
+def get_state_file(state_dir: str = None) -> str:
+    """Get the path of the daemon state file"""
+    return os.path.join(state_dir or config.BROWSER_SERVER_DIR, "state.json")
+
+
+def read_state(state_dir: str = None) -> Dict:
+    """Read daemon state, returning an empty state if the daemon is not running"""
+    state_file = get_state_file(state_dir)
+    if not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(state: Dict, state_dir: str = None):
+    """Atomically write daemon state"""
+    state_file = get_state_file(state_dir)
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def is_endpoint_healthy(ws_endpoint: str, timeout: float = 1.0) -> bool:
+    """Check that a browser server is accepting connections"""
+    parsed = urlparse(ws_endpoint)
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def get_ws_endpoint(browser_name: str, headless: bool, state_dir: str = None) -> Optional[str]:
+    """
+    Get the websocket endpoint of a warm browser server
+
+    Args:
+        browser_name: chromium, firefox or webkit
+        headless: Headless mode the caller expects
+        state_dir: Daemon state directory (defaults to Config.BROWSER_SERVER_DIR)
+
+    Returns:
+        The websocket endpoint, or None if no healthy server matches the
+        browser, headless mode and pinned Playwright version
+    """
+    server = read_state(state_dir).get("servers", {}).get(browser_name)
+    if not server:
+        return None
+    if server.get("playwright_version") != get_playwright_version():
+        return None
+    if server.get("headless") != headless:
+        return None
+    if not is_endpoint_healthy(server["ws_endpoint"]):
+        return None
+    return server["ws_endpoint"]
+
+
+class BrowserServer:
+    """A single browser server process launched through launchServer"""
+
+    def __init__(self, browser_name: str, headless: bool, log_dir: str):
+        self.browser_name = browser_name
+        self.headless = headless
+        self.log_dir = log_dir
+        self.process = None
+        self.ws_endpoint = None
+        self.started_at = None
+        self.restarts = 0
+
+    def start(self):
+        """Launch the server and wait for its websocket endpoint"""
+        node_path, package_dir = get_driver_paths()
+        options = {"headless": self.headless}
+        # Same browser flags as a local launch under the active performance profile
+        launch_args = config.get_browser_config(self.browser_name).get("args")
+        if launch_args:
+            options["args"] = launch_args
+        os.makedirs(self.log_dir, exist_ok=True)
+        stderr = open(os.path.join(self.log_dir, f"{self.browser_name}.log"), "ab")
+        self.process = subprocess.Popen(
+            [node_path, "-e", LAUNCH_SCRIPT, package_dir, self.browser_name, json.dumps(options)],
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            stdin=subprocess.DEVNULL,
+        )
+        stderr.close()
+
+        line = self.process.stdout.readline()
+        if not line:
+            self.stop()
+            raise RuntimeError(f"{self.browser_name} server failed to start, see {self.log_dir}")
+        self.ws_endpoint = json.loads(line)["wsEndpoint"]
+        self.started_at = datetime.now().isoformat()
+
+    def stop(self):
+        """Terminate the server process"""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def restart(self):
+        """Restart a dead or unresponsive server"""
+        self.stop()
+        self.start()
+        self.restarts += 1
+
+    def is_healthy(self) -> bool:
+        """Check the server process is alive and its endpoint accepts connections"""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        return is_endpoint_healthy(self.ws_endpoint)
+
+    def to_state(self) -> Dict:
+        """Serialize the server for the state file"""
+        return {
+            "ws_endpoint": self.ws_endpoint,
+            "pid": self.process.pid if self.process else None,
+            "headless": self.headless,
+            "playwright_version": get_playwright_version(),
+            "started_at": self.started_at,
+            "restarts": self.restarts,
+        }
+
+
+class BrowserServerDaemon:
+    """Supervises browser servers, restarting them when health checks fail"""
+
+    def __init__(self, browsers: List[str], headless: bool, state_dir: str = None,
+                 health_interval: float = None):
+        self.state_dir = state_dir or config.BROWSER_SERVER_DIR
+        self.health_interval = health_interval or config.BROWSER_SERVER_HEALTH_INTERVAL
+        self.servers = {
+            name: BrowserServer(name, headless, os.path.join(self.state_dir, "logs"))
+            for name in browsers
+        }
+        self._running = False
+
+    def _save_state(self):
+        write_state({
+            "daemon_pid": os.getpid(),
+            "servers": {name: server.to_state() for name, server in self.servers.items()},
+        }, self.state_dir)
+
+    def _handle_signal(self, signum, frame):
+        self._running = False
+
+    def run(self):
+        """Start all servers and supervise them until signalled"""
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        self._running = True
+        try:
+            for server in self.servers.values():
+                server.start()
+            self._save_state()
+            while self._running:
+                time.sleep(self.health_interval)
+                restarted = False
+                for server in self.servers.values():
+                    if self._running and not server.is_healthy():
+                        try:
+                            server.restart()
+                        except RuntimeError:
+                            # Retried on the next health check
+                            continue
+                        restarted = True
+                if restarted:
+                    self._save_state()
+        finally:
+            for server in self.servers.values():
+                server.stop()
+            state_file = get_state_file(self.state_dir)
+            if os.path.exists(state_file):
+                os.remove(state_file)
+
+
+def is_daemon_running(state_dir: str = None) -> bool:
+    """Check whether the daemon recorded in the state file is alive"""
+    pid = read_state(state_dir).get("daemon_pid")
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def start_daemon(browsers: List[str], headless: bool, state_dir: str = None, timeout: float = 60) -> Dict:
+    """
+    Start the daemon in the background, replacing one pinned to another Playwright version
+
+    Returns:
+        The daemon state once every server reports its endpoint
+    """
+    state = read_state(state_dir)
+    if is_daemon_running(state_dir):
+        servers = state.get("servers", {})
+        pinned = all(
+            name in servers
+            and servers[name]["playwright_version"] == get_playwright_version()
+            and servers[name]["headless"] == headless
+            for name in browsers
+        )
+        if pinned:
+            return state
+        stop_daemon(state_dir)
+
+    command = [sys.executable, "-m", "utils.browser_server", "run", "--browsers", *browsers]
+    command.append("--headless" if headless else "--headed")
+    if state_dir:
+        command.extend(["--state-dir", state_dir])
+    subprocess.Popen(
+        command,
+        start_new_session=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = read_state(state_dir)
+        if set(browsers) <= set(state.get("servers", {})):
+            return state
+        time.sleep(0.2)
+    raise RuntimeError("Browser server daemon did not become ready in time")
+
+
+def stop_daemon(state_dir: str = None, timeout: float = 30):
+    """Stop the daemon and all of its browser servers"""
+    pid = read_state(state_dir).get("daemon_pid")
+    if not pid or not is_daemon_running(state_dir):
+        return
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.time() + timeout
+    while time.time() < deadline and is_daemon_running(state_dir):
+        time.sleep(0.2)
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Keep Playwright browser servers warm between test runs")
+    parser.add_argument("command", choices=["start", "stop", "restart", "status", "run"])
+    parser.add_argument("--browsers", nargs="+", choices=SUPPORTED_BROWSERS, default=[config.BROWSER])
+    parser.add_argument("--headless", dest="headless", action="store_true", default=config.get_profile()["headless"])
+    parser.add_argument("--headed", dest="headless", action="store_false")
+    parser.add_argument("--state-dir", default=None)
+    args = parser.parse_args(argv)
+    headless = args.headless
+
+    if args.command == "run":
+        BrowserServerDaemon(args.browsers, headless, args.state_dir).run()
+        return
+    if args.command in ("stop", "restart"):
+        stop_daemon(args.state_dir)
+    if args.command in ("start", "restart"):
+        start_daemon(args.browsers, headless, args.state_dir)
+
+    state = read_state(args.state_dir)
+    if not state:
+        print("Browser server daemon is not running")
+        return
+    for name, server in state.get("servers", {}).items():
+        status = "healthy" if is_endpoint_healthy(server["ws_endpoint"]) else "unhealthy"
+        print(f"{name}: {server['ws_endpoint']} ({status}, playwright {server['playwright_version']}, "
+              f"headless={server['headless']}, restarts={server['restarts']})")
+
+
+if __name__ == "__main__":
+    main()
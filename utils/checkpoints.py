@@ -0,0 +1,209 @@
+"""
+Journey checkpoints
+A journey is a named sequence of steps that many tests share as a prefix
+(log in -> open the first organization -> open the Add User modal). The first
+test to finish a step saves a checkpoint of it: the storage state, the URL and
+the values of the step's form fields. Later tests restore the furthest saved
+step up to the one they need, then run only the remaining steps. Restoring
+navigates straight to the saved URL, runs the step's cheap reenter action
+(e.g. reopening a modal) and refills the form.
+
+A checkpoint stops being used in three cases:
+- the source of a page object used by its steps changed
+- it is older than the maximum age
+- the step's validation fails after a restore
+"""
+import hashlib
+import inspect
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from playwright.sync_api import Error, Page
+
+from utils.auth_cache import apply_storage_state
+from utils.logger import get_default_logger
+
+logger = get_default_logger()
+
+CHECKBOX_TYPES = ("checkbox", "radio")
+READ_FIELD_SCRIPT = "el => ['checkbox', 'radio'].includes(el.type) ? el.checked : el.value"
+
+
+class Step:
+    """One step of a journey"""
+
+    def __init__(self, name: str, action: Callable[[Page], None], validate: Callable[[Page], None] = None,
+                 sources: Sequence[type] = (), form_fields: Sequence[str] = (),
+                 reenter: Callable[[Page], None] = None):
+        """
+        Args:
+            name: Checkpoint name, unique within the journey
+            action: Moves the page from the previous step to this one
+            validate: Raises (AssertionError or a Playwright error) when the page is not at this step
+            sources: Page object classes the step depends on; editing their source invalidates checkpoints
+            form_fields: Selectors of inputs whose values belong to the checkpoint
+            reenter: Recreates UI state a URL does not capture (e.g. an open modal) after a restore
+        """
+        self.name = name
+        self.action = action
+        self.validate = validate
+        self.sources = sources
+        self.form_fields = form_fields
+        self.reenter = reenter
+
+
+def get_source_fingerprint(classes: Sequence[type]) -> str:
+    """Hash the source files of classes and their project base classes"""
+    paths = set()
+    for cls in classes:
+        for base in inspect.getmro(cls):
+            if base.__module__ != "builtins":
+                paths.add(inspect.getsourcefile(base))
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class Journey:
+    """A named, ordered sequence of steps"""
+
+    def __init__(self, name: str, steps: List[Step]):
+        self.name = name
+        self.steps = steps
+        self.index = {step.name: position for position, step in enumerate(steps)}
+
+    def get_fingerprint(self, position: int) -> str:
+        """Fingerprint of every step up to a position, so an earlier step's change invalidates later checkpoints"""
+        classes = [cls for step in self.steps[:position + 1] for cls in step.sources]
+        return get_source_fingerprint(classes)
+
+
+class CheckpointStore:
+    """Checkpoints on disk, shared by the run's processes and by later runs"""
+
+    def __init__(self, directory: str, max_age_minutes: float, enabled: bool = True):
+        self.directory = directory
+        self.max_age_minutes = max_age_minutes
+        self.enabled = enabled
+
+    def _path(self, journey: str, step: str) -> str:
+        return os.path.join(self.directory, journey, f"{step}.json")
+
+    def load(self, journey: str, step: str, fingerprint: str) -> Optional[Dict]:
+        """Get a checkpoint if it exists, is fresh and matches the current page object source"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(journey, step)) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("fingerprint") != fingerprint:
+            logger.info(f"Checkpoint {journey}/{step} is outdated: its page objects changed")
+            self.invalidate(journey, step)
+            return None
+        if (time.time() - checkpoint["saved_at"]) / 60 > self.max_age_minutes:
+            self.invalidate(journey, step)
+            return None
+        return checkpoint
+
+    def save(self, journey: str, step: str, checkpoint: Dict):
+        """Write a checkpoint atomically"""
+        path = self._path(journey, step)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, journey: str, step: str):
+        """Delete a checkpoint"""
+        try:
+            os.remove(self._path(journey, step))
+        except OSError:
+            pass
+
+
+class JourneyRun:
+    """One page's progress through a journey"""
+
+    def __init__(self, journey: Journey, page: Page, store: CheckpointStore):
+        self.journey = journey
+        self.page = page
+        self.store = store
+        self.position = -1
+        self.events = []
+
+    def _capture(self, step: Step, position: int) -> Dict:
+        form = {}
+        for selector in step.form_fields:
+            form[selector] = self.page.locator(selector).evaluate(READ_FIELD_SCRIPT)
+        return {
+            "url": self.page.url,
+            "storage_state": self.page.context.storage_state(),
+            "form": form,
+            "fingerprint": self.journey.get_fingerprint(position),
+            "saved_at": time.time(),
+        }
+
+    def _restore(self, step: Step, checkpoint: Dict) -> bool:
+        context = self.page.context
+        context.clear_cookies()
+        context.add_cookies(checkpoint["storage_state"]["cookies"])
+        start = time.perf_counter()
+        try:
+            self.page.goto(checkpoint["url"])
+            origin_state = dict(checkpoint["storage_state"], cookies=[])
+            if any(entry["localStorage"] for entry in origin_state.get("origins", [])):
+                apply_storage_state(self.page, origin_state)
+                self.page.reload()
+            if step.reenter:
+                step.reenter(self.page)
+            for selector, value in checkpoint["form"].items():
+                field = self.page.locator(selector)
+                if field.get_attribute("type") in CHECKBOX_TYPES:
+                    field.set_checked(bool(value))
+                else:
+                    field.fill(value)
+            if step.validate:
+                step.validate(self.page)
+        except (AssertionError, Error) as e:
+            logger.warning(f"Checkpoint {self.journey.name}/{step.name} failed validation after restore: {e}")
+            self.events.append({"step": step.name, "event": "invalidated"})
+            return False
+        self.events.append({"step": step.name, "event": "restored",
+                            "duration": round(time.perf_counter() - start, 3)})
+        return True
+
+    def run_to(self, step_name: str) -> "JourneyRun":
+        """Bring the page to a step: restore the furthest usable checkpoint ahead of it, then run the rest"""
+        target = self.journey.index[step_name]
+        # Checkpoints at or before the current position are no faster than continuing from here
+        for position in range(target, self.position, -1):
+            step = self.journey.steps[position]
+            checkpoint = self.store.load(self.journey.name, step.name, self.journey.get_fingerprint(position))
+            if checkpoint is None:
+                continue
+            if self._restore(step, checkpoint):
+                self.position = position
+                break
+            self.store.invalidate(self.journey.name, step.name)
+            # A failed restore leaves the page in an unknown state, so start over
+            self.page.context.clear_cookies()
+            self.position = -1
+        for position in range(self.position + 1, target + 1):
+            step = self.journey.steps[position]
+            start = time.perf_counter()
+            step.action(self.page)
+            if step.validate:
+                step.validate(self.page)
+            if self.store.enabled:
+                self.store.save(self.journey.name, step.name, self._capture(step, position))
+            self.events.append({"step": step.name, "event": "ran",
+                                "duration": round(time.perf_counter() - start, 3)})
+            self.position = position
+        return self
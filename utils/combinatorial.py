@@ -0,0 +1,133 @@
+"""
+Combinatorial test case generation
+Builds covering arrays (pairwise or n-wise) so every combination of values
+across any `strength` parameters is exercised by at least one case, using far
+fewer cases than the full cartesian product
+"""
+import itertools
+import random
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+import pytest
+
+
+def _get_uncovered(value_counts: List[int], strength: int) -> Set[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    """Enumerate every (parameter combination, value combination) to cover"""
+    uncovered = set()
+    for params in itertools.combinations(range(len(value_counts)), strength):
+        for values in itertools.product(*(range(value_counts[p]) for p in params)):
+            uncovered.add((params, values))
+    return uncovered
+
+
+def _covered_by(row: List[int], strength: int) -> Set[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    """Get every t-tuple covered by a complete row"""
+    return {
+        (params, tuple(row[p] for p in params))
+        for params in itertools.combinations(range(len(row)), strength)
+    }
+
+
+def _build_candidate(value_counts: List[int], strength: int, uncovered: Set, rng: random.Random) -> List[int]:
+    """Greedily build one row, seeded with an uncovered tuple (AETG)"""
+    row = [None] * len(value_counts)
+    params, values = rng.choice(sorted(uncovered))
+    for p, v in zip(params, values):
+        row[p] = v
+
+    remaining = [p for p in range(len(value_counts)) if row[p] is None]
+    rng.shuffle(remaining)
+    for p in remaining:
+        assigned = [q for q in range(len(row)) if row[q] is not None]
+        best_value, best_gain = 0, -1
+        for v in range(value_counts[p]):
+            gain = 0
+            for others in itertools.combinations(assigned, strength - 1):
+                combo = tuple(sorted(others + (p,)))
+                key_values = tuple(v if q == p else row[q] for q in combo)
+                if (combo, key_values) in uncovered:
+                    gain += 1
+            if gain > best_gain or (gain == best_gain and rng.random() < 0.5):
+                best_value, best_gain = v, gain
+        row[p] = best_value
+    return row
+
+
+def generate_covering_array(parameters: Dict[str, Sequence[Any]], strength: int = 2,
+                            candidates: int = 30, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate a covering array for the given parameters
+
+    Args:
+        parameters: Parameter names mapped to their possible values
+        strength: Interaction strength (2 for pairwise, 3 for 3-wise, ...)
+        candidates: Candidate rows evaluated per added row; more gives smaller arrays
+        seed: Random seed, so the same catalogs always produce the same cases
+
+    Returns:
+        List of configurations, each mapping every parameter to one value
+    """
+    names = list(parameters)
+    value_lists = [list(parameters[name]) for name in names]
+    if any(not values for values in value_lists):
+        raise ValueError("Every parameter needs at least one value")
+    if strength < 1:
+        raise ValueError("strength must be at least 1")
+    if strength >= len(names):
+        return [dict(zip(names, combo)) for combo in itertools.product(*value_lists)]
+
+    value_counts = [len(values) for values in value_lists]
+    uncovered = _get_uncovered(value_counts, strength)
+    rng = random.Random(seed)
+    rows = []
+    while uncovered:
+        best_row, best_covered = None, set()
+        for _ in range(candidates):
+            row = _build_candidate(value_counts, strength, uncovered, rng)
+            covered = _covered_by(row, strength) & uncovered
+            if len(covered) > len(best_covered):
+                best_row, best_covered = row, covered
+        rows.append(best_row)
+        uncovered -= best_covered
+
+    return [
+        {name: value_lists[i][value] for i, (name, value) in enumerate(zip(names, row))}
+        for row in rows
+    ]
+
+
+def get_missing_interactions(rows: List[Dict[str, Any]], parameters: Dict[str, Sequence[Any]],
+                             strength: int = 2) -> List[Dict[str, Any]]:
+    """Get every value combination of `strength` parameters not covered by the rows"""
+    missing = []
+    names = list(parameters)
+    for params in itertools.combinations(names, min(strength, len(names))):
+        seen = {tuple(row[p] for p in params) for row in rows}
+        for values in itertools.product(*(parameters[p] for p in params)):
+            if values not in seen:
+                missing.append(dict(zip(params, values)))
+    return missing
+
+
+def generate_configuration_cases(user_types: Sequence[str], catalog: Sequence[str],
+                                 strength: int = 2, seed: int = 0) -> List[Any]:
+    """
+    Generate parametrized cases of (user_type, settings) for a boolean settings catalog
+
+    Args:
+        user_types: User types the settings are configured for
+        catalog: Setting names (permissions or visibility elements), each on or off
+        strength: Interaction strength across the user type and settings
+        seed: Random seed for reproducible cases
+
+    Returns:
+        pytest.param cases usable with @pytest.mark.parametrize("user_type,settings", ...)
+    """
+    parameters = {"user_type": list(user_types)}
+    parameters.update({name: [True, False] for name in catalog})
+    cases = []
+    for index, row in enumerate(generate_covering_array(parameters, strength=strength, seed=seed)):
+        user_type = row.pop("user_type")
+        enabled = "+".join(name for name, value in row.items() if value) or "none"
+        cases.append(pytest.param(user_type, row, id=f"{index}-{user_type}-{enabled}"))
+    return cases
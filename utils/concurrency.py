@@ -0,0 +1,297 @@
+"""
+Concurrency conflict tester
+Fires the same write from N browser contexts at the same moment and checks the
+app's invariants under the race. Each context runs in its own thread with its
+own Playwright instance (the sync API is bound to the thread that started it),
+logs in, then prepares the write up to its last click: the steps of
+OrganizationsPage.create_admin_user or UserTypePage.create_user_type before
+submit. A barrier releases every context's submit at once. Each outcome is
+classified from the toast or message the app shows, and the invariants are
+checked per round:
+- exactly one context succeeded for the round's key (email or user type name)
+- every other context was told why (no timeouts or silent failures)
+- the key appears exactly once in the grid afterwards
+A single-context baseline round runs first, so latency under contention can be
+compared with latency alone. Runs against the local stand-in (DevelopmentConfig)
+unless --base-url says otherwise
+
+Usage:
+    python -m utils.concurrency admin_user [--contexts 5] [--rounds 3] [--base-url http://localhost:3000]
+    python -m utils.concurrency user_type
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Dict, List
+from uuid import uuid4
+
+from playwright.sync_api import Error, Page, TimeoutError as PlaywrightTimeoutError, sync_playwright
+
+from config.config import get_config
+from pages.journeys import QA_AUTOMATION_EMAIL
+from pages.login_page import LoginPage
+from pages.organizations_page import OrganizationsPage
+from pages.user_type_page import UserTypePage
+from utils.helpers import describe
+from utils.logger import get_default_logger
+
+config = get_config()
+logger = get_default_logger()
+
+SUCCESS = "success"
+ERROR = "error"
+TIMEOUT = "timeout"
+EXCEPTION = "exception"
+
+WRITE_METHODS = ("POST", "PUT", "PATCH")
+
+
+class AdminUserWrite:
+    """OrganizationsPage.create_admin_user, split at the submit click"""
+
+    name = "admin_user"
+
+    def __init__(self, page: Page):
+        self.organizations_page = OrganizationsPage(page)
+
+    def open(self):
+        self.organizations_page.open_first_organization()
+
+    def prepare(self, key: str):
+        self.organizations_page.open_add_user_modal()
+        self.organizations_page.fill_user_form({"first_name": "Race", "last_name": "Condition", "email": key})
+
+    def fire(self):
+        self.organizations_page.submit_user_form()
+
+    def read_outcome(self, timeout: int) -> Dict:
+        message = self.organizations_page.wait_for_toast(timeout=timeout)["text"]
+        return {"outcome": SUCCESS if "success" in message.lower() else ERROR, "message": message}
+
+    def count(self, key: str) -> int:
+        page = self.organizations_page.page
+        page.reload()
+        page.wait_for_load_state("networkidle")
+        return page.locator(f'{self.organizations_page.USERS_GRID} tr:has-text("{key}")').count()
+
+
+class UserTypeWrite:
+    """UserTypePage.create_user_type, split at the save click"""
+
+    name = "user_type"
+
+    def __init__(self, page: Page):
+        self.user_type_page = UserTypePage(page)
+
+    def open(self):
+        self.user_type_page.navigate_to("/user-types")
+
+    def prepare(self, key: str):
+        self.user_type_page.click_create_user_type()
+        self.user_type_page.fill_user_type_form(key, "Created by the concurrency conflict tester")
+
+    def fire(self):
+        self.user_type_page.click_save()
+
+    def read_outcome(self, timeout: int) -> Dict:
+        page = self.user_type_page.page
+        message = page.locator(f"{UserTypePage.SUCCESS_MESSAGE}, {UserTypePage.ERROR_MESSAGE}").first
+        message.wait_for(timeout=timeout)
+        succeeded = page.locator(UserTypePage.SUCCESS_MESSAGE).first.is_visible()
+        return {"outcome": SUCCESS if succeeded else ERROR, "message": message.inner_text().strip()}
+
+    def count(self, key: str) -> int:
+        page = self.user_type_page.page
+        page.reload()
+        return page.locator(f"{UserTypePage.USER_TYPE_TABLE} tr:has-text('{key}')").count()
+
+
+OPERATIONS = {operation.name: operation for operation in (AdminUserWrite, UserTypeWrite)}
+
+
+def make_key(operation: str, run_id: str, label) -> str:
+    """The value every context writes in a round, unique to the run and round"""
+    if operation == AdminUserWrite.name:
+        return f"race-{run_id}-{label}@bodegaai.com"
+    return f"Race {run_id} {label}"
+
+
+class ConflictRun:
+    """N contexts writing the same keys, one round at a time"""
+
+    def __init__(self, operation: str, contexts: int, keys: List[str], base_url: str):
+        self.operation = OPERATIONS[operation]
+        self.contexts = contexts
+        self.keys = keys
+        self.base_url = base_url
+        self.barrier = threading.Barrier(contexts)
+        self.outcomes = [[None] * contexts for _ in keys]
+        self.counts = [None] * len(keys)
+        self.errors = []
+
+    def _worker(self, index: int):
+        with sync_playwright() as p:
+            browser = getattr(p, config.BROWSER).launch(**config.get_browser_config())
+            try:
+                context = browser.new_context(**config.get_context_config(), base_url=self.base_url)
+                page = context.new_page()
+                writes = []
+                page.on("response", lambda response: writes.append(response)
+                        if response.request.method in WRITE_METHODS else None)
+                login_page = LoginPage(page)
+                login_page.navigate_to(self.base_url)
+                login_page.login_with_email_verification(QA_AUTOMATION_EMAIL)
+                operation = self.operation(page)
+                operation.open()
+                for round_index, key in enumerate(self.keys):
+                    operation.prepare(key)
+                    writes.clear()
+                    self.barrier.wait()
+                    released = time.perf_counter()
+                    try:
+                        operation.fire()
+                        result = operation.read_outcome(config.ACTION_TIMEOUT)
+                    except PlaywrightTimeoutError as e:
+                        result = {"outcome": TIMEOUT, "message": str(e).splitlines()[0]}
+                    except Error as e:
+                        result = {"outcome": EXCEPTION, "message": str(e).splitlines()[0]}
+                    result.update(context=index, released_at=released,
+                                  latency=round(time.perf_counter() - released, 3),
+                                  write_statuses=[response.status for response in writes])
+                    self.outcomes[round_index][index] = result
+                    # Everyone has an outcome before the grid is counted and the next round is prepared
+                    self.barrier.wait()
+                    if index == 0:
+                        self.counts[round_index] = operation.count(key)
+                    operation.open()
+            finally:
+                browser.close()
+
+    def _run_worker(self, index: int):
+        try:
+            self._worker(index)
+        except threading.BrokenBarrierError:
+            pass
+        except Exception as e:
+            logger.error(f"Context {index} failed: {e}")
+            self.errors.append({"context": index, "error": f"{type(e).__name__}: {e}"})
+            # Release the other contexts instead of leaving them waiting at the barrier
+            self.barrier.abort()
+
+    def run(self) -> List[Dict]:
+        """Run every round and return one result per round"""
+        threads = [threading.Thread(target=self._run_worker, args=(index,)) for index in range(self.contexts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [get_round_result(key, outcomes, count)
+                for key, outcomes, count in zip(self.keys, self.outcomes, self.counts)]
+
+
+def is_reachable(base_url: str) -> bool:
+    """Whether the app answers at all (the local stand-in is not always running)"""
+    try:
+        urllib.request.urlopen(base_url, timeout=5)
+    except urllib.error.HTTPError:
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+    return True
+
+
+def get_round_result(key: str, outcomes: List[Dict], count: int) -> Dict:
+    """Check a round's invariants"""
+    finished = [outcome for outcome in outcomes if outcome is not None]
+    successes = [outcome for outcome in finished if outcome["outcome"] == SUCCESS]
+    unexplained = [outcome for outcome in finished if outcome["outcome"] in (TIMEOUT, EXCEPTION)]
+    violations = []
+    if len(finished) < len(outcomes):
+        violations.append(f"{len(outcomes) - len(finished)} context(s) never reported an outcome")
+    if len(successes) != 1:
+        violations.append(f"{len(successes)} successful writes of {key}, expected exactly 1")
+    if unexplained:
+        violations.append(f"{len(unexplained)} context(s) got no success or error message: "
+                          f"{'; '.join(outcome['message'] for outcome in unexplained)}")
+    if count is not None and count != 1:
+        violations.append(f"{key} appears {count} times in the grid, expected once")
+    released = [outcome["released_at"] for outcome in finished]
+    return {
+        "key": key,
+        "outcomes": [{name: value for name, value in outcome.items() if name != "released_at"} for outcome in finished],
+        "grid_count": count,
+        "release_skew_ms": round((max(released) - min(released)) * 1000, 1) if released else None,
+        "latency": describe([outcome["latency"] for outcome in finished]),
+        "violations": violations,
+    }
+
+
+def run_conflicts(operation: str, contexts: int, rounds: int, base_url: str) -> Dict:
+    """Run a single-context baseline round, then the contended rounds"""
+    run_id = uuid4().hex[:6]
+    print(f"Baseline: one context writing {operation}")
+    baseline = ConflictRun(operation, 1, [make_key(operation, run_id, "solo")], base_url)
+    baseline_rounds = baseline.run()
+    print(f"Contention: {contexts} contexts x {rounds} round(s) writing {operation}")
+    contended = ConflictRun(operation, contexts, [make_key(operation, run_id, index) for index in range(rounds)], base_url)
+    contended_rounds = contended.run()
+    baseline_latency = baseline_rounds[0]["latency"]
+    contended_latency = describe([outcome["latency"] for result in contended_rounds for outcome in result["outcomes"]])
+    slowdown = None
+    if baseline_latency.get("median") and contended_latency.get("median"):
+        slowdown = round(contended_latency["median"] / baseline_latency["median"], 2)
+    return {
+        "operation": operation,
+        "base_url": base_url,
+        "contexts": contexts,
+        "baseline": baseline_rounds[0],
+        "rounds": contended_rounds,
+        "latency": {"baseline": baseline_latency, "contended": contended_latency, "median_slowdown": slowdown},
+        "errors": baseline.errors + contended.errors,
+        "violations": [violation for result in contended_rounds for violation in result["violations"]],
+    }
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Race the same write from several browser contexts")
+    parser.add_argument("operation", choices=list(OPERATIONS))
+    parser.add_argument("--contexts", type=int, default=config.CONCURRENCY_CONTEXTS, help="Contexts racing per round")
+    parser.add_argument("--rounds", type=int, default=config.CONCURRENCY_ROUNDS, help="Contended rounds, one key each")
+    parser.add_argument("--base-url", default=config.CONCURRENCY_BASE_URL, help="App under test (default: the local stand-in)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    report = run_conflicts(args.operation, args.contexts, args.rounds, args.base_url)
+
+    os.makedirs(config.REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(config.REPORT_DIR, f"concurrency_{args.operation}.json")
+    with open(report_path, "w") as f:
+        json.dump(dict(report, generated_at=datetime.now().isoformat()), f, indent=2)
+
+    print(f"\n{'round key':<44} {'ok':>3} {'err':>4} {'other':>6} {'grid':>5} {'skew ms':>8} {'median s':>9} {'max s':>7}")
+    for result in [report["baseline"]] + report["rounds"]:
+        outcomes = [outcome["outcome"] for outcome in result["outcomes"]]
+        other = len(outcomes) - outcomes.count(SUCCESS) - outcomes.count(ERROR)
+        grid = "-" if result["grid_count"] is None else result["grid_count"]
+        print(f"{result['key']:<44} {outcomes.count(SUCCESS):>3} {outcomes.count(ERROR):>4} {other:>6} {grid:>5} "
+              f"{result['release_skew_ms'] or 0.0:>8.1f} {result['latency'].get('median', 0.0):>9.3f} "
+              f"{result['latency'].get('max', 0.0):>7.3f}")
+    latency = report["latency"]
+    print(f"Median latency: {latency['baseline'].get('median', 0.0):.3f}s alone, "
+          f"{latency['contended'].get('median', 0.0):.3f}s under contention (x{latency['median_slowdown'] or '-'})")
+    for violation in report["violations"]:
+        print(f"VIOLATION: {violation}")
+    for error in report["errors"]:
+        print(f"ERROR: context {error['context']}: {error['error']}")
+    print(f"Report: {report_path}")
+    sys.exit(1 if report["violations"] or report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
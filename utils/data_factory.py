@@ -0,0 +1,165 @@
+"""
+Collision-free test data
+Every value a test writes to the app carries an id that is unique across
+processes, workers and runs: a namespace made of a hash of the run id, the
+xdist worker and the process id, followed by a per-process counter. Two tests
+in the same second, on different workers or in overlapping runs never produce
+the same email or name, so "already exists" only ever comes from the test's
+own scenario.
+
+Users are drawn from pools built in bulk when the factory is created: valid
+name and phone combinations, plus edge-case names (apostrophes, hyphens,
+accents, long and short names). Drawing a user during a test is a pop from a
+queue. A pool that runs dry is refilled with another batch.
+
+Usage:
+    data_factory.email("testadmin")           # testadmin-k3f9a-w0x2p-1f@bodegaai.com
+    data_factory.user(minimal=True)           # first_name, last_name, email
+    data_factory.user(edge_case="apostrophe") # O'Brien Smith-Jones
+"""
+import hashlib
+import itertools
+import os
+import random
+import re
+import string
+from collections import deque
+from typing import Dict, Optional
+
+from config.config import get_config
+from utils.run_context import get_run_id, get_worker_id
+
+config = get_config()
+
+FIRST_NAMES = ["Test", "Ana", "Liam", "Maya", "Noah", "Zoe", "Omar", "Ivy", "Leo", "Nina",
+               "Ravi", "Elena", "Sam", "Grace", "Yusuf", "Hana", "Diego", "Chloe", "Kofi", "Lena"]
+LAST_NAMES = ["Admin", "Garcia", "Nguyen", "Patel", "Smith", "Kim", "Okafor", "Rossi", "Cohen",
+              "Silva", "Murphy", "Tanaka", "Haddad", "Novak", "Larsen", "Mensah", "Dubois", "Khan"]
+
+# Valid names that commonly break quoting, validation or layout
+EDGE_CASE_NAMES = {
+    "apostrophe": [("O'Brien", "Smith-Jones"), ("D'Angelo", "O'Connor")],
+    "hyphenated": [("Mary-Jane", "Watson-Parker"), ("Jean-Luc", "Lévy-Martin")],
+    "accented": [("José", "Núñez"), ("Zoë", "Müller"), ("François", "Béringer")],
+    "long": [("VeryLongFirstNameThatIsStillValid", "VeryLongLastNameThatIsStillValid"),
+             ("Maximiliana", "Wolfeschlegelsteinhausenbergerdorff")],
+    "short": [("Al", "Li"), ("Bo", "Wu")],
+    "spaces": [("Mary Ann", "Van der Berg"), ("Juan Carlos", "De la Cruz")],
+}
+
+_factory = None
+
+
+def to_base36(number: int) -> str:
+    """Short lowercase representation of a non-negative integer"""
+    digits = string.digits + string.ascii_lowercase
+    encoded = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        encoded = digits[remainder] + encoded
+        if not number:
+            return encoded
+
+
+def get_namespace(run_id: str, worker_id: str, pid: int) -> str:
+    """Namespace of one process: the run (hashed short), the xdist worker and the process"""
+    run = to_base36(int(hashlib.sha1(run_id.encode()).hexdigest(), 16))[:5]
+    worker = worker_id.replace("gw", "w") if worker_id != "main" else "m"
+    return f"{run}-{worker}{to_base36(pid)}"
+
+
+def get_email_local_part(first_name: str, last_name: str) -> str:
+    """ASCII email prefix from a name (o'brien.smith-jones -> obrien.smith-jones)"""
+    prefix = f"{first_name}.{last_name}".lower().replace(" ", "")
+    return re.sub(r"[^a-z0-9.-]", "", prefix.encode("ascii", "ignore").decode())[:40] or "user"
+
+
+class DataFactory:
+    """Unique ids and prebuilt pools of users for one process"""
+
+    def __init__(self, namespace: str, pool_size: int = 200, domain: str = "bodegaai.com"):
+        self.namespace = namespace
+        self.pool_size = pool_size
+        self.domain = domain
+        self._counter = itertools.count(1)
+        self._random = random.Random(namespace)
+        self._users = deque()
+        self._edge_cases = {case: deque() for case in EDGE_CASE_NAMES}
+        self._phones = [f"(555) {self._random.randint(200, 999)}-{self._random.randint(0, 9999):04d}"
+                        for _ in range(pool_size)]
+        self._fill_valid()
+        for case in EDGE_CASE_NAMES:
+            self._fill_edge_case(case)
+
+    def _fill_valid(self):
+        names = list(itertools.product(FIRST_NAMES, LAST_NAMES))
+        self._random.shuffle(names)
+        self._users.extend(self._build_user(first, last)
+                           for first, last in itertools.islice(itertools.cycle(names), self.pool_size))
+
+    def _fill_edge_case(self, case: str):
+        per_case = max(self.pool_size // len(EDGE_CASE_NAMES), 1)
+        self._edge_cases[case].extend(self._build_user(first, last)
+                                      for first, last in itertools.islice(itertools.cycle(EDGE_CASE_NAMES[case]), per_case))
+
+    def _build_user(self, first_name: str, last_name: str) -> Dict:
+        return {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": self.email(get_email_local_part(first_name, last_name)),
+            "phone": self._random.choice(self._phones),
+            "notifications_enabled": self._random.random() < 0.5,
+            "is_owner": False,
+        }
+
+    def unique_id(self) -> str:
+        """An id no other process, worker or run produces; ids from one process increase monotonically"""
+        return f"{self.namespace}-{to_base36(next(self._counter))}"
+
+    def unique_name(self, prefix: str = "test") -> str:
+        """A unique name, e.g. for a user type"""
+        return f"{prefix}_{self.unique_id()}"
+
+    def email(self, prefix: str = "test") -> str:
+        """A unique email address"""
+        return f"{prefix}-{self.unique_id()}@{self.domain}"
+
+    def phone(self) -> str:
+        """A valid phone number from the pool"""
+        return self._random.choice(self._phones)
+
+    def user(self, edge_case: Optional[str] = None, minimal: bool = False, **overrides) -> Dict:
+        """
+        Take a user from the pool, in OrganizationsPage.fill_user_form's format
+
+        Args:
+            edge_case: Take from an edge-case pool (a key of EDGE_CASE_NAMES) instead of the valid pool
+            minimal: Keep only the required fields (first name, last name, email)
+            overrides: Fields to set on the user
+        """
+        if edge_case is not None and edge_case not in EDGE_CASE_NAMES:
+            raise ValueError(f"Unknown edge case '{edge_case}', expected one of {list(EDGE_CASE_NAMES)}")
+        pool = self._users if edge_case is None else self._edge_cases[edge_case]
+        if not pool:
+            if edge_case is None:
+                self._fill_valid()
+            else:
+                self._fill_edge_case(edge_case)
+        user = pool.popleft()
+        if minimal:
+            user = {field: user[field] for field in ("first_name", "last_name", "email")}
+        user.update(overrides)
+        return user
+
+    def get_pool_sizes(self) -> Dict[str, int]:
+        """Users left in each pool"""
+        return dict({"valid": len(self._users)}, **{case: len(pool) for case, pool in self._edge_cases.items()})
+
+
+def get_data_factory() -> DataFactory:
+    """Get this process's data factory, building its pools on first use"""
+    global _factory
+    if _factory is None:
+        namespace = get_namespace(get_run_id(), get_worker_id(), os.getpid())
+        _factory = DataFactory(namespace, config.TEST_DATA_POOL_SIZE, config.TEST_DATA_EMAIL_DOMAIN)
+    return _factory
@@ -0,0 +1,201 @@
+"""
+HAR record-and-replay utilities
+Records each test's network traffic into a per-test HAR file and replays it
+through context routes so tests can run without the live ISO2 backend
+"""
+import base64
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from playwright.sync_api import Request, Route
+
+# Hop-by-hop and encoding headers that no longer describe the decoded HAR body
+DROPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+FALLBACK_POLICIES = ("network", "abort", "fail")
+
+
+def get_har_path(har_dir: str, nodeid: str) -> str:
+    """Build the HAR file path for a test node id"""
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid.replace("::", "__")).strip("_")
+    return os.path.join(har_dir, f"{safe_name}.har")
+
+
+class HarMatcher:
+    """Normalizes requests so volatile values (timestamps, cache busters) don't break matching"""
+
+    PLACEHOLDER = "{ignored}"
+
+    def __init__(self, ignore_patterns: List[str], match_body: bool = True):
+        self.patterns = [re.compile(pattern) for pattern in ignore_patterns]
+        self.match_body = match_body
+
+    def normalize(self, text: Optional[str]) -> str:
+        """Replace every ignored value with a placeholder"""
+        if not text:
+            return ""
+        for pattern in self.patterns:
+            text = pattern.sub(self.PLACEHOLDER, text)
+        return text
+
+    def find_ignored(self, text: Optional[str]) -> List[str]:
+        """Get the ignored values in the order they appear"""
+        if not text:
+            return []
+        values = []
+        for pattern in self.patterns:
+            values.extend(match.group(0) for match in pattern.finditer(text))
+        return values
+
+    def key(self, method: str, url: str, post_data: Optional[str] = None) -> Tuple[str, str, str]:
+        """Build the lookup key for a request"""
+        body = self.normalize(post_data) if self.match_body else ""
+        return method.upper(), self.normalize(url), body
+
+
+class HarReplayer:
+    """Serves recorded responses from a HAR file through a context route"""
+
+    def __init__(self, har_path: str, matcher: HarMatcher, fallback: str = "abort"):
+        if fallback not in FALLBACK_POLICIES:
+            raise ValueError(f"Unknown HAR fallback policy '{fallback}', expected one of {FALLBACK_POLICIES}")
+        self.har_path = har_path
+        self.matcher = matcher
+        self.fallback = fallback
+        self.entries = []
+        self.exact_index = defaultdict(list)
+        self.loose_index = defaultdict(list)
+        self.used = set()
+        self.unmatched = []
+        self.substitutions = {}
+        self.load()
+
+    def load(self):
+        """Load and index the HAR entries"""
+        if not os.path.exists(self.har_path):
+            return
+        with open(self.har_path, encoding="utf-8") as f:
+            har = json.load(f)
+        self.entries = har.get("log", {}).get("entries", [])
+        for position, entry in enumerate(self.entries):
+            request = entry["request"]
+            post_data = (request.get("postData") or {}).get("text")
+            method, url, body = self.matcher.key(request["method"], request["url"], post_data)
+            self.exact_index[(method, url, body)].append(position)
+            self.loose_index[(method, url)].append(position)
+
+    @property
+    def exists(self) -> bool:
+        """Whether a recording exists for this test"""
+        return os.path.exists(self.har_path)
+
+    def get_age_days(self) -> Optional[float]:
+        """Get the recording age in days"""
+        if not self.exists:
+            return None
+        return (time.time() - os.path.getmtime(self.har_path)) / 86400
+
+    def _find(self, method: str, url: str, post_data: Optional[str]) -> Optional[int]:
+        key = self.matcher.key(method, url, post_data)
+        candidates = self.exact_index.get(key) or self.loose_index.get(key[:2]) or []
+        # Serve repeated requests in recorded order, then keep serving the last one
+        for position in candidates:
+            if position not in self.used:
+                return position
+        return candidates[-1] if candidates else None
+
+    def _learn_substitutions(self, entry: Dict, url: str, post_data: Optional[str]):
+        """Map recorded volatile values to the live ones so responses echo the live values"""
+        recorded = entry["request"]
+        recorded_text = recorded["url"] + ((recorded.get("postData") or {}).get("text") or "")
+        recorded_values = self.matcher.find_ignored(recorded_text)
+        live_values = self.matcher.find_ignored(url + (post_data or ""))
+        if len(recorded_values) == len(live_values):
+            for old, new in zip(recorded_values, live_values):
+                if old != new:
+                    self.substitutions[old] = new
+
+    def _build_body(self, content: Dict) -> bytes:
+        text = content.get("text", "")
+        if content.get("encoding") == "base64":
+            return base64.b64decode(text)
+        for old, new in self.substitutions.items():
+            text = text.replace(old, new)
+        return text.encode("utf-8")
+
+    def handle(self, route: Route, request: Request):
+        """Route handler fulfilling requests from the HAR"""
+        post_data = request.post_data
+        position = self._find(request.method, request.url, post_data)
+        if position is None:
+            self.unmatched.append({"method": request.method, "url": request.url})
+            if self.fallback == "network":
+                route.fallback()
+            else:
+                route.abort()
+            return
+
+        self.used.add(position)
+        entry = self.entries[position]
+        self._learn_substitutions(entry, request.url, post_data)
+        response = entry["response"]
+        headers = {
+            header["name"]: header["value"]
+            for header in response.get("headers", [])
+            if header["name"].lower() not in DROPPED_RESPONSE_HEADERS
+        }
+        route.fulfill(
+            status=response["status"],
+            headers=headers,
+            body=self._build_body(response.get("content", {})),
+        )
+
+    def get_summary(self, max_age_days: float) -> Dict:
+        """Summarize how well the recording served this test"""
+        age_days = self.get_age_days()
+        return {
+            "har": self.har_path,
+            "exists": self.exists,
+            "age_days": round(age_days, 2) if age_days is not None else None,
+            "stale": age_days is None or age_days > max_age_days,
+            "entries": len(self.entries),
+            "matched": len(self.used),
+            "unused": len(self.entries) - len(self.used),
+            "unmatched": self.unmatched,
+        }
+
+
+class HarReplayReport:
+    """Collects per-test replay summaries and writes the staleness report"""
+
+    def __init__(self, har_dir: str, max_age_days: float):
+        self.har_dir = har_dir
+        self.max_age_days = max_age_days
+        self.tests = {}
+
+    def add(self, nodeid: str, replayer: HarReplayer):
+        """Record a test's replay summary"""
+        self.tests[nodeid] = replayer.get_summary(self.max_age_days)
+
+    def write(self) -> Optional[str]:
+        """Write the report and return its path"""
+        if not self.tests:
+            return None
+        os.makedirs(self.har_dir, exist_ok=True)
+        report_path = os.path.join(self.har_dir, "replay_report.json")
+        report = {
+            "generated_at": datetime.now().isoformat(),
+            "max_age_days": self.max_age_days,
+            "missing": sorted(nodeid for nodeid, test in self.tests.items() if not test["exists"]),
+            "stale": sorted(nodeid for nodeid, test in self.tests.items() if test["exists"] and test["stale"]),
+            "with_unmatched_requests": sorted(nodeid for nodeid, test in self.tests.items() if test["unmatched"]),
+            "tests": self.tests,
+        }
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        return report_path
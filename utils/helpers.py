@@ -1,10 +1,18 @@
 """
 Helper utilities for test automation
 """
+import os
 import random
+import statistics
 import string
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.config import get_config
+from utils.data_factory import get_data_factory
+
+# pytest exit codes of a run with nothing wrong: all passed, nothing selected
+PASSING_EXIT_CODES = {0, 5}
 
 
 def generate_random_string(length: int = 10) -> str:
@@ -13,9 +21,8 @@ def generate_random_string(length: int = 10) -> str:
 
 
 def generate_unique_name(prefix: str = "test") -> str:
-    """Generate a unique name with timestamp"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{prefix}_{timestamp}"
+    """Generate a name unique across processes, workers and runs (see utils.data_factory)"""
+    return get_data_factory().unique_name(prefix)
 
 
 def generate_email(username: Optional[str] = None) -> str:
@@ -29,6 +36,9 @@ def wait_for_condition(condition_func, timeout: int = 10, interval: float = 0.5)
     """
     Wait for a condition to be true
     
+    Polls from Python, so for page state prefer utils.waits, which reacts
+    to DOM, URL and network events as they happen
+    
     Args:
         condition_func: Function that returns boolean
         timeout: Maximum time to wait in seconds
@@ -64,3 +74,56 @@ def format_date(date_format: str = "%Y-%m-%d") -> str:
 def format_datetime(datetime_format: str = "%Y-%m-%d %H:%M:%S") -> str:
     """Get current datetime in specified format"""
     return datetime.now().strftime(datetime_format)
+
+
+def get_artifact_dir(base_dir: str, engine: str) -> str:
+    """Namespace an artifact directory by engine when BROWSER_MATRIX runs several engines"""
+    if len(get_config().BROWSER_MATRIX) > 1:
+        return os.path.join(base_dir, engine)
+    return base_dir
+
+
+def is_xdist_controller(config) -> bool:
+    """Whether a pytest process only dispatches tests to xdist workers"""
+    return not hasattr(config, "workerinput") and bool(getattr(config.option, "numprocesses", None))
+
+
+class TeardownClock:
+    """Records when each fixture's teardown starts, for pytest_fixture_setup / pytest_fixture_post_finalizer hooks"""
+
+    def __init__(self, now: Callable[[], float]):
+        self.now = now
+        self._starts = {}
+
+    def arm(self, fixturedef):
+        """Call once the fixture is set up"""
+        # Finalizers run last-in first-out, so this one marks the start of the fixture's teardown
+        key = id(fixturedef)
+        fixturedef.addfinalizer(lambda: self._starts.__setitem__(key, self.now()))
+
+    def pop_start(self, fixturedef) -> Optional[float]:
+        """When the fixture's teardown started, or None if it was never armed"""
+        return self._starts.pop(id(fixturedef), None)
+
+
+def describe(samples: List[float]) -> Dict:
+    """Summary statistics of a list of samples (durations, latencies, counts)"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.mean(ordered), 3),
+        "median": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+        "min": round(ordered[0], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def split_passthrough_args(argv: List[str]) -> Tuple[List[str], List[str]]:
+    """Split command line arguments at "--" into a tool's own arguments and those passed on to pytest"""
+    if "--" in argv:
+        index = argv.index("--")
+        return argv[:index], argv[index + 1:]
+    return argv, []
@@ -20,6 +20,9 @@ def setup_logger(name: str, log_file: str = None, level=logging.INFO):
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    # Every module asks for the logger at import; add the handlers (and the run log file) once
+    if logger.handlers:
+        return logger
     
     # Create formatters
     formatter = logging.Formatter(
@@ -0,0 +1,120 @@
+"""
+Per-test network accounting
+Passively records every request a context makes and summarizes it at the end
+of the test: request count, transferred bytes, requests per resource type,
+duplicate requests and the slowest endpoints. Budgets per marker (smoke,
+admin, crud) cap the requests and bytes a test may use
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Error, Request
+
+MB = 1024 * 1024
+
+# Result property holding each test's network summary
+NETWORK_PROPERTY = "network"
+
+# Path segments that identify a record rather than an endpoint
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36}|[0-9a-fA-F]{24})$")
+
+
+def get_endpoint(method: str, url: str) -> str:
+    """Group a request by endpoint: method, host and path with ids replaced"""
+    parts = urlsplit(url)
+    path = "/".join("{id}" if ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/"))
+    return f"{method} {parts.netloc}{path}"
+
+
+class NetworkRecorder:
+    """Records the requests of one context from its network events"""
+
+    def __init__(self, context: BrowserContext):
+        self.finished = []
+        self.failed = []
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self.failed.append)
+
+    def _on_finished(self, request: Request):
+        # Sizes and timing are read now: closing the page disposes its requests
+        self.finished.append({
+            "resource_type": request.resource_type,
+            "method": request.method,
+            "url": request.url,
+            "bytes": self._get_transfer_bytes(request),
+            # responseEnd is relative to startTime and -1 when the browser has no timing (e.g. routed responses)
+            "duration": request.timing.get("responseEnd", -1),
+        })
+
+    @staticmethod
+    def _get_transfer_bytes(request: Request) -> int:
+        try:
+            sizes = request.sizes()
+        except Error:
+            return 0
+        return sum(max(sizes.get(key, 0), 0) for key in (
+            "requestHeadersSize", "requestBodySize", "responseHeadersSize", "responseBodySize"))
+
+    def get_summary(self, top_n: int = 5) -> Dict:
+        """
+        Summarize the recorded traffic
+
+        Returns:
+            Counts, bytes, duplicate requests and slowest endpoints
+        """
+        by_type = Counter()
+        repeated = Counter()
+        endpoint_ms = defaultdict(list)
+        total_bytes = 0
+        for request in self.finished:
+            by_type[request["resource_type"]] += 1
+            repeated[(request["method"], request["url"])] += 1
+            total_bytes += request["bytes"]
+            if request["duration"] >= 0:
+                endpoint_ms[get_endpoint(request["method"], request["url"])].append(request["duration"])
+
+        duplicates = sorted(
+            ({"request": f"{method} {url}", "count": count} for (method, url), count in repeated.items() if count > 1),
+            key=lambda row: row["count"], reverse=True,
+        )
+        slowest = sorted(
+            ({"endpoint": endpoint, "max_ms": round(max(samples), 1), "calls": len(samples)}
+             for endpoint, samples in endpoint_ms.items()),
+            key=lambda row: row["max_ms"], reverse=True,
+        )
+        return {
+            "requests": len(self.finished) + len(self.failed),
+            "failed": len(self.failed),
+            "bytes": total_bytes,
+            "by_type": dict(by_type),
+            "duplicate_requests": sum(row["count"] - 1 for row in duplicates),
+            "duplicates": duplicates[:top_n],
+            "slowest_endpoints": slowest[:top_n],
+        }
+
+
+def get_budget(markers: Iterable[str], budgets: Dict[str, Dict]) -> Optional[Dict]:
+    """The strictest request and byte limits among a test's markers, or None when none has a budget"""
+    limits = [budgets[marker] for marker in markers if marker in budgets]
+    if not limits:
+        return None
+    budget = {}
+    for key in ("requests", "bytes"):
+        values = [limit[key] for limit in limits if limit.get(key)]
+        if values:
+            budget[key] = min(values)
+    return budget
+
+
+def check_budget(summary: Dict, budget: Optional[Dict]) -> List[str]:
+    """Describe every limit a test's traffic went over"""
+    if not budget:
+        return []
+    violations = []
+    if budget.get("requests") and summary["requests"] > budget["requests"]:
+        violations.append(f"{summary['requests']} requests over the budget of {budget['requests']}")
+    if budget.get("bytes") and summary["bytes"] > budget["bytes"]:
+        violations.append(f"{summary['bytes'] / MB:.1f} MB over the budget of {budget['bytes'] / MB:.1f} MB")
+    return violations
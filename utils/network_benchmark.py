@@ -0,0 +1,122 @@
+"""
+Network profile benchmark
+Runs the selected tests once per network profile (Config.NETWORK_PROFILES),
+with TRACE_EVENTS on so every page-object call is timed, and compares each
+step's median duration with the unthrottled run. A step that slows down by
+many times the latency the profile adds per request makes that many round
+trips one after another. Those steps are where the UI waits on chains of
+requests instead of batching or parallelizing them
+
+Usage:
+    python -m utils.network_benchmark [--profiles 3g high-latency lossy] [-- -m smoke]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+from uuid import uuid4
+
+from config.config import get_config
+from utils.helpers import describe, split_passthrough_args
+from utils.network_conditions import get_added_latency_ms
+from utils.run_context import RUN_ID_ENV
+from utils.trace_events import iter_trace_events
+
+config = get_config()
+
+BASELINE_PROFILE = "none"
+STEP_CATEGORY = "page_object"
+
+
+def get_step_durations(trace_path: str) -> Dict[str, List[float]]:
+    """Durations in ms of every page-object call in a merged run trace, by Class.method"""
+    durations = defaultdict(list)
+    if not os.path.exists(trace_path):
+        return durations
+    for event in iter_trace_events(trace_path):
+        if event.get("ph") == "X" and event.get("cat") == STEP_CATEGORY:
+            durations[event["name"]].append(event["dur"] / 1000)
+    return durations
+
+
+def run_profile(profile: str, pytest_args: List[str]) -> Dict:
+    """Run pytest under a network profile and collect its per-step durations"""
+    run_id = f"netbench-{profile}-{uuid4().hex[:6]}"
+    env = dict(os.environ, NETWORK_PROFILE=profile, TRACE_EVENTS="true", **{RUN_ID_ENV: run_id})
+    print(f"\n=== Network profile '{profile}' ===")
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-m", "pytest", *pytest_args], env=env)
+    trace_path = os.path.join(config.REPORT_DIR, "trace", f"{run_id}.json")
+    return {
+        "exit_code": completed.returncode,
+        "wall_time": round(time.perf_counter() - start, 1),
+        "added_latency_ms": get_added_latency_ms(config.get_network_profile(profile)),
+        "trace": trace_path,
+        "steps": {name: describe(samples) for name, samples in get_step_durations(trace_path).items()},
+    }
+
+
+def get_scaling(results: Dict[str, Dict]) -> List[Dict]:
+    """Per step and profile: slowdown against the baseline and the serial round-trips it implies"""
+    baseline = results[BASELINE_PROFILE]["steps"]
+    rows = []
+    for step, base in baseline.items():
+        row = {"step": step, "baseline_ms": base["median"], "profiles": {}}
+        for profile, result in results.items():
+            measured = result["steps"].get(step)
+            if profile == BASELINE_PROFILE or measured is None:
+                continue
+            extra_ms = measured["median"] - base["median"]
+            added = result["added_latency_ms"]
+            row["profiles"][profile] = {
+                "median_ms": measured["median"],
+                "slowdown": round(measured["median"] / base["median"], 2) if base["median"] else None,
+                "extra_ms": round(extra_ms, 1),
+                "serial_round_trips": round(max(extra_ms, 0) / added, 1) if added else None,
+            }
+        rows.append(row)
+
+    def worst_round_trips(row):
+        return max((entry["serial_round_trips"] or 0 for entry in row["profiles"].values()), default=0)
+
+    return sorted(rows, key=worst_round_trips, reverse=True)
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    profiles = [name for name in config.NETWORK_PROFILES if name != BASELINE_PROFILE]
+    parser = argparse.ArgumentParser(description="Measure how page-object steps scale under network profiles")
+    parser.add_argument("--profiles", nargs="+", choices=profiles, default=profiles)
+    parser.add_argument("--top", type=int, default=15, help="Steps shown in the summary")
+    # Everything after "--" is passed to pytest
+    own_args, pytest_args = split_passthrough_args(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(own_args)
+    pytest_args = pytest_args or ["-m", "smoke"]
+
+    results = {profile: run_profile(profile, pytest_args) for profile in [BASELINE_PROFILE] + args.profiles}
+    scaling = get_scaling(results)
+
+    os.makedirs(config.REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(config.REPORT_DIR, "network_benchmark.json")
+    with open(report_path, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "pytest_args": pytest_args,
+                   "profiles": results, "steps": scaling}, f, indent=2)
+
+    print(f"\n{'profile':<16} {'added ms':>9} {'exit':>5} {'wall s':>8}")
+    for profile, result in results.items():
+        print(f"{profile:<16} {result['added_latency_ms']:>9.0f} {result['exit_code']:>5} {result['wall_time']:>8.1f}")
+    print(f"\nSteps by serial round-trips (median ms, x slowdown, ~round-trips) for {', '.join(args.profiles)}")
+    for row in scaling[:args.top]:
+        cells = [f"{profile}: {entry['median_ms']:.0f}ms x{entry['slowdown'] or '-'} ~{entry['serial_round_trips'] or '-'}"
+                 for profile, entry in row["profiles"].items()]
+        print(f"{row['step']:<48} base {row['baseline_ms']:.0f}ms | {' | '.join(cells)}")
+    print(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Network condition profiles
+Applies a profile from Config.NETWORK_PROFILES to a browser context so tests run
+on the kind of link store users have. On Chromium every page gets CDP
+throttling (Network.emulateNetworkConditions: latency and bandwidth). The rest
+is injected by a context route and works on every engine:
+- a fixed delay per request, with jitter
+- "loss": a share of requests held for a retransmit timeout
+- offline bursts: requests inside a recurring window fail as disconnected
+Engines without CDP get the profile's latency as part of the route delay.
+
+Route delays wait through the request's page (page.wait_for_timeout), so the
+sync API keeps serving other requests meanwhile and concurrent requests are
+delayed in parallel, as on a real link.
+"""
+import random
+import time
+from typing import Dict
+
+from playwright.sync_api import BrowserContext, Error, Page, Route
+
+from utils.logger import get_default_logger
+
+logger = get_default_logger()
+
+CDP_ENGINES = {"chromium"}
+ROUTE_SETTINGS = ("route_delay_ms", "jitter_ms", "loss_rate", "offline_every_ms")
+
+
+def kbps_to_bytes_per_second(kbps: float) -> float:
+    """Convert kilobits per second to the bytes per second CDP expects (-1 disables the limit)"""
+    return kbps * 1024 / 8 if kbps else -1
+
+
+def get_added_latency_ms(profile: Dict) -> float:
+    """Latency the profile adds to every request, before loss and bandwidth"""
+    return profile.get("latency_ms", 0) + profile.get("route_delay_ms", 0) + profile.get("jitter_ms", 0) / 2
+
+
+class NetworkConditions:
+    """One context's network profile: CDP throttling per page plus a delaying route"""
+
+    def __init__(self, profile: Dict, browser_engine: str, seed: int = 0):
+        self.profile = profile
+        self.use_cdp = browser_engine in CDP_ENGINES
+        self.random = random.Random(seed)
+        self.route_delay_ms = profile.get("route_delay_ms", 0)
+        if not self.use_cdp:
+            self.route_delay_ms += profile.get("latency_ms", 0)
+        self.started_at = None
+        self.stats = {"profile": profile["name"], "cdp": self.use_cdp, "requests": 0,
+                      "delayed_ms": 0.0, "lost": 0, "offline_failures": 0}
+
+    def needs_route(self) -> bool:
+        """Whether anything is injected at the route level (routing turns off the browser cache)"""
+        return bool(self.route_delay_ms or any(self.profile.get(setting) for setting in ROUTE_SETTINGS))
+
+    def apply(self, context: BrowserContext):
+        """Throttle the context's current and future pages and register the delaying route"""
+        self.started_at = time.perf_counter()
+        if self.use_cdp and (self.profile.get("latency_ms") or self.profile.get("download_kbps")):
+            for page in context.pages:
+                self.throttle(page)
+            context.on("page", self.throttle)
+        if self.needs_route():
+            context.route("**/*", self.handle)
+
+    def throttle(self, page: Page):
+        """Apply CDP latency and bandwidth limits to a page"""
+        cdp = page.context.new_cdp_session(page)
+        cdp.send("Network.enable")
+        cdp.send("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": self.profile.get("latency_ms", 0),
+            "downloadThroughput": kbps_to_bytes_per_second(self.profile.get("download_kbps", 0)),
+            "uploadThroughput": kbps_to_bytes_per_second(self.profile.get("upload_kbps", 0)),
+        })
+
+    def is_offline(self) -> bool:
+        """Whether the context is inside an offline burst"""
+        every = self.profile.get("offline_every_ms")
+        if not every:
+            return False
+        elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+        # The first burst starts one period in, so page setup is never cut off
+        return elapsed_ms >= every and elapsed_ms % every < self.profile.get("offline_for_ms", 0)
+
+    def get_delay_ms(self) -> float:
+        """Delay for one request: the fixed delay, jitter, and a retransmit when the request is lost"""
+        delay = self.route_delay_ms + self.random.uniform(0, self.profile.get("jitter_ms", 0))
+        if self.random.random() < self.profile.get("loss_rate", 0):
+            self.stats["lost"] += 1
+            delay += self.profile.get("retransmit_ms", 1000)
+        return delay
+
+    def handle(self, route: Route):
+        self.stats["requests"] += 1
+        if self.is_offline():
+            self.stats["offline_failures"] += 1
+            route.abort("internetdisconnected")
+            return
+        delay = self.get_delay_ms()
+        if delay:
+            self.stats["delayed_ms"] += delay
+            try:
+                route.request.frame.page.wait_for_timeout(delay)
+            except Error:
+                pass  # service worker requests have no page, and a closing page cannot wait
+        route.fallback()
+
+    def get_stats(self) -> Dict:
+        """Requests seen and what was injected into them"""
+        return dict(self.stats, delayed_ms=round(self.stats["delayed_ms"], 1))
@@ -0,0 +1,115 @@
+"""
+Staged fail-fast pipeline
+Runs the suite as a sequence of stages (Config.PIPELINE_STAGES), each a pytest
+run over a marker expression. The first stage is the gate: smoke tests with
+as many xdist workers as possible, stopping at the first failures. Later
+stages start only if every earlier stage passed. Every stage runs with the
+circuit breaker on, so a shared dependency failing repeatedly (e.g. login)
+skips the stage's remaining tests instead of letting each one time out
+
+Usage:
+    python -m utils.pipeline [--stages smoke regression] [--gate-workers auto] [-- --headed]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from config.config import get_config
+from utils.helpers import PASSING_EXIT_CODES, split_passthrough_args
+from utils.run_context import RUN_ID_ENV
+
+config = get_config()
+
+
+def get_stages(names: List[str] = None) -> List[Dict]:
+    """Get the configured stages, optionally only the named ones, in pipeline order"""
+    stages = [{"name": name, "markers": markers} for name, markers in config.PIPELINE_STAGES]
+    if names:
+        unknown = set(names) - {stage["name"] for stage in stages}
+        if unknown:
+            raise ValueError(f"Unknown stage(s) {sorted(unknown)}, expected {[stage['name'] for stage in stages]}")
+        stages = [stage for stage in stages if stage["name"] in names]
+    return stages
+
+
+def get_worker_args(workers: Optional[str]) -> List[str]:
+    """pytest-xdist arguments for a stage, or none when xdist is missing or workers is empty"""
+    if not workers:
+        return []
+    if importlib.util.find_spec("xdist") is None:
+        print(f"pytest-xdist is not installed, running without -n {workers}")
+        return []
+    return ["-n", workers]
+
+
+def run_stage(stage: Dict, pipeline_id: str, workers: Optional[str], maxfail: int, pytest_args: List[str]) -> Dict:
+    """Run one stage as its own pytest run and result stream"""
+    run_id = f"{pipeline_id}-{stage['name']}"
+    command = [sys.executable, "-m", "pytest", "-m", stage["markers"], *get_worker_args(workers)]
+    if maxfail:
+        command.append(f"--maxfail={maxfail}")
+    command.extend(pytest_args)
+    env = dict(os.environ, CIRCUIT_BREAKER="true", RESULT_STREAM="true", **{RUN_ID_ENV: run_id})
+    print(f"\n=== Stage '{stage['name']}': pytest -m \"{stage['markers']}\" ===")
+    start = time.perf_counter()
+    exit_code = subprocess.run(command, env=env).returncode
+    return dict(stage, run_id=run_id, exit_code=exit_code, duration=round(time.perf_counter() - start, 1),
+                passed=exit_code in PASSING_EXIT_CODES)
+
+
+def run_pipeline(stages: List[Dict], gate_workers: Optional[str], workers: Optional[str],
+                 gate_maxfail: int, pytest_args: List[str]) -> List[Dict]:
+    """Run the stages in order, stopping after the first that fails"""
+    pipeline_id = f"pipeline-{uuid4().hex[:8]}"
+    results = []
+    for index, stage in enumerate(stages):
+        is_gate = index == 0
+        result = run_stage(stage, pipeline_id, gate_workers if is_gate else workers,
+                           gate_maxfail if is_gate else 0, pytest_args)
+        results.append(result)
+        if not result["passed"]:
+            for skipped in stages[index + 1:]:
+                results.append(dict(skipped, run_id=None, exit_code=None, duration=0.0, passed=None))
+            break
+    return results
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run the suite in stages, starting later stages only after the gate passes")
+    parser.add_argument("--stages", nargs="+", help="Run only these stages (default: all, in configured order)")
+    parser.add_argument("--gate-workers", default=config.PIPELINE_GATE_WORKERS, help="xdist workers for the first stage")
+    parser.add_argument("--workers", default=config.PIPELINE_WORKERS, help="xdist workers for later stages")
+    parser.add_argument("--gate-maxfail", type=int, default=config.PIPELINE_GATE_MAXFAIL,
+                        help="Stop the first stage after this many failures (0 runs it fully)")
+    # Everything after "--" is passed to every stage's pytest run
+    own_args, pytest_args = split_passthrough_args(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(own_args)
+
+    results = run_pipeline(get_stages(args.stages), args.gate_workers, args.workers, args.gate_maxfail, pytest_args)
+
+    os.makedirs(config.REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(config.REPORT_DIR, "pipeline_report.json")
+    with open(report_path, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "stages": results}, f, indent=2)
+
+    print(f"\n{'stage':<14} {'markers':<24} {'result':<8} {'exit':>5} {'seconds':>8}")
+    for result in results:
+        status = "skipped" if result["passed"] is None else ("passed" if result["passed"] else "FAILED")
+        exit_code = "-" if result["exit_code"] is None else result["exit_code"]
+        print(f"{result['name']:<14} {result['markers']:<24} {status:<8} {exit_code:>5} {result['duration']:>8.1f}")
+    print(f"Report: {report_path}")
+
+    failed = [result for result in results if result["passed"] is False]
+    sys.exit(failed[0]["exit_code"] if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
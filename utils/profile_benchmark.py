@@ -0,0 +1,116 @@
+"""
+Performance profile benchmark
+Measures each performance profile in Config.PERFORMANCE_PROFILES: how long the
+browser takes from launch to a usable page, and how long tests take under it.
+Launch time is measured in-process over several launches; per-test time comes
+from running pytest with PERFORMANCE_PROFILE set and reading its result stream
+
+Usage:
+    python -m utils.profile_benchmark [--profiles ci-fast default] [--launches 5] [-- -m smoke]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+from uuid import uuid4
+
+from playwright.sync_api import sync_playwright
+
+from config.config import get_config
+from utils.helpers import describe, split_passthrough_args
+from utils.result_stream import MERGED_FILE, get_stream_root, iter_results, merge_run
+from utils.run_context import RUN_ID_ENV
+
+config = get_config()
+
+
+def measure_launch_times(profile: str, browser_name: str, launches: int) -> List[float]:
+    """Time launch to first page (launch, new_context, new_page) under a profile"""
+    launch_options = config.get_browser_config(browser_name, profile)
+    context_options = config.get_context_config(profile)
+    # Videos are a per-test cost, not a launch cost
+    context_options["record_video_dir"] = None
+    timings = []
+    with sync_playwright() as p:
+        browser_type = getattr(p, browser_name)
+        for _ in range(launches):
+            start = time.perf_counter()
+            browser = browser_type.launch(**launch_options)
+            context = browser.new_context(**context_options)
+            context.new_page()
+            timings.append(time.perf_counter() - start)
+            browser.close()
+    return timings
+
+
+def measure_test_times(profile: str, pytest_args: List[str]) -> Dict:
+    """Run pytest under a profile and collect per-test durations from its result stream"""
+    run_id = f"bench-{profile}-{uuid4().hex[:6]}"
+    env = dict(os.environ, PERFORMANCE_PROFILE=profile, RESULT_STREAM="true", **{RUN_ID_ENV: run_id})
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-m", "pytest", *pytest_args], env=env)
+    wall_time = time.perf_counter() - start
+
+    run_dir = os.path.join(get_stream_root(), run_id)
+    merged_path = os.path.join(run_dir, MERGED_FILE)
+    if not os.path.exists(merged_path) and os.path.isdir(run_dir):
+        merge_run(run_dir)
+    durations = [record["duration"] for record in iter_results(merged_path)] if os.path.exists(merged_path) else []
+    return {
+        "exit_code": completed.returncode,
+        "wall_time": round(wall_time, 3),
+        "per_test": describe(durations),
+        "stream": merged_path,
+    }
+
+
+def run_benchmark(profiles: List[str], browser_name: str, launches: int, pytest_args: List[str]) -> Dict:
+    """Benchmark each profile and return the results keyed by profile"""
+    results = {}
+    for profile in profiles:
+        print(f"Benchmarking '{profile}' profile...")
+        results[profile] = {
+            "settings": config.get_profile(profile),
+            "launch": describe(measure_launch_times(profile, browser_name, launches)),
+            "tests": measure_test_times(profile, pytest_args) if pytest_args is not None else None,
+        }
+    return results
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark browser performance profiles")
+    parser.add_argument("--profiles", nargs="+", choices=list(config.PERFORMANCE_PROFILES),
+                        default=list(config.PERFORMANCE_PROFILES))
+    parser.add_argument("--browser", default=config.BROWSER)
+    parser.add_argument("--launches", type=int, default=5, help="Launches timed per profile")
+    parser.add_argument("--launch-only", action="store_true", help="Skip the pytest run")
+    # Everything after "--" is passed to pytest
+    own_args, pytest_args = split_passthrough_args(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(own_args)
+    pytest_args = pytest_args or ["-m", "smoke"]
+
+    results = run_benchmark(args.profiles, args.browser, args.launches, None if args.launch_only else pytest_args)
+
+    os.makedirs(config.REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(config.REPORT_DIR, "profile_benchmark.json")
+    with open(report_path, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "browser": args.browser, "profiles": results}, f, indent=2)
+
+    print(f"\n{'profile':<10} {'launch median s':>16} {'launch p95 s':>13} {'tests':>6} {'test median s':>14} {'wall s':>8}")
+    for profile, result in results.items():
+        tests = result["tests"] or {"per_test": {"count": 0}, "wall_time": 0.0}
+        per_test = tests["per_test"]
+        print(
+            f"{profile:<10} {result['launch'].get('median', 0.0):>16.3f} {result['launch'].get('p95', 0.0):>13.3f} "
+            f"{per_test['count']:>6} {per_test.get('median', 0.0):>14.3f} {tests['wall_time']:>8.1f}"
+        )
+    print(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Declarative response stubs
+A test declares the backend responses its scenario needs (e.g. "the create-user
+POST returns 409") and the context fulfills matching fetch/XHR requests locally,
+so negative paths run without producing backend state first. Stubs are scoped
+to one test and verified as used: a stub that never matched fails the test,
+since the scenario it describes was never exercised
+
+Declare stubs with markers:
+    @pytest.mark.stub_response("POST", "**/users", status=409, json={"message": "User already exists"})
+    @pytest.mark.stub_scenario("duplicate_admin_email")
+or at runtime through the response_stubs fixture:
+    response_stubs.add("POST", "**/users", status=409, json={...})
+"""
+import re
+from typing import Any, Dict, List, Optional, Pattern, Union
+
+from playwright.sync_api import Request, Route
+
+# Only API calls are stubbed; documents, scripts and images always go to their usual route
+STUBBED_RESOURCE_TYPES = {"fetch", "xhr"}
+
+# Endpoint patterns shared by the scenarios below
+CREATE_USER_URL = "**/organizations/*/users*"
+# Only the endpoint that checks the code (/verify, /verify-code, /verifyCode...), not the
+# send-verification-code request of the email step
+VERIFY_CODE_URL = re.compile(r".*/verify(?:[-_]?code)?/?(?:\?.*)?$", re.IGNORECASE)
+
+# Named scenarios: reusable sets of stubs for common negative paths
+SCENARIOS = {
+    "duplicate_admin_email": [
+        {"method": "POST", "url": CREATE_USER_URL, "status": 409,
+         "json": {"message": "A user with this email already exists"}},
+    ],
+    "create_admin_user_server_error": [
+        {"method": "POST", "url": CREATE_USER_URL, "status": 500,
+         "json": {"message": "Something went wrong"}},
+    ],
+    "invalid_verification_code": [
+        {"method": "POST", "url": VERIFY_CODE_URL, "status": 401,
+         "json": {"message": "Invalid verification code"}},
+    ],
+}
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    """Compile a URL glob (** matches across slashes, * within one path segment)"""
+    parts = []
+    for token in re.split(r"(\*\*|\*)", pattern):
+        if token == "**":
+            parts.append(".*")
+        elif token == "*":
+            parts.append("[^/]*")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("^" + "".join(parts) + "$")
+
+
+class ResponseStub:
+    """One declared response: which requests it answers and with what"""
+
+    def __init__(self, method: str, url: Union[str, Pattern], status: int = 200, json: Any = None,
+                 body: Optional[str] = None, headers: Optional[Dict[str, str]] = None, times: Optional[int] = None,
+                 name: Optional[str] = None):
+        self.method = method.upper()
+        self.url = url
+        self.url_regex = url if isinstance(url, re.Pattern) else glob_to_regex(url)
+        self.status = status
+        self.json = json
+        self.body = body
+        self.headers = headers or {}
+        self.times = times
+        self.name = name or f"{self.method} {url if isinstance(url, str) else url.pattern} -> {status}"
+        self.calls = []
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the stub has answered as many requests as it was declared for"""
+        return self.times is not None and len(self.calls) >= self.times
+
+    def matches(self, request: Request) -> bool:
+        """Whether the stub answers a request"""
+        return (
+            not self.exhausted
+            and request.method == self.method
+            and request.resource_type in STUBBED_RESOURCE_TYPES
+            and bool(self.url_regex.match(request.url))
+        )
+
+    def fulfill(self, route: Route, request: Request):
+        """Answer a request with the declared response"""
+        self.calls.append({"url": request.url, "post_data": request.post_data})
+        if self.json is not None:
+            route.fulfill(status=self.status, headers=self.headers, json=self.json)
+        else:
+            route.fulfill(status=self.status, headers=self.headers, body=self.body or "")
+
+
+class StubRouter:
+    """Serves a test's declared stubs through a context route"""
+
+    def __init__(self, stubs: List[ResponseStub] = None):
+        self.stubs = list(stubs or [])
+
+    @classmethod
+    def from_markers(cls, node) -> "StubRouter":
+        """Build the router from a test's stub_response and stub_scenario markers"""
+        router = cls()
+        for marker in node.iter_markers("stub_scenario"):
+            for name in marker.args:
+                router.add_scenario(name)
+        for marker in node.iter_markers("stub_response"):
+            router.add(*marker.args, **marker.kwargs)
+        return router
+
+    def add(self, method: str, url: Union[str, Pattern], **kwargs) -> ResponseStub:
+        """Declare a stub; later declarations win over earlier ones for the same request"""
+        stub = ResponseStub(method, url, **kwargs)
+        self.stubs.append(stub)
+        return stub
+
+    def add_scenario(self, name: str) -> List[ResponseStub]:
+        """Declare every stub of a named scenario"""
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown stub scenario '{name}', expected one of {sorted(SCENARIOS)}")
+        return [self.add(**dict(spec, name=f"{name}: {spec['method']} {spec['url']}")) for spec in SCENARIOS[name]]
+
+    @property
+    def active(self) -> bool:
+        """Whether any stub is declared"""
+        return bool(self.stubs)
+
+    def handle(self, route: Route, request: Request):
+        """Route handler fulfilling requests that match a stub"""
+        for stub in reversed(self.stubs):
+            if stub.matches(request):
+                stub.fulfill(route, request)
+                return
+        route.fallback()
+
+    def get_unused(self) -> List[ResponseStub]:
+        """Stubs that never answered a request"""
+        return [stub for stub in self.stubs if not stub.calls]
+
+    def get_summary(self) -> List[Dict]:
+        """How many requests each stub answered"""
+        return [
+            {"stub": stub.name, "calls": len(stub.calls), "urls": sorted({call["url"] for call in stub.calls})}
+            for stub in self.stubs
+        ]
+
@@ -0,0 +1,223 @@
+"""
+Streaming test result storage
+Each pytest process appends one JSON line per finished test to its own stream
+file, so results survive crashes and memory stays flat regardless of suite
+size. Streams from several workers are merged afterwards and the JUnit XML and
+HTML views are generated lazily, one record at a time
+
+Usage:
+    python -m utils.result_stream merge [RUN_DIR] [--junit junit.xml] [--html report.html]
+    python -m utils.result_stream runs
+"""
+import argparse
+import glob
+import heapq
+import html
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from config.config import get_config
+
+config = get_config()
+
+STREAM_PREFIX = "results-"
+MERGED_FILE = "merged.jsonl"
+
+
+def get_stream_root() -> str:
+    """Get the directory holding one subdirectory per run"""
+    return os.path.join(config.REPORT_DIR, "stream")
+
+
+class ResultStreamWriter:
+    """Appends result records to a JSON lines file, flushing after every record"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict):
+        """Append a record and flush it to disk"""
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """Close the stream"""
+        self._file.close()
+
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """Iterate records of a stream file, skipping a truncated last line after a crash"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def iter_results(path: str) -> Iterator[Dict]:
+    """Iterate only the test result records of a stream file"""
+    for record in iter_records(path):
+        if record.get("type") == "result":
+            yield record
+
+
+def list_runs(stream_root: str = None) -> List[str]:
+    """List run directories, oldest first"""
+    root = stream_root or get_stream_root()
+    runs = [path for path in glob.glob(os.path.join(root, "*")) if os.path.isdir(path)]
+    return sorted(runs, key=os.path.getmtime)
+
+
+def get_latest_run(stream_root: str = None) -> Optional[str]:
+    """Get the most recent run directory"""
+    runs = list_runs(stream_root)
+    return runs[-1] if runs else None
+
+
+def get_worker_streams(run_dir: str) -> List[str]:
+    """Get the per-worker stream files of a run"""
+    return sorted(glob.glob(os.path.join(run_dir, f"{STREAM_PREFIX}*.jsonl")))
+
+
+def merge_streams(stream_paths: List[str], output_path: str) -> int:
+    """
+    Merge per-worker streams into one stream ordered by test start time
+
+    Each worker stream is already in start order, so a k-way merge keeps
+    only one record per worker in memory
+
+    Returns:
+        Number of result records written
+    """
+    iterators = [iter_results(path) for path in stream_paths]
+    merged = heapq.merge(*iterators, key=lambda record: record.get("start", 0))
+    count = 0
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in merged:
+            f.write(json.dumps(record, default=str) + "\n")
+            count += 1
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def summarize(path: str) -> Dict:
+    """Count outcomes and total duration in one pass over a stream"""
+    summary = {"tests": 0, "passed": 0, "failed": 0, "error": 0, "skipped": 0, "duration": 0.0}
+    for record in iter_results(path):
+        summary["tests"] += 1
+        summary[record["outcome"]] = summary.get(record["outcome"], 0) + 1
+        summary["duration"] += record.get("duration", 0.0)
+    return summary
+
+
+def write_junit(path: str, output_path: str):
+    """Write JUnit XML from a stream; counts come from a first pass so records are never held in memory"""
+    summary = summarize(path)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write(
+            f'<testsuites><testsuite name="iso2automation" tests="{summary["tests"]}" '
+            f'failures="{summary["failed"]}" errors="{summary["error"]}" '
+            f'skipped="{summary["skipped"]}" time="{summary["duration"]:.3f}">\n'
+        )
+        for record in iter_results(path):
+            module, _, name = record["nodeid"].rpartition("::")
+            f.write(
+                f'  <testcase classname={quoteattr(module.replace("/", ".").replace("::", "."))} '
+                f'name={quoteattr(name)} time="{record.get("duration", 0.0):.3f}">'
+            )
+            message = escape(record.get("longrepr") or "")
+            if record["outcome"] == "failed":
+                f.write(f'<failure message="test failed">{message}</failure>')
+            elif record["outcome"] == "error":
+                f.write(f'<error message="test error">{message}</error>')
+            elif record["outcome"] == "skipped":
+                f.write(f'<skipped message={quoteattr(record.get("longrepr") or "")}/>')
+            if record.get("properties"):
+                f.write("<properties>")
+                for key, value in record["properties"]:
+                    f.write(f"<property name={quoteattr(str(key))} value={quoteattr(str(value))}/>")
+                f.write("</properties>")
+            f.write("</testcase>\n")
+        f.write("</testsuite></testsuites>\n")
+
+
+def write_html(path: str, output_path: str):
+    """Write a self-contained HTML view of a stream, one table row per record"""
+    summary = summarize(path)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Test Report</title>"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse;width:100%}"
+            "td,th{border:1px solid #ccc;padding:4px;text-align:left;vertical-align:top}"
+            ".passed{color:#2e7d32}.failed,.error{color:#c62828}.skipped{color:#757575}"
+            "pre{white-space:pre-wrap;margin:0}</style></head><body>\n"
+        )
+        f.write(
+            f"<h1>Test Report</h1><p>{summary['tests']} tests: {summary['passed']} passed, "
+            f"{summary['failed']} failed, {summary['error']} errors, {summary['skipped']} skipped "
+            f"in {summary['duration']:.2f}s</p>\n"
+        )
+        f.write("<table><tr><th>Test</th><th>Outcome</th><th>Duration (s)</th><th>Worker</th><th>Details</th></tr>\n")
+        for record in iter_results(path):
+            details = "".join(
+                f"<div>{html.escape(str(key))}: {html.escape(str(value))}</div>"
+                for key, value in record.get("properties", [])
+            )
+            if record.get("longrepr"):
+                details += f"<pre>{html.escape(record['longrepr'])}</pre>"
+            f.write(
+                f"<tr><td>{html.escape(record['nodeid'])}</td>"
+                f"<td class='{record['outcome']}'>{record['outcome']}</td>"
+                f"<td>{record.get('duration', 0.0):.2f}</td>"
+                f"<td>{html.escape(str(record.get('worker', '')))}</td><td>{details}</td></tr>\n"
+            )
+        f.write("</table></body></html>\n")
+
+
+def merge_run(run_dir: str, junit_path: str = None, html_path: str = None) -> str:
+    """Merge a run's worker streams and optionally render JUnit XML and HTML"""
+    merged_path = os.path.join(run_dir, MERGED_FILE)
+    merge_streams(get_worker_streams(run_dir), merged_path)
+    if junit_path:
+        write_junit(merged_path, junit_path)
+    if html_path:
+        write_html(merged_path, html_path)
+    return merged_path
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Merge and render streamed test results")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser("merge", help="Merge worker streams of a run")
+    merge_parser.add_argument("run_dir", nargs="?", help="Run directory (defaults to the latest run)")
+    merge_parser.add_argument("--junit", help="Write JUnit XML to this path")
+    merge_parser.add_argument("--html", help="Write an HTML view to this path")
+    subparsers.add_parser("runs", help="List recorded runs")
+    args = parser.parse_args(argv)
+
+    if args.command == "runs":
+        for run_dir in list_runs():
+            print(run_dir)
+        return
+
+    run_dir = args.run_dir or get_latest_run()
+    if not run_dir:
+        parser.error(f"No runs found in {get_stream_root()}")
+    merged_path = merge_run(run_dir, args.junit, args.html)
+    summary = summarize(merged_path)
+    print(f"Merged {summary['tests']} results into {merged_path}")
+
+
+if __name__ == "__main__":
+    main()
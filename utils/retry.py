@@ -0,0 +1,123 @@
+"""
+In-place retries and flakiness history
+A retried test keeps its fixtures: the browser, context and page stay up and
+the logged-in state captured when the test body started is put back (cookies,
+localStorage, URL) before the body runs again, so a retry costs no context
+rebuild and no UI login. localStorage and sessionStorage are cleared for every
+origin the failed attempt visited. Every outcome is kept in a local history
+file, from which tests that keep needing retries are quarantined
+"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Page
+
+from utils.auth_cache import SET_LOCAL_STORAGE_SCRIPT
+
+# Outcomes kept per test in the history
+PASSED = "passed"
+FAILED = "failed"
+FLAKY = "flaky"  # passed after at least one retry
+
+CLEAR_STORAGE_SCRIPT = "() => { localStorage.clear(); sessionStorage.clear(); }"
+# Served in place of the app while a retry resets an origin's storage
+BLANK_DOCUMENT = "<!DOCTYPE html><title>reset</title>"
+
+
+def is_retryable(error: BaseException, exception_names: List[str]) -> bool:
+    """Whether a failure is of a kind worth retrying (matched by class name, including base classes)"""
+    return any(cls.__name__ in exception_names for cls in type(error).__mro__)
+
+
+def get_origin(url: str) -> Optional[str]:
+    """The origin of an http(s) URL; None for about:blank, data: and other URLs without storage of their own"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme in ("http", "https") else None
+
+
+def take_page_snapshot(page: Page) -> Dict:
+    """Capture the state a retry starts from: the page URL and the context's storage state"""
+    visited = set()
+
+    def on_navigated(frame):
+        origin = get_origin(frame.url)
+        if origin:
+            visited.add(origin)
+
+    # Storage of every origin the page loads from now on is cleared by reset_page
+    page.on("framenavigated", on_navigated)
+    on_navigated(page.main_frame)
+    return {"url": page.url, "storage_state": page.context.storage_state(), "visited_origins": visited}
+
+
+def reset_page(page: Page, snapshot: Dict):
+    """Put a page and its context back to a snapshot, closing pages the failed attempt opened"""
+    context = page.context
+    for other in context.pages:
+        if other is not page:
+            other.close()
+    saved = {entry["origin"]: entry["localStorage"] for entry in snapshot["storage_state"].get("origins", [])}
+    origins = set(snapshot["visited_origins"]) | set(saved)
+    origins.update(entry["origin"] for entry in context.storage_state()["origins"])
+    context.clear_cookies()
+
+    def serve_blank(route):
+        route.fulfill(status=200, content_type="text/html", body=BLANK_DOCUMENT)
+
+    # Each origin's storage is only reachable from one of its documents; load an empty one rather than the app
+    for origin in sorted(origins):
+        blank_url = f"{origin}/"
+        page.route(blank_url, serve_blank)
+        try:
+            page.goto(blank_url)
+            page.evaluate(CLEAR_STORAGE_SCRIPT)
+            if saved.get(origin):
+                page.evaluate(SET_LOCAL_STORAGE_SCRIPT, saved[origin])
+        finally:
+            page.unroute(blank_url, serve_blank)
+    context.add_cookies(snapshot["storage_state"]["cookies"])
+    page.goto(snapshot["url"])
+
+
+class FlakinessHistory:
+    """Recent outcomes per test, kept in a JSON file"""
+
+    def __init__(self, tests: Dict[str, List[str]] = None, window: int = 50):
+        self.tests = tests or {}
+        self.window = window
+
+    @classmethod
+    def load(cls, path: str, window: int = 50) -> "FlakinessHistory":
+        """Load the history, starting empty when there is none"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(window=window)
+        return cls(data.get("tests", {}), window)
+
+    def save(self, path: str):
+        """Write the history atomically"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"updated_at": datetime.now().isoformat(), "tests": self.tests}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def add(self, nodeid: str, outcome: str):
+        """Record a test outcome, keeping the newest `window` outcomes"""
+        outcomes = self.tests.setdefault(nodeid, [])
+        outcomes.append(outcome)
+        del outcomes[:-self.window]
+
+    def get_quarantined(self, min_runs: int, rate: float) -> Dict[str, float]:
+        """Tests with enough history whose flake rate reaches `rate`"""
+        quarantined = {}
+        for nodeid, outcomes in self.tests.items():
+            flake_rate = outcomes.count(FLAKY) / len(outcomes) if outcomes else 0.0
+            if len(outcomes) >= min_runs and flake_rate >= rate:
+                quarantined[nodeid] = round(flake_rate, 3)
+        return quarantined
@@ -0,0 +1,21 @@
+"""
+Run and worker identity
+The id shared by every pytest process of one run and the xdist worker of the
+current process. Has no project imports, so any module (including the data
+factory that helpers builds on) can depend on it
+"""
+import os
+import uuid
+
+# Environment variable shared by a run's pytest processes (xdist workers inherit it)
+RUN_ID_ENV = "TEST_RUN_ID"
+
+
+def get_run_id() -> str:
+    """Get the id of the current test run, creating it on first use"""
+    return os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+
+def get_worker_id() -> str:
+    """Get the pytest-xdist worker id, or main outside xdist"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
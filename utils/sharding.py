@@ -0,0 +1,372 @@
+"""
+Multi-node sharding
+Splits the collected tests into balanced shards using historical durations
+from the result streams, writes one manifest per shard that a node can run on
+its own, and merges the shards' results and artifacts into one report.
+
+Constraints:
+    smoke   all smoke tests stay on one shard, so the smoke signal arrives as one unit
+    admin   admin tests only go to the shards marked with the shared "admin" auth cache
+
+Usage:
+    python -m utils.sharding plan --shards 4 [--output shards] [-- -m regression]
+    python -m utils.sharding run shards/shard-2.json [--output out/shard-2] [-- -n 4]
+    python -m utils.sharding run-local shards [--output out]
+    python -m utils.sharding merge out/shard-0 out/shard-1 ... [--output merged]
+"""
+import argparse
+import heapq
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List
+from uuid import uuid4
+
+from config.config import get_config
+from utils.helpers import PASSING_EXIT_CODES, split_passthrough_args
+from utils.result_stream import (MERGED_FILE, get_stream_root, get_worker_streams, iter_results, list_runs,
+                                 summarize, write_html, write_junit)
+from utils.run_context import RUN_ID_ENV
+
+config = get_config()
+
+PLAN_FILE = "plan.json"
+SHARD_INFO_FILE = "shard.json"
+KEEP_TOGETHER_MARKER = "smoke"
+AUTH_CACHE_MARKER = "admin"
+DEFAULT_TEST_DURATION = 5.0
+
+# Artifact settings redirected into a shard's output directory, by subdirectory name
+ARTIFACT_DIRS = {
+    "REPORT_DIR": "reports",
+    "SCREENSHOT_DIR": "screenshots",
+    "VIDEO_DIR": "videos",
+    "TRACE_DIR": "traces",
+    "VISUAL_DIFF_DIR": "visual_diffs",
+}
+
+
+def get_run_streams(run_dir: str) -> List[str]:
+    """Get a run's merged stream, or its worker streams when it was never merged"""
+    merged_path = os.path.join(run_dir, MERGED_FILE)
+    return [merged_path] if os.path.exists(merged_path) else get_worker_streams(run_dir)
+
+
+def load_durations(stream_root: str = None, max_runs: int = 10) -> Dict[str, float]:
+    """Median duration per test over the most recent runs' result streams"""
+    samples = {}
+    for run_dir in list_runs(stream_root)[-max_runs:]:
+        for path in get_run_streams(run_dir):
+            for record in iter_results(path):
+                if record["outcome"] != "skipped":
+                    samples.setdefault(record["nodeid"], []).append(record.get("duration", 0.0))
+    return {nodeid: statistics.median(values) for nodeid, values in samples.items()}
+
+
+def collect_tests(pytest_args: List[str]) -> List[Dict]:
+    """Collect test ids and markers by running pytest --collect-only"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "collected.json")
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", f"--shard-collect={output_path}", *pytest_args],
+            check=False,
+            stdout=subprocess.DEVNULL,
+        )
+        if not os.path.exists(output_path):
+            raise RuntimeError("Test collection failed; run pytest --collect-only to see why")
+        with open(output_path) as f:
+            return json.load(f)
+
+
+def plan_shards(tests: List[Dict], durations: Dict[str, float], shard_count: int,
+                default_duration: float = None) -> List[Dict]:
+    """
+    Split tests into balanced shards (longest processing time first)
+
+    Args:
+        tests: Collected tests as {"nodeid", "markers"} in collection order
+        durations: Historical duration per test id
+        shard_count: Number of shards
+        default_duration: Estimate for tests without history (median of known tests by default)
+
+    Returns:
+        Shards with their tests in collection order, expected duration and auth cache group
+    """
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+    if default_duration is None:
+        default_duration = statistics.median(durations.values()) if durations else DEFAULT_TEST_DURATION
+    order = {test["nodeid"]: index for index, test in enumerate(tests)}
+
+    # Units are placed whole: one for all smoke tests, one per remaining test
+    units = []
+    smoke = [test for test in tests if KEEP_TOGETHER_MARKER in test["markers"]]
+    if smoke:
+        units.append(smoke)
+    units.extend([test] for test in tests if KEEP_TOGETHER_MARKER not in test["markers"])
+
+    def unit_duration(unit):
+        return sum(durations.get(test["nodeid"], default_duration) for test in unit)
+
+    def needs_auth_cache(unit):
+        return any(AUTH_CACHE_MARKER in test["markers"] for test in unit)
+
+    total = sum(unit_duration(unit) for unit in units) or 1.0
+    auth_total = sum(unit_duration(unit) for unit in units if needs_auth_cache(unit))
+    # Enough auth-cache shards to carry the admin load at an even share per shard
+    auth_shards = min(max(round(auth_total / (total / shard_count)), 1), shard_count) if auth_total else 0
+
+    shards = [
+        {"index": index, "tests": [], "expected_duration": 0.0,
+         "auth_cache": AUTH_CACHE_MARKER if index < auth_shards else None}
+        for index in range(shard_count)
+    ]
+    constrained = sorted((unit for unit in units if needs_auth_cache(unit)), key=unit_duration, reverse=True)
+    free = sorted((unit for unit in units if not needs_auth_cache(unit)), key=unit_duration, reverse=True)
+    for unit in constrained + free:
+        candidates = shards[:auth_shards] if needs_auth_cache(unit) else shards
+        shard = min(candidates, key=lambda s: s["expected_duration"])
+        shard["tests"].extend(test["nodeid"] for test in unit)
+        shard["expected_duration"] += unit_duration(unit)
+
+    for shard in shards:
+        shard["tests"].sort(key=order.get)
+        shard["expected_duration"] = round(shard["expected_duration"], 3)
+    return shards
+
+
+def write_plan(shards: List[Dict], output_dir: str, pytest_args: List[str], history_size: int) -> str:
+    """Write the plan and one self-contained manifest per shard"""
+    os.makedirs(output_dir, exist_ok=True)
+    plan_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid4().hex[:6]}"
+    expected = [shard["expected_duration"] for shard in shards]
+    for shard in shards:
+        manifest = dict(shard, plan_id=plan_id, shard_count=len(shards), pytest_args=pytest_args)
+        with open(os.path.join(output_dir, f"shard-{shard['index']}.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+    plan_path = os.path.join(output_dir, PLAN_FILE)
+    with open(plan_path, "w") as f:
+        json.dump({
+            "plan_id": plan_id,
+            "created_at": datetime.now().isoformat(),
+            "shard_count": len(shards),
+            "tests": sum(len(shard["tests"]) for shard in shards),
+            "tests_with_history": history_size,
+            "pytest_args": pytest_args,
+            # 1.0 is a perfect split; the slowest shard bounds the wall time
+            "imbalance": round(max(expected) / (statistics.mean(expected) or 1.0), 3),
+            "shards": [
+                dict({key: shard[key] for key in ("index", "expected_duration", "auth_cache")}, tests=len(shard["tests"]))
+                for shard in shards
+            ],
+        }, f, indent=2)
+    return plan_path
+
+
+def load_manifest(path: str) -> Dict:
+    """Load a shard manifest"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_shard_command(manifest_path: str, extra_args: List[str] = None) -> List[str]:
+    """Build the pytest command that runs one shard"""
+    manifest = load_manifest(manifest_path)
+    return [sys.executable, "-m", "pytest", *manifest["pytest_args"],
+            f"--shard-manifest={os.path.abspath(manifest_path)}", *(extra_args or [])]
+
+
+def get_shard_env(manifest_path: str, output_dir: str) -> Dict[str, str]:
+    """Environment that sends a shard's results and artifacts into its output directory"""
+    manifest = load_manifest(manifest_path)
+    output_root = os.path.abspath(output_dir)
+    env = dict(os.environ, RESULT_STREAM="true")
+    env[RUN_ID_ENV] = f"{manifest['plan_id']}-shard{manifest['index']}"
+    # Admin shards log in once and share the session across their tests
+    if manifest.get("auth_cache"):
+        env["AUTH_CACHE"] = "true"
+    for setting, subdir in ARTIFACT_DIRS.items():
+        env[setting] = os.path.join(output_root, subdir)
+    return env
+
+
+def start_shard(manifest_path: str, output_dir: str, log: BinaryIO, extra_args: List[str] = None) -> subprocess.Popen:
+    """Start a shard as a local process writing its output to log"""
+    return subprocess.Popen(get_shard_command(manifest_path, extra_args), env=get_shard_env(manifest_path, output_dir),
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def get_exit_code(exit_code: int) -> int:
+    """A shard's exit code as the run's: a shard planned with no tests (pytest exit code 5) passed"""
+    return 0 if exit_code in PASSING_EXIT_CODES else exit_code
+
+
+def write_shard_info(manifest_path: str, output_dir: str, exit_code: int, started: float, duration: float):
+    """Record how a shard ran, including where its artifacts were written"""
+    manifest = load_manifest(manifest_path)
+    with open(os.path.join(output_dir, SHARD_INFO_FILE), "w") as f:
+        json.dump({
+            "plan_id": manifest["plan_id"],
+            "index": manifest["index"],
+            "auth_cache": manifest["auth_cache"],
+            "output_root": os.path.abspath(output_dir),
+            "exit_code": exit_code,
+            "started_at": datetime.fromtimestamp(started).isoformat(),
+            "duration": round(duration, 3),
+            "expected_duration": manifest["expected_duration"],
+        }, f, indent=2)
+
+
+def run_shard(manifest_path: str, output_dir: str, extra_args: List[str] = None) -> int:
+    """Run one shard in the foreground, as a node would"""
+    started = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+    exit_code = subprocess.run(get_shard_command(manifest_path, extra_args),
+                               env=get_shard_env(manifest_path, output_dir)).returncode
+    write_shard_info(manifest_path, output_dir, exit_code, started, time.time() - started)
+    return exit_code
+
+
+def run_local(plan_dir: str, output_dir: str, extra_args: List[str] = None) -> List[str]:
+    """Run every shard of a plan as concurrent local processes and return their output directories"""
+    manifests = sorted(
+        (os.path.join(plan_dir, name) for name in os.listdir(plan_dir) if name.startswith("shard-")),
+        key=lambda path: load_manifest(path)["index"],
+    )
+    running = []
+    for manifest_path in manifests:
+        shard_dir = os.path.join(output_dir, f"shard-{load_manifest(manifest_path)['index']}")
+        os.makedirs(shard_dir, exist_ok=True)
+        log = open(os.path.join(shard_dir, "pytest.log"), "wb")
+        started = time.time()
+        running.append((manifest_path, shard_dir, started, log, start_shard(manifest_path, shard_dir, log, extra_args)))
+    for manifest_path, shard_dir, started, log, process in running:
+        exit_code = process.wait()
+        log.close()
+        write_shard_info(manifest_path, shard_dir, exit_code, started, time.time() - started)
+        print(f"{shard_dir}: exit code {exit_code}")
+    return [shard_dir for _, shard_dir, _, _, _ in running]
+
+
+def _relocate(value, old_root: str, new_root: str):
+    if isinstance(value, str) and value.startswith(old_root):
+        return new_root + value[len(old_root):]
+    return value
+
+
+def _iter_shard_results(shard_dir: str, info: Dict, artifact_root: str) -> Iterator[Dict]:
+    """Iterate a shard's results with artifact paths pointing at the merged copy"""
+    streams = []
+    for run_dir in list_runs(os.path.join(shard_dir, ARTIFACT_DIRS["REPORT_DIR"], "stream")):
+        streams.extend(get_run_streams(run_dir))
+    records = heapq.merge(*(iter_results(path) for path in streams), key=lambda record: record.get("start", 0))
+    for record in records:
+        record["shard"] = info["index"]
+        record["properties"] = [[key, _relocate(value, info["output_root"], artifact_root)]
+                                for key, value in record.get("properties", [])]
+        yield record
+
+
+def merge_shards(shard_dirs: List[str], output_dir: str) -> Dict:
+    """
+    Merge the results and artifacts of several shards into one report
+
+    Results are k-way merged by start time into one stream; each shard's
+    artifacts are copied under artifacts/shard-<n> and the artifact paths in
+    its results rewritten to match
+
+    Returns:
+        Merge summary, also written to shard_report.json
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    infos = []
+    iterators = []
+    for shard_dir in shard_dirs:
+        with open(os.path.join(shard_dir, SHARD_INFO_FILE)) as f:
+            info = json.load(f)
+        artifact_root = os.path.abspath(os.path.join(output_dir, "artifacts", f"shard-{info['index']}"))
+        for subdir in ARTIFACT_DIRS.values():
+            source = os.path.join(shard_dir, subdir)
+            if os.path.isdir(source) and subdir != ARTIFACT_DIRS["REPORT_DIR"]:
+                shutil.copytree(source, os.path.join(artifact_root, subdir), dirs_exist_ok=True)
+        infos.append(info)
+        iterators.append(_iter_shard_results(shard_dir, info, artifact_root))
+
+    plan_id = infos[0]["plan_id"] if infos else "shards"
+    # The merged stream joins the run history, so future plans learn from sharded runs
+    run_dir = os.path.join(get_stream_root(), plan_id)
+    os.makedirs(run_dir, exist_ok=True)
+    merged_path = os.path.join(run_dir, MERGED_FILE)
+    with open(merged_path, "w", encoding="utf-8") as f:
+        for record in heapq.merge(*iterators, key=lambda record: record.get("start", 0)):
+            f.write(json.dumps(record, default=str) + "\n")
+
+    write_junit(merged_path, os.path.join(output_dir, "junit.xml"))
+    write_html(merged_path, os.path.join(output_dir, "report.html"))
+    summary = {
+        "plan_id": plan_id,
+        "merged_stream": merged_path,
+        "results": summarize(merged_path),
+        "exit_code": max((get_exit_code(info["exit_code"]) for info in infos), default=0),
+        "shards": sorted(infos, key=lambda info: info["index"]),
+    }
+    with open(os.path.join(output_dir, "shard_report.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Plan, run and merge test shards")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    plan_parser = subparsers.add_parser("plan", help="Split collected tests into shard manifests")
+    plan_parser.add_argument("--shards", type=int, required=True)
+    plan_parser.add_argument("--output", default="shards", help="Directory for plan.json and shard manifests")
+    plan_parser.add_argument("--history-runs", type=int, default=10, help="Recent runs used for durations")
+    run_parser = subparsers.add_parser("run", help="Run one shard manifest (on a node)")
+    run_parser.add_argument("manifest")
+    run_parser.add_argument("--output", help="Shard output directory (defaults to out/shard-<n>)")
+    local_parser = subparsers.add_parser("run-local", help="Run all shards of a plan as local processes, then merge")
+    local_parser.add_argument("plan_dir")
+    local_parser.add_argument("--output", default="out")
+    merge_parser = subparsers.add_parser("merge", help="Merge shard output directories into one report")
+    merge_parser.add_argument("shard_dirs", nargs="+")
+    merge_parser.add_argument("--output", default="merged")
+    # Everything after "--" is passed to pytest
+    own_args, extra_args = split_passthrough_args(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(own_args)
+
+    if args.command == "plan":
+        if args.shards < 1:
+            parser.error("--shards must be at least 1")
+        tests = collect_tests(extra_args)
+        durations = load_durations(max_runs=args.history_runs)
+        shards = plan_shards(tests, durations, args.shards)
+        plan_path = write_plan(shards, args.output, extra_args, len(set(durations) & {t["nodeid"] for t in tests}))
+        for shard in shards:
+            auth = f", auth cache {shard['auth_cache']}" if shard["auth_cache"] else ""
+            print(f"shard-{shard['index']}: {len(shard['tests'])} tests, ~{shard['expected_duration']:.0f}s{auth}")
+        print(f"Plan: {plan_path}")
+    elif args.command == "run":
+        output_dir = args.output or os.path.join("out", f"shard-{load_manifest(args.manifest)['index']}")
+        sys.exit(get_exit_code(run_shard(args.manifest, output_dir, extra_args)))
+    elif args.command == "run-local":
+        shard_dirs = run_local(args.plan_dir, args.output, extra_args)
+        summary = merge_shards(shard_dirs, os.path.join(args.output, "merged"))
+        print(f"Merged {summary['results']['tests']} results from {len(shard_dirs)} shards into "
+              f"{os.path.join(args.output, 'merged')}")
+        sys.exit(summary["exit_code"])
+    else:
+        summary = merge_shards(args.shard_dirs, args.output)
+        print(f"Merged {summary['results']['tests']} results from {len(args.shard_dirs)} shards into {args.output}")
+        sys.exit(summary["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
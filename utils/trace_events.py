@@ -0,0 +1,204 @@
+"""
+Chrome trace-event recording
+Writes spans in the Trace Event Format (JSON array form, one event per line)
+so a run's timeline opens in Perfetto or chrome://tracing. The closing bracket
+is optional in that format, so a partially written file from a crashed worker
+still loads
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Track ids within a worker process
+MAIN_TRACK = 0
+GAP_TRACK = 1
+
+# Playwright methods that wait on the browser rather than act on it
+WAIT_PREFIXES = ("wait_for", "expect_", "to_", "not_to_")
+WAIT_METHODS = {"goto", "reload", "go_back", "go_forward"}
+
+
+class TraceRecorder:
+    """Records complete ("X") events for one process into a trace file"""
+
+    def __init__(self, path: str, process_name: str, gap_threshold_ms: float = 50):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.pid = os.getpid()
+        self.gap_threshold_us = gap_threshold_ms * 1000
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._lock = threading.Lock()
+        self._wall_anchor = time.time() * 1e6
+        self._perf_anchor = time.perf_counter()
+        self._depth = 0
+        self._gap_depth = 0
+        self._track_gaps = False
+        self._idle_since = None
+        self.metadata("process_name", {"name": process_name})
+        self.metadata("thread_name", {"name": "pytest"}, tid=MAIN_TRACK)
+        self.metadata("thread_name", {"name": "idle gaps"}, tid=GAP_TRACK)
+
+    def now(self) -> float:
+        """Current timestamp in microseconds on a clock shared by all workers"""
+        return self._wall_anchor + (time.perf_counter() - self._perf_anchor) * 1e6
+
+    def _write(self, event: Dict):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(event, default=str) + ",\n")
+
+    def metadata(self, name: str, args: Dict, tid: int = MAIN_TRACK):
+        """Write a metadata event naming a process or track"""
+        self._write({"name": name, "ph": "M", "pid": self.pid, "tid": tid, "args": args})
+
+    def complete(self, name: str, category: str, start: float, end: float,
+                 args: Optional[Dict] = None, tid: int = MAIN_TRACK):
+        """Write a complete event spanning start to end"""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round(start, 1),
+            "dur": round(max(end - start, 0), 1),
+            "pid": self.pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self._write(event)
+
+    def instant(self, name: str, category: str, args: Optional[Dict] = None):
+        """Write an instant event"""
+        event = {"name": name, "cat": category, "ph": "i", "s": "t", "ts": round(self.now(), 1),
+                 "pid": self.pid, "tid": MAIN_TRACK}
+        if args:
+            event["args"] = args
+        self._write(event)
+
+    def start_gap_tracking(self):
+        """Start emitting idle gaps between spans opened at the current nesting level"""
+        self._track_gaps = True
+        self._gap_depth = self._depth
+        self._idle_since = self.now()
+
+    def stop_gap_tracking(self):
+        """Stop emitting idle gaps, closing the trailing one"""
+        self._close_gap(self.now())
+        self._track_gaps = False
+        self._idle_since = None
+
+    def _close_gap(self, end: float):
+        if self._track_gaps and self._idle_since is not None:
+            if end - self._idle_since >= self.gap_threshold_us:
+                self.complete("idle", "gap", self._idle_since, end, tid=GAP_TRACK)
+        self._idle_since = None
+
+    @contextmanager
+    def span(self, name: str, category: str, args: Optional[Dict] = None) -> Iterator[None]:
+        """Record the wrapped block as a complete event"""
+        start = self.now()
+        if self._depth == self._gap_depth:
+            self._close_gap(start)
+        self._depth += 1
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._depth -= 1
+            end = self.now()
+            if error:
+                args = dict(args or {}, error=error)
+            self.complete(name, category, start, end, args)
+            if self._depth == self._gap_depth and self._track_gaps:
+                self._idle_since = end
+
+    def close(self):
+        """Close the trace file"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.write("{}]\n")
+                self._file.close()
+
+
+def get_playwright_category(method_name: str) -> str:
+    """Categorize a Playwright method as a wait or an action"""
+    if method_name in WAIT_METHODS or method_name.startswith(WAIT_PREFIXES):
+        return "playwright.wait"
+    return "playwright"
+
+
+def _wrap(func, recorder: TraceRecorder, category: str, use_instance_class: bool):
+    if getattr(func, "__traced__", False):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        owner = type(args[0]).__name__ if use_instance_class and args else func.__qualname__.split(".")[0]
+        with recorder.span(f"{owner}.{func.__name__}", category):
+            return func(*args, **kwargs)
+
+    wrapper.__traced__ = True
+    wrapper.__wrapped_original__ = func
+    return wrapper
+
+
+def instrument_class(cls, recorder: TraceRecorder, category: str = None, use_instance_class: bool = False):
+    """
+    Wrap the public methods defined on a class so each call becomes a span
+
+    Args:
+        cls: Class to instrument in place
+        recorder: Recorder receiving the spans
+        category: Span category; Playwright categories are derived per method when omitted
+        use_instance_class: Name spans after the runtime class (for inherited page-object methods)
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attr):
+            continue
+        method_category = category or get_playwright_category(name)
+        setattr(cls, name, _wrap(attr, recorder, method_category, use_instance_class))
+
+
+def uninstrument_class(cls):
+    """Restore methods wrapped by instrument_class"""
+    for name, attr in list(vars(cls).items()):
+        original = getattr(attr, "__wrapped_original__", None)
+        if original is not None:
+            setattr(cls, name, original)
+
+
+def iter_trace_events(path: str) -> Iterator[Dict]:
+    """Iterate the events of a trace file written by TraceRecorder"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line in ("", "[", "]", "{}]", "{}"):
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def merge_trace_files(paths: List[str], output_path: str) -> str:
+    """Merge per-worker trace files into one trace, one event at a time"""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as out:
+        out.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        first = True
+        for path in paths:
+            for event in iter_trace_events(path):
+                out.write(("" if first else ",\n") + json.dumps(event))
+                first = False
+        out.write("\n]}\n")
+    return output_path
@@ -0,0 +1,280 @@
+"""
+UI event capture
+Toasts, modals and validation messages are often on screen for a second or two.
+Polling for them either misses the short ones or waits out the long ones. This
+module pushes them out of the page instead. A runtime installed in every
+document watches the selectors of each kind (Config.UI_EVENT_SELECTORS) from a
+MutationObserver, plus the browser's own "invalid" events for native form
+validation. It sends every change through a binding to a Python-side log, in
+order and stamped with the time it happened in the page:
+- shown: an element of the kind became visible
+- updated: a shown element's text changed
+- hidden: a shown element was hidden or removed (with how long it was visible)
+- invalid: a form field failed native validation (with its validationMessage)
+
+Assertions read the log, so a toast that came and went before the test looked
+is still found. When nothing matches yet, one evaluate waits in the page for
+the next matching event. A page object installs the capture on its context,
+open documents included, the first time it reads the log (e.g. the mark taken
+before a submit); with UI_EVENTS the context fixture installs it on every
+context. Either way the log is attached to the test's result as the
+"ui_events" property.
+
+Usage:
+    since = ui_events.mark()
+    page.click(SUBMIT_BUTTON)
+    ui_events.wait_for(page, "toast", text="success", since=since)
+    ui_events.find("modal", action="hidden", since=since)
+"""
+import bisect
+import json
+import time
+from typing import Dict, List, Optional
+
+from playwright.sync_api import BrowserContext, Error, Page, TimeoutError as PlaywrightTimeoutError
+
+from config.config import get_config
+from utils.adaptive_timeouts import get_adaptive_timeouts
+from utils.waits import NAVIGATION_ERRORS
+
+config = get_config()
+
+EVENT_BINDING = "__uiEvent"
+LOG_ATTRIBUTE = "_ui_event_log"
+# Events each document keeps for waits to search (the Python log keeps them all)
+PAGE_LOG_SIZE = 500
+
+RUNTIME_SCRIPT = """
+(() => {
+  if (window.__uiEvents) return;
+  const selectors = """ + json.dumps(config.UI_EVENT_SELECTORS) + """;
+  const documentId = Math.random().toString(36).slice(2, 10);
+  const tracked = new Map();
+  const log = [];
+  const waiters = new Set();
+  let seq = 0;
+
+  const isVisible = el => {
+    if (!el.isConnected) return false;
+    const style = getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && el.getClientRects().length > 0;
+  };
+  const getText = el => (el.innerText || el.textContent || '').trim().replace(/\\s+/g, ' ').slice(0, 500);
+
+  const matches = (event, match) =>
+    event.at >= match.since && event.kind === match.kind &&
+    (match.actions === null || match.actions.includes(event.action)) &&
+    (match.text === null || event.text.includes(match.text)) &&
+    (match.id === null || event.id === match.id);
+
+  const emit = (kind, action, el, text, extra) => {
+    const event = Object.assign({doc: documentId, seq: ++seq, at: Date.now(), kind, action, text,
+                                 id: el.id || null, url: location.href}, extra);
+    log.push(event);
+    if (log.length > """ + str(PAGE_LOG_SIZE) + """) log.shift();
+    const report = window.""" + EVENT_BINDING + """;
+    if (report) report(event).catch(() => {});
+    for (const waiter of waiters) {
+      if (matches(event, waiter.match)) waiter.settle({event});
+    }
+  };
+
+  const scan = () => {
+    const seen = new Set();
+    for (const [kind, selector] of Object.entries(selectors)) {
+      let elements;
+      try {
+        elements = document.querySelectorAll(selector);
+      } catch (e) {
+        continue;
+      }
+      for (const el of elements) {
+        // An element matching several kinds belongs to the first
+        if (seen.has(el)) continue;
+        seen.add(el);
+        const state = tracked.get(el);
+        if (!isVisible(el)) {
+          if (state) hide(el, state);
+          continue;
+        }
+        const text = getText(el);
+        if (!state) {
+          tracked.set(el, {kind, text, shownAt: Date.now()});
+          emit(kind, 'shown', el, text);
+        } else if (text !== state.text) {
+          state.text = text;
+          emit(state.kind, 'updated', el, text);
+        }
+      }
+    }
+    for (const [el, state] of tracked) {
+      if (!seen.has(el)) hide(el, state);
+    }
+  };
+
+  const hide = (el, state) => {
+    tracked.delete(el);
+    emit(state.kind, 'hidden', el, state.text, {visible_ms: Date.now() - state.shownAt});
+  };
+
+  document.addEventListener('invalid', e => {
+    const field = e.target;
+    emit('validation', 'invalid', field, field.validationMessage || '', {field: field.name || field.id || null});
+  }, true);
+
+  let scheduled = false;
+  const schedule = () => {
+    if (scheduled) return;
+    scheduled = true;
+    queueMicrotask(() => { scheduled = false; scan(); });
+  };
+  new MutationObserver(schedule).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  for (const type of ['DOMContentLoaded', 'load', 'transitionend', 'animationend']) {
+    window.addEventListener(type, schedule, true);
+  }
+
+  window.__uiEvents = {
+    next(match) {
+      const logged = log.find(event => matches(event, match));
+      if (logged) return {event: logged};
+      return new Promise(resolve => {
+        const waiter = {match, settle: result => { clearTimeout(waiter.timer); waiters.delete(waiter); resolve(result); }};
+        waiter.timer = setTimeout(() => waiter.settle({timedOut: true}), match.timeout);
+        waiters.add(waiter);
+      });
+    },
+  };
+  schedule();
+})()
+"""
+
+NEXT_SCRIPT = "match => window.__uiEvents ? window.__uiEvents.next(match) : {missing: true}"
+
+
+class UiEventTimeoutError(PlaywrightTimeoutError):
+    """No matching UI event in time; a Playwright timeout, so retries treat it as one"""
+
+    def __init__(self, description: str, timeout: float, recent: List[Dict]):
+        seen = "; ".join(f"{event['kind']} {event['action']} '{event['text']}'" for event in recent) or "none"
+        super().__init__(f"No {description} within {timeout:.0f}ms (recent UI events: {seen})")
+        self.recent = recent
+
+
+class UiEventLog:
+    """UI events of one context, ordered by when they happened in the page"""
+
+    def __init__(self):
+        self.started_at = time.time() * 1000
+        self.events = []
+        # Page timestamps of self.events, kept alongside for bisect
+        self._times = []
+        self._keys = set()
+
+    def add(self, event: Dict):
+        """Record an event; an event reported both by the binding and by a wait is kept once"""
+        key = (event["doc"], event["seq"])
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        position = bisect.bisect_right(self._times, event["at"])
+        self._times.insert(position, event["at"])
+        self.events.insert(position, event)
+
+    def mark(self) -> float:
+        """A point in time to search from; take it before the action that should cause the event"""
+        # Whole milliseconds, as the page stamps events with Date.now()
+        return float(int(time.time() * 1000))
+
+    def find(self, kind: str, action: str = "shown", text: str = None, element_id: str = None,
+             since: float = None) -> List[Dict]:
+        """
+        Logged events of a kind, oldest first
+
+        Args:
+            kind: A key of Config.UI_EVENT_SELECTORS, or "validation" for native validation
+            action: shown (also matches updated, a shown element whose text changed), updated, hidden or
+                invalid; None for any
+            text: Text the event must contain
+            element_id: id of the element
+            since: Only events at or after this mark
+        """
+        match = self._get_match(kind, action, text, element_id, since)
+        return [event for event in self.events if self._matches(event, match)]
+
+    def wait_for(self, page: Page, kind: str, action: str = "shown", text: str = None, element_id: str = None,
+                 since: float = None, timeout: int = None) -> Dict:
+        """The first matching event, waiting in the page for it if none is logged yet (arguments as in find)"""
+        timeout = get_adaptive_timeouts().clamp_to_budget(timeout or config.ACTION_TIMEOUT)
+        deadline = time.time() * 1000 + timeout
+        match = self._get_match(kind, action, text, element_id, since)
+        while True:
+            found = [event for event in self.events if self._matches(event, match)]
+            if found:
+                return found[0]
+            remaining = deadline - time.time() * 1000
+            if remaining <= 0:
+                description = " ".join(part for part in (kind, action, text and f"containing '{text}'") if part)
+                raise UiEventTimeoutError(description, timeout, self.events[-5:])
+            try:
+                result = page.evaluate(NEXT_SCRIPT, dict(match, timeout=remaining))
+            except Error as e:
+                if not any(message in str(e) for message in NAVIGATION_ERRORS):
+                    raise
+                page.wait_for_load_state("domcontentloaded")
+                continue
+            if result.get("missing"):
+                # Documents loaded before the runtime was installed get it on their first wait
+                page.evaluate(RUNTIME_SCRIPT)
+            elif result.get("event"):
+                self.add(result["event"])
+
+    def get_summary(self) -> List[Dict]:
+        """The events relative to the start of the log, for the test result"""
+        return [
+            dict({key: value for key, value in event.items() if key not in ("doc", "seq", "at")},
+                 elapsed_ms=round(event["at"] - self.started_at, 1))
+            for event in self.events
+        ]
+
+    @staticmethod
+    def _get_match(kind: str, action: Optional[str], text: Optional[str], element_id: Optional[str],
+                   since: Optional[float]) -> Dict:
+        actions = None if action is None else ["shown", "updated"] if action == "shown" else [action]
+        return {"kind": kind, "actions": actions, "text": text, "id": element_id, "since": since or 0}
+
+    @staticmethod
+    def _matches(event: Dict, match: Dict) -> bool:
+        return (event["at"] >= match["since"] and event["kind"] == match["kind"]
+                and (match["actions"] is None or event["action"] in match["actions"])
+                and (match["text"] is None or match["text"] in event["text"])
+                and (match["id"] is None or event["id"] == match["id"]))
+
+
+def install(context: BrowserContext) -> UiEventLog:
+    """Stream UI events of the open and every future document of a context into its log"""
+    log = get_log(context)
+    if log is not None:
+        return log
+    log = UiEventLog()
+    context.expose_binding(EVENT_BINDING, lambda source, event: log.add(event))
+    context.add_init_script(RUNTIME_SCRIPT)
+    # The init script only reaches future documents; observe the open ones before the action that follows
+    for page in context.pages:
+        try:
+            page.evaluate(RUNTIME_SCRIPT)
+        except Error as e:
+            # A page that is navigating gets the runtime from the init script in its next document
+            if not any(message in str(e) for message in NAVIGATION_ERRORS):
+                raise
+    setattr(context, LOG_ATTRIBUTE, log)
+    return log
+
+
+def get_log(context: BrowserContext) -> Optional[UiEventLog]:
+    """The UI event log of a context, or None when the capture was never installed on it"""
+    return getattr(context, LOG_ATTRIBUTE, None)
+
+
+def get_ui_events(page: Page) -> UiEventLog:
+    """The UI event log of a page's context, installing the capture on first use"""
+    return install(page.context)
@@ -0,0 +1,317 @@
+"""
+Visual regression engine
+Compares screenshots against baselines tile by tile with NumPy:
+    1. Exact tile fingerprints are compared first; unchanged tiles are skipped
+    2. Changed tiles with a distant perceptual hash fail without a pixel diff
+    3. The remaining tiles get a pixel diff with an anti-aliasing tolerance
+Baseline tile hashes are cached in memory and in a sidecar file next to each
+baseline, so baselines are only decoded when a tile actually needs a pixel diff
+"""
+import io
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Fixed weights so fingerprints are stable across runs
+_FINGERPRINT_SEED = 0x150A2
+
+
+def decode_png(data: bytes) -> np.ndarray:
+    """Decode PNG bytes into an RGB uint8 array"""
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def load_png(path: str) -> np.ndarray:
+    """Load a PNG file into an RGB uint8 array"""
+    with open(path, "rb") as f:
+        return decode_png(f.read())
+
+
+def apply_masks(pixels: np.ndarray, masks: List[Dict]) -> np.ndarray:
+    """
+    Blank out dynamic regions
+
+    Args:
+        pixels: RGB image array
+        masks: Regions as dicts with x, y, width and height (Playwright bounding box format)
+
+    Returns:
+        A masked copy, or the original array when there is nothing to mask
+    """
+    if not masks:
+        return pixels
+    pixels = pixels.copy()
+    height, width = pixels.shape[:2]
+    for mask in masks:
+        x0 = max(int(mask["x"]), 0)
+        y0 = max(int(mask["y"]), 0)
+        x1 = min(int(np.ceil(mask["x"] + mask["width"])), width)
+        y1 = min(int(np.ceil(mask["y"] + mask["height"])), height)
+        pixels[y0:y1, x0:x1] = 0
+    return pixels
+
+
+def get_mask_key(masks: List[Dict]) -> str:
+    """Build a stable key describing a set of masks"""
+    return ";".join(
+        f"{int(m['x'])},{int(m['y'])},{int(m['width'])},{int(m['height'])}"
+        for m in sorted(masks or [], key=lambda m: (m["y"], m["x"]))
+    )
+
+
+def tile_view(pixels: np.ndarray, tile_size: int) -> np.ndarray:
+    """
+    View an image as a grid of tiles, zero padding partial edge tiles
+
+    Returns:
+        Array shaped (rows, cols, tile_size, tile_size, channels)
+    """
+    height, width, channels = pixels.shape
+    pad_h = (-height) % tile_size
+    pad_w = (-width) % tile_size
+    if pad_h or pad_w:
+        pixels = np.pad(pixels, ((0, pad_h), (0, pad_w), (0, 0)))
+    rows = pixels.shape[0] // tile_size
+    cols = pixels.shape[1] // tile_size
+    return pixels.reshape(rows, tile_size, cols, tile_size, channels).swapaxes(1, 2)
+
+
+class TileHashes:
+    """Exact fingerprints and perceptual hashes for every tile of an image"""
+
+    def __init__(self, shape: Tuple[int, ...], fingerprints: np.ndarray, phashes: np.ndarray):
+        self.shape = tuple(shape)
+        self.fingerprints = fingerprints
+        self.phashes = phashes
+
+    def save(self, path: str, tile_size: int, mask_key: str):
+        """Save hashes to a sidecar file"""
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                shape=np.array(self.shape),
+                fingerprints=self.fingerprints,
+                phashes=self.phashes,
+                tile_size=np.array(tile_size),
+                mask_key=np.array(mask_key),
+            )
+
+    @classmethod
+    def load(cls, path: str, tile_size: int, mask_key: str) -> Optional["TileHashes"]:
+        """Load hashes from a sidecar file if it was built with the same tiling and masks"""
+        try:
+            with np.load(path) as data:
+                if int(data["tile_size"]) != tile_size or str(data["mask_key"]) != mask_key:
+                    return None
+                return cls(tuple(data["shape"]), data["fingerprints"], data["phashes"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+class VisualDiffResult:
+    """Outcome of a single screenshot comparison"""
+
+    def __init__(self, name: str, baseline_path: str):
+        self.name = name
+        self.baseline_path = baseline_path
+        self.passed = True
+        self.baseline_created = False
+        self.reason = ""
+        self.tiles_total = 0
+        self.tiles_skipped = 0
+        self.failed_tiles = []
+        self.diff_path = None
+        self.duration_ms = 0.0
+
+    def fail(self, reason: str):
+        """Mark the comparison as failed"""
+        self.passed = False
+        self.reason = reason
+
+    def to_dict(self) -> Dict:
+        """Serialize the result for reports"""
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "baseline": self.baseline_path,
+            "baseline_created": self.baseline_created,
+            "reason": self.reason,
+            "tiles_total": self.tiles_total,
+            "tiles_skipped": self.tiles_skipped,
+            "failed_tiles": self.failed_tiles,
+            "diff": self.diff_path,
+            "duration_ms": round(self.duration_ms, 2),
+        }
+
+
+class VisualRegressionEngine:
+    """Tile-based screenshot comparison against stored baselines"""
+
+    def __init__(self, baseline_dir: str, diff_dir: str, tile_size: int = 64,
+                 color_tolerance: int = 16, pixel_threshold: int = 4, phash_threshold: int = 10,
+                 anti_aliasing: bool = True, update_baselines: bool = False, cache_size: int = 512):
+        if tile_size % 8:
+            raise ValueError("tile_size must be a multiple of 8")
+        self.baseline_dir = baseline_dir
+        self.diff_dir = diff_dir
+        self.tile_size = tile_size
+        self.color_tolerance = color_tolerance
+        self.pixel_threshold = pixel_threshold
+        self.phash_threshold = phash_threshold
+        self.anti_aliasing = anti_aliasing
+        self.update_baselines = update_baselines
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        weights_size = tile_size * tile_size * 3
+        self._weights = np.random.default_rng(_FINGERPRINT_SEED).integers(
+            1, 2 ** 63, size=weights_size, dtype=np.uint64
+        )
+
+    def get_baseline_path(self, name: str) -> str:
+        """Get the baseline PNG path for a screenshot name"""
+        return os.path.join(self.baseline_dir, f"{name}.png")
+
+    def compute_hashes(self, pixels: np.ndarray) -> TileHashes:
+        """Compute per-tile fingerprints and perceptual hashes, one tile row at a time"""
+        tiles = tile_view(pixels, self.tile_size)
+        rows, cols = tiles.shape[:2]
+        block = self.tile_size // 8
+        fingerprints = np.empty((rows, cols), dtype=np.uint64)
+        phashes = np.empty((rows, cols), dtype=np.uint64)
+        # Processing row by row keeps the uint64 working set to a single tile row
+        for row in range(rows):
+            flat = tiles[row].reshape(cols, -1).astype(np.uint64)
+            fingerprints[row] = (flat * self._weights).sum(axis=1)
+
+            # Average hash on an 8x8 grid; integer sums avoid float conversion
+            gray = tiles[row].sum(axis=-1, dtype=np.uint32)
+            small = gray.reshape(cols, 8, block, 8, block).sum(axis=(2, 4))
+            bits = small * 64 > small.sum(axis=(1, 2), keepdims=True)
+            phashes[row] = np.packbits(bits.reshape(cols, 64), axis=1).view(">u8").ravel()
+        return TileHashes(pixels.shape, fingerprints, phashes)
+
+    def _get_baseline_hashes(self, baseline_path: str, masks: List[Dict]) -> TileHashes:
+        mask_key = get_mask_key(masks)
+        mtime = os.path.getmtime(baseline_path)
+        cache_key = (baseline_path, mask_key)
+        cached = self._cache.get(cache_key)
+        if cached and cached[0] == mtime:
+            self._cache.move_to_end(cache_key)
+            return cached[1]
+
+        sidecar = f"{baseline_path}.tiles.npz"
+        hashes = None
+        if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= mtime:
+            hashes = TileHashes.load(sidecar, self.tile_size, mask_key)
+        if hashes is None:
+            hashes = self.compute_hashes(apply_masks(load_png(baseline_path), masks))
+            hashes.save(sidecar, self.tile_size, mask_key)
+
+        self._cache[cache_key] = (mtime, hashes)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return hashes
+
+    def _count_diff_pixels(self, baseline_tiles: np.ndarray, candidate_tiles: np.ndarray) -> np.ndarray:
+        """Count pixels per tile that differ beyond the color and anti-aliasing tolerance"""
+        baseline = baseline_tiles.astype(np.int16)
+        candidate = candidate_tiles.astype(np.int16)
+        differs = np.abs(baseline - candidate).max(axis=-1) > self.color_tolerance
+        if self.anti_aliasing and differs.any():
+            # A pixel that matches a neighbouring baseline pixel is a sub-pixel
+            # shift or anti-aliasing artifact rather than a real change
+            padded = np.pad(baseline, ((0, 0), (1, 1), (1, 1), (0, 0)), mode="edge")
+            size = self.tile_size
+            for dy in (0, 1, 2):
+                for dx in (0, 1, 2):
+                    if dy == 1 and dx == 1:
+                        continue
+                    shifted = padded[:, dy:dy + size, dx:dx + size]
+                    differs &= np.abs(shifted - candidate).max(axis=-1) > self.color_tolerance
+        return differs.sum(axis=(1, 2))
+
+    def _save_diff(self, name: str, pixels: np.ndarray, failed: np.ndarray) -> str:
+        """Save the candidate with failing tiles highlighted"""
+        os.makedirs(self.diff_dir, exist_ok=True)
+        overlay = pixels.copy()
+        size = self.tile_size
+        for row, col in zip(*np.nonzero(failed)):
+            region = overlay[row * size:(row + 1) * size, col * size:(col + 1) * size]
+            region[...] = (region * 0.5 + np.array([255, 0, 0]) * 0.5).astype(np.uint8)
+        diff_path = os.path.join(self.diff_dir, f"{name}_diff.png")
+        Image.fromarray(overlay).save(diff_path)
+        return diff_path
+
+    def compare(self, name: str, screenshot: bytes, masks: List[Dict] = None) -> VisualDiffResult:
+        """
+        Compare a screenshot against its baseline
+
+        Args:
+            name: Baseline name (may include subdirectories)
+            screenshot: PNG bytes
+            masks: Dynamic regions to ignore
+
+        Returns:
+            VisualDiffResult; a missing baseline is created and the comparison passes
+        """
+        start = time.perf_counter()
+        baseline_path = self.get_baseline_path(name)
+        result = VisualDiffResult(name, baseline_path)
+        candidate = apply_masks(decode_png(screenshot), masks)
+
+        if self.update_baselines or not os.path.exists(baseline_path):
+            os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+            with open(baseline_path, "wb") as f:
+                f.write(screenshot)
+            result.baseline_created = True
+            result.duration_ms = (time.perf_counter() - start) * 1000
+            return result
+
+        baseline_hashes = self._get_baseline_hashes(baseline_path, masks)
+        if baseline_hashes.shape != candidate.shape:
+            result.fail(f"size changed from {baseline_hashes.shape[:2]} to {candidate.shape[:2]}")
+            result.duration_ms = (time.perf_counter() - start) * 1000
+            return result
+
+        candidate_hashes = self.compute_hashes(candidate)
+        changed = candidate_hashes.fingerprints != baseline_hashes.fingerprints
+        result.tiles_total = changed.size
+        result.tiles_skipped = int(changed.size - changed.sum())
+
+        failed = np.zeros_like(changed)
+        diff_pixels = np.zeros(changed.shape, dtype=np.int64)
+        if changed.any():
+            distance = np.unpackbits(
+                (candidate_hashes.phashes ^ baseline_hashes.phashes).view(np.uint8).reshape(*changed.shape, 8),
+                axis=-1,
+            ).sum(axis=-1)
+            structural = changed & (distance > self.phash_threshold)
+            failed |= structural
+
+            needs_pixel_diff = changed & ~structural
+            if needs_pixel_diff.any():
+                baseline_tiles = tile_view(apply_masks(load_png(baseline_path), masks), self.tile_size)
+                candidate_tiles = tile_view(candidate, self.tile_size)
+                counts = self._count_diff_pixels(baseline_tiles[needs_pixel_diff], candidate_tiles[needs_pixel_diff])
+                diff_pixels[needs_pixel_diff] = counts
+                failed[needs_pixel_diff] = counts > self.pixel_threshold
+
+            for row, col in zip(*np.nonzero(failed)):
+                result.failed_tiles.append({
+                    "x": int(col * self.tile_size),
+                    "y": int(row * self.tile_size),
+                    "size": self.tile_size,
+                    "phash_distance": int(distance[row, col]),
+                    "diff_pixels": int(diff_pixels[row, col]),
+                })
+
+        if result.failed_tiles:
+            result.fail(f"{len(result.failed_tiles)} of {result.tiles_total} tiles changed")
+            result.diff_path = self._save_diff(name.replace(os.sep, "_").replace("/", "_"), candidate, failed)
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        return result
@@ -0,0 +1,133 @@
+"""
+Wait reaction-time benchmark
+Compares how late each wait notices a change: utils.helpers.wait_for_condition
+polling page.is_visible, the event-driven utils.waits (alone and inside an
+any_of), and Playwright's own wait_for_selector for reference. Each trial loads
+a page that inserts an element after a random delay and records the insertion
+time. Reaction time is the gap between insertion and the wait returning.
+Round-trips counts the evaluate/is_visible calls each wait made. Runs on a
+local page, so no app is needed
+
+Usage:
+    python -m utils.wait_benchmark [--trials 20] [--interval 0.5] [--browser chromium]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from playwright.sync_api import Page, sync_playwright
+
+from config.config import get_config
+from utils.helpers import describe, wait_for_condition
+from utils.waits import any_of, dom, wait_for
+
+config = get_config()
+
+TARGET = "#target"
+INSERT_LATER_SCRIPT = """
+delay => setTimeout(() => {
+  const el = document.createElement('div');
+  el.id = 'target';
+  el.textContent = 'ready';
+  document.body.appendChild(el);
+  window.__insertedAt = performance.timeOrigin + performance.now();
+}, delay)
+"""
+
+
+def run_trial(page: Page, wait: Callable[[Page], int], delay_ms: int) -> Dict:
+    """Insert the target after delay_ms and time how long after insertion the wait returns"""
+    page.set_content("<html><body><p>waiting</p></body></html>")
+    page.evaluate(INSERT_LATER_SCRIPT, delay_ms)
+    round_trips = wait(page)
+    returned_at = time.time() * 1000
+    inserted_at = page.evaluate("() => window.__insertedAt")
+    return {"reaction_ms": round(returned_at - inserted_at, 1), "round_trips": round_trips}
+
+
+def get_waits(interval: float) -> Dict[str, Callable[[Page], int]]:
+    """Each wait under test; a wait returns the number of round-trips it made to the browser"""
+    def polling(page: Page) -> int:
+        calls = []
+
+        def is_visible():
+            calls.append(1)
+            return page.is_visible(TARGET)
+
+        assert wait_for_condition(is_visible, timeout=10, interval=interval)
+        return len(calls)
+
+    def event(page: Page) -> int:
+        wait_for(page, dom(TARGET), timeout=10000)
+        return 2  # register, then the wait itself
+
+    def event_any_of(page: Page) -> int:
+        wait_for(page, any_of(dom("#never"), dom(TARGET, text="ready")), timeout=10000)
+        return 2
+
+    def playwright(page: Page) -> int:
+        page.wait_for_selector(TARGET, timeout=10000)
+        return 1
+
+    return {
+        f"polling ({interval}s)": polling,
+        "event": event,
+        "event any_of": event_any_of,
+        "wait_for_selector": playwright,
+    }
+
+
+def run_benchmark(browser_name: str, trials: int, interval: float, min_delay: int, max_delay: int) -> Dict:
+    """Run every wait over the same random delays"""
+    delays = [random.randint(min_delay, max_delay) for _ in range(trials)]
+    waits = get_waits(interval)
+    samples = {name: [] for name in waits}
+    with sync_playwright() as p:
+        browser = getattr(p, browser_name).launch(headless=True)
+        page = browser.new_page()
+        for delay in delays:
+            for name, wait in waits.items():
+                samples[name].append(run_trial(page, wait, delay))
+        browser.close()
+    return {
+        name: {
+            "reaction_ms": describe([trial["reaction_ms"] for trial in trials_of_wait]),
+            "round_trips": describe([trial["round_trips"] for trial in trials_of_wait]),
+        }
+        for name, trials_of_wait in samples.items()
+    }
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the reaction time of polling and event-driven waits")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5, help="Polling interval of wait_for_condition, seconds")
+    parser.add_argument("--min-delay", type=int, default=200, help="Shortest delay before the change, ms")
+    parser.add_argument("--max-delay", type=int, default=1500, help="Longest delay before the change, ms")
+    parser.add_argument("--browser", default=config.BROWSER)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    results = run_benchmark(args.browser, args.trials, args.interval, args.min_delay, args.max_delay)
+
+    os.makedirs(config.REPORT_DIR, exist_ok=True)
+    report_path = os.path.join(config.REPORT_DIR, "wait_benchmark.json")
+    with open(report_path, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "browser": args.browser, "trials": args.trials,
+                   "waits": results}, f, indent=2)
+
+    print(f"\n{'wait':<20} {'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'round-trips':>12}")
+    for name, result in results.items():
+        reaction = result["reaction_ms"]
+        print(f"{name:<20} {reaction['median']:>10.1f} {reaction['p95']:>8.1f} {reaction['max']:>8.1f} "
+              f"{result['round_trips']['median']:>12.1f}")
+    print(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
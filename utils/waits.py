@@ -0,0 +1,368 @@
+"""
+Event-driven waits
+utils.helpers.wait_for_condition polls a Python callable: every check is an IPC
+round-trip, and a change is noticed up to one interval late. These waits push
+the conditions into the page instead. A runtime installed in every document
+re-checks DOM conditions from a MutationObserver, URL conditions on history
+changes, and response conditions as each fetch/XHR completes. The wait itself
+is one evaluate that resolves the moment the condition tree settles.
+
+Conditions compose: any_of() settles with its first met branch and all_of()
+with its last, and every branch reports whether it was met, when and with what.
+A wait has an overall deadline (ACTION_TIMEOUT by default, never past the
+test's budget), and each branch can have its own. A full navigation during a
+wait re-arms it in the new document, carrying over branches already met.
+
+DOM conditions take CSS selectors (page.locator extensions like :has-text are
+not available in the page); filter by text with text=.
+
+Usage:
+    wait_for(page, any_of(dom(TOAST_MESSAGE, text="success"), response(CREATE_USER_URL, status=409)))
+
+    with EventWait(page, all_of(url("**/organizations/*"), dom(USERS_GRID))) as waiter:
+        page.click(...)
+    waiter.result.branches
+"""
+import time
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from playwright.sync_api import BrowserContext, Error, Page, TimeoutError as PlaywrightTimeoutError
+
+from config.config import get_config
+from utils.adaptive_timeouts import get_adaptive_timeouts
+from utils.response_stubs import glob_to_regex
+
+config = get_config()
+
+PROGRESS_BINDING = "__eventWaitProgress"
+INSTALLED_ATTRIBUTE = "_event_waits_installed"
+REGISTER_SCRIPT = "spec => window.__eventWaits ? (window.__eventWaits.register(spec), true) : false"
+
+# Errors from an evaluate interrupted by a navigation; the wait is re-armed in the new document
+NAVIGATION_ERRORS = ("Execution context was destroyed", "navigation", "Frame was detached")
+
+RUNTIME_SCRIPT = """
+(() => {
+  if (window.__eventWaits) return;
+  const waits = new Map();
+
+  const isVisible = el => {
+    const style = getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && el.getClientRects().length > 0;
+  };
+
+  const checkDom = leaf => {
+    let elements;
+    try {
+      elements = Array.from(document.querySelectorAll(leaf.selector));
+    } catch (e) {
+      return {met: false, detail: {error: String(e)}};
+    }
+    if (leaf.text !== null) elements = elements.filter(el => (el.textContent || '').includes(leaf.text));
+    const visible = elements.filter(isVisible);
+    const describe = el => ({text: (el.textContent || '').trim().slice(0, 200)});
+    if (leaf.state === 'attached') return elements.length ? {met: true, detail: describe(elements[0])} : null;
+    if (leaf.state === 'detached') return elements.length ? null : {met: true, detail: {}};
+    if (leaf.state === 'hidden') return visible.length ? null : {met: true, detail: {}};
+    return visible.length ? {met: true, detail: describe(visible[0])} : null;
+  };
+
+  const checkUrl = leaf => new RegExp(leaf.pattern).test(location.href) ? {met: true, detail: {url: location.href}} : null;
+
+  const evaluate = (node, states) => {
+    if (node.kind === 'any' || node.kind === 'all') {
+      const results = node.children.map(child => evaluate(child, states));
+      if (node.kind === 'any') {
+        if (results.includes(true)) return true;
+        return results.every(result => result === false) ? false : null;
+      }
+      if (results.includes(false)) return false;
+      return results.every(result => result === true) ? true : null;
+    }
+    const state = states[node.index];
+    return state ? state.met : null;
+  };
+
+  const finish = (wait, met, timedOut) => {
+    if (wait.done) return;
+    wait.timers.forEach(clearTimeout);
+    wait.done = {met, timedOut, states: wait.states};
+    if (wait.resolve) wait.resolve(wait.done);
+  };
+
+  const mark = (wait, index, state) => {
+    if (wait.done || wait.states[index]) return;
+    wait.states[index] = Object.assign({at: Date.now()}, state);
+    const report = window.""" + PROGRESS_BINDING + """;
+    if (report) report(wait.id, index, wait.states[index]).catch(() => {});
+    const outcome = evaluate(wait.tree, wait.states);
+    if (outcome !== null) finish(wait, outcome, false);
+  };
+
+  const checkAll = () => {
+    for (const wait of waits.values()) {
+      wait.leaves.forEach((leaf, index) => {
+        if (wait.done || wait.states[index]) return;
+        const state = leaf.kind === 'dom' ? checkDom(leaf) : leaf.kind === 'url' ? checkUrl(leaf) : null;
+        if (state) mark(wait, index, state);
+      });
+    }
+  };
+
+  const onResponse = (responseUrl, method, status) => {
+    for (const wait of waits.values()) {
+      wait.leaves.forEach((leaf, index) => {
+        if (leaf.kind !== 'response' || wait.done || wait.states[index]) return;
+        if (!new RegExp(leaf.pattern).test(responseUrl)) return;
+        if (leaf.method && leaf.method !== method) return;
+        if (leaf.status !== null && leaf.status !== status) return;
+        mark(wait, index, {met: true, detail: {url: responseUrl, method, status}});
+      });
+    }
+  };
+
+  new MutationObserver(checkAll).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  for (const type of ['DOMContentLoaded', 'load', 'transitionend', 'animationend', 'popstate', 'hashchange']) {
+    window.addEventListener(type, checkAll, true);
+  }
+  for (const name of ['pushState', 'replaceState']) {
+    const original = history[name];
+    history[name] = function () {
+      const result = original.apply(this, arguments);
+      checkAll();
+      return result;
+    };
+  }
+
+  const originalFetch = window.fetch;
+  window.fetch = async function (input, init) {
+    const response = await originalFetch.apply(this, arguments);
+    const method = (init && init.method) || (input instanceof Request ? input.method : 'GET');
+    onResponse(response.url, method.toUpperCase(), response.status);
+    return response;
+  };
+  const originalOpen = XMLHttpRequest.prototype.open;
+  XMLHttpRequest.prototype.open = function (method) {
+    this.__eventWaitMethod = String(method).toUpperCase();
+    return originalOpen.apply(this, arguments);
+  };
+  const originalSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    this.addEventListener('loadend', () => onResponse(this.responseURL, this.__eventWaitMethod, this.status));
+    return originalSend.apply(this, arguments);
+  };
+
+  window.__eventWaits = {
+    register(spec) {
+      const wait = {id: spec.id, tree: spec.tree, leaves: spec.leaves, states: spec.states, timers: [], done: null};
+      waits.set(spec.id, wait);
+      wait.timers.push(setTimeout(() => finish(wait, false, true), spec.remaining));
+      spec.leaves.forEach((leaf, index) => {
+        if (leaf.remaining !== null && !wait.states[index]) {
+          wait.timers.push(setTimeout(() => mark(wait, index, {met: false, detail: {timeout: true}}), leaf.remaining));
+        }
+      });
+      const outcome = evaluate(wait.tree, wait.states);
+      if (outcome !== null) finish(wait, outcome, false);
+      checkAll();
+    },
+    wait(id) {
+      const wait = waits.get(id);
+      if (!wait) return {missing: true};
+      const settled = wait.done ? Promise.resolve(wait.done) : new Promise(resolve => { wait.resolve = resolve; });
+      return settled.then(done => { waits.delete(id); return done; });
+    },
+  };
+  checkAll();
+})()
+"""
+
+_active_waits = {}
+
+
+class Condition:
+    """A single condition checked inside the page"""
+
+    def __init__(self, kind: str, name: str, timeout: int = None, **spec):
+        self.kind = kind
+        self.name = name
+        self.timeout = timeout
+        self.spec = spec
+
+    def get_leaves(self) -> List["Condition"]:
+        return [self]
+
+    def to_tree(self, leaves: List["Condition"]) -> Dict:
+        return {"kind": self.kind, "index": leaves.index(self)}
+
+
+class Composite:
+    """any_of / all_of over conditions and other composites"""
+
+    def __init__(self, kind: str, children: List):
+        self.kind = kind
+        self.children = children
+
+    def get_leaves(self) -> List[Condition]:
+        return [leaf for child in self.children for leaf in child.get_leaves()]
+
+    def to_tree(self, leaves: List[Condition]) -> Dict:
+        return {"kind": self.kind, "children": [child.to_tree(leaves) for child in self.children]}
+
+
+def dom(selector: str, state: str = "visible", text: str = None, name: str = None, timeout: int = None) -> Condition:
+    """An element matching a CSS selector (and containing text) reaches a state: visible, hidden, attached or detached"""
+    return Condition("dom", name or f"{state}:{selector}", timeout, selector=selector, state=state, text=text)
+
+
+def url(pattern: str, name: str = None, timeout: int = None) -> Condition:
+    """The page URL matches a glob"""
+    return Condition("url", name or f"url:{pattern}", timeout, pattern=glob_to_regex(pattern).pattern)
+
+
+def response(pattern: str, status: int = None, method: str = None, name: str = None, timeout: int = None) -> Condition:
+    """A fetch/XHR response whose URL matches a glob (and method and status) completes"""
+    method = method.upper() if method else None
+    label = " ".join(str(part) for part in (method, pattern, status) if part is not None)
+    return Condition("response", name or f"response:{label}", timeout, pattern=glob_to_regex(pattern).pattern,
+                     method=method, status=status)
+
+
+def any_of(*conditions) -> Composite:
+    """Met as soon as one branch is met; failed once every branch has failed"""
+    return Composite("any", list(conditions))
+
+
+def all_of(*conditions) -> Composite:
+    """Met once every branch is met; failed as soon as one branch fails"""
+    return Composite("all", list(conditions))
+
+
+class WaitResult:
+    """Outcome of a wait and of each of its branches"""
+
+    def __init__(self, met: bool, timed_out: bool, elapsed_ms: float, branches: Dict[str, Dict]):
+        self.met = met
+        self.timed_out = timed_out
+        self.elapsed_ms = elapsed_ms
+        self.branches = branches
+
+    @property
+    def winner(self) -> Optional[str]:
+        """The first branch to be met"""
+        met = [(branch["elapsed_ms"], name) for name, branch in self.branches.items() if branch["met"]]
+        return min(met)[1] if met else None
+
+    def to_dict(self) -> Dict:
+        return {"met": self.met, "timed_out": self.timed_out, "elapsed_ms": self.elapsed_ms,
+                "winner": self.winner, "branches": self.branches}
+
+
+class WaitTimeoutError(PlaywrightTimeoutError):
+    """A wait missed its deadline or its condition failed; a Playwright timeout, so retries treat it as one"""
+
+    def __init__(self, result: WaitResult):
+        pending = [name for name, branch in result.branches.items() if branch["met"] is None]
+        failed = [name for name, branch in result.branches.items() if branch["met"] is False]
+        super().__init__(f"Wait not met after {result.elapsed_ms:.0f}ms (pending: {pending}, failed: {failed})")
+        self.result = result
+
+
+def _on_progress(source, wait_id: str, index: int, state: Dict):
+    # Branches met so far survive a navigation that destroys the page's copy
+    wait = _active_waits.get(wait_id)
+    if wait is not None:
+        wait.states[index] = state
+
+
+def install(context: BrowserContext):
+    """Install the wait runtime in every future document of a context"""
+    if getattr(context, INSTALLED_ATTRIBUTE, False):
+        return
+    context.expose_binding(PROGRESS_BINDING, _on_progress)
+    context.add_init_script(RUNTIME_SCRIPT)
+    setattr(context, INSTALLED_ATTRIBUTE, True)
+
+
+class EventWait:
+    """A condition pushed into a page; arm it before an action and wait after it"""
+
+    def __init__(self, page: Page, condition, timeout: int = None, raise_on_timeout: bool = True):
+        self.page = page
+        self.leaves = condition.get_leaves()
+        self.tree = condition.to_tree(self.leaves)
+        self.timeout = get_adaptive_timeouts().clamp_to_budget(timeout or config.ACTION_TIMEOUT)
+        self.raise_on_timeout = raise_on_timeout
+        self.id = uuid4().hex[:12]
+        self.states = [None] * len(self.leaves)
+        self.started_at = None
+        self.result = None
+
+    def _register(self):
+        elapsed = time.time() * 1000 - self.started_at
+        leaves = [dict(leaf.spec, kind=leaf.kind,
+                       remaining=None if leaf.timeout is None else max(leaf.timeout - elapsed, 0))
+                  for leaf in self.leaves]
+        spec = {"id": self.id, "tree": self.tree, "leaves": leaves, "states": self.states,
+                "remaining": max(self.timeout - elapsed, 0)}
+        # Documents loaded before the runtime was installed get it on their first wait
+        if not self.page.evaluate(REGISTER_SCRIPT, spec):
+            self.page.evaluate(RUNTIME_SCRIPT)
+            self.page.evaluate(REGISTER_SCRIPT, spec)
+
+    def arm(self) -> "EventWait":
+        """Start watching; conditions already true are met immediately"""
+        install(self.page.context)
+        _active_waits[self.id] = self
+        self.started_at = time.time() * 1000
+        self._register()
+        return self
+
+    def wait(self) -> WaitResult:
+        """Block until the condition settles or the deadline passes"""
+        if self.started_at is None:
+            self.arm()
+        try:
+            while True:
+                try:
+                    outcome = self.page.evaluate("id => window.__eventWaits.wait(id)", self.id)
+                except Error as e:
+                    if not any(message in str(e) for message in NAVIGATION_ERRORS):
+                        raise
+                    outcome = {"missing": True}
+                if not outcome.get("missing"):
+                    break
+                # A new document has the runtime but not this wait
+                self.page.wait_for_load_state("domcontentloaded")
+                self._register()
+        finally:
+            _active_waits.pop(self.id, None)
+        states = [state or carried for state, carried in zip(outcome["states"], self.states)]
+        branches = {}
+        for leaf, state in zip(self.leaves, states):
+            branches[leaf.name] = {
+                "met": None if state is None else state["met"],
+                "elapsed_ms": None if state is None else round(max(state["at"] - self.started_at, 0), 1),
+                "detail": None if state is None else state.get("detail"),
+            }
+        self.result = WaitResult(bool(outcome["met"]), bool(outcome["timedOut"]),
+                                 round(time.time() * 1000 - self.started_at, 1), branches)
+        if not self.result.met and self.raise_on_timeout:
+            raise WaitTimeoutError(self.result)
+        return self.result
+
+    def __enter__(self) -> "EventWait":
+        return self.arm()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.wait()
+        else:
+            _active_waits.pop(self.id, None)
+        return False
+
+
+def wait_for(page: Page, condition, timeout: int = None, raise_on_timeout: bool = True) -> WaitResult:
+    """Wait for a condition that may already be true"""
+    return EventWait(page, condition, timeout, raise_on_timeout).wait()
@@ -0,0 +1,266 @@
+"""
+Watch mode
+Runs pytest in one long-lived process and reruns it whenever a file under the
+watched directories (pages/, tests/ and config/ by default) changes. Changed
+modules and every project module importing them are unloaded so the next run
+imports them fresh, and only the test files depending on a change are rerun
+(all tests when conftest.py depends on it). The Playwright instance, the
+browsers and the login cache (utils.auth_cache) stay alive between runs; a
+config change relaunches the browsers and forgets the logins, since launch
+options or the base URL may have changed
+
+Usage:
+    python -m utils.watch [--paths pages tests config] [--interval 0.5] [-- -m smoke -x]
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Set
+from uuid import uuid4
+
+import pytest
+from playwright.sync_api import Playwright, sync_playwright
+
+from utils.auth_cache import invalidate_auth_state
+from utils.browser_memory import BrowserManager
+from utils.helpers import split_passthrough_args
+from utils.run_context import RUN_ID_ENV
+
+DEFAULT_WATCH_PATHS = ["pages", "tests", "config"]
+SKIP_DIRS = {".git", ".venv", "venv", "env", "__pycache__", "node_modules"}
+# Modules holding state that must survive reloads; none of them imports a watched module
+KEEP_ALIVE_MODULES = {"utils.watch", "utils.auth_cache"}
+
+_session = None
+
+
+def get_watch_session() -> Optional["WatchSession"]:
+    """Get the running watch session, or None outside watch mode"""
+    return _session
+
+
+def get_module_name(path: str, root: str) -> str:
+    """Get the dotted module name of a project file"""
+    relative = os.path.splitext(os.path.relpath(path, root))[0]
+    parts = relative.split(os.sep)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def find_python_files(root: str, paths: List[str] = None) -> List[str]:
+    """Find the .py files under the given directories (the whole project by default)"""
+    files = []
+    for top in paths or [root]:
+        top = os.path.join(root, top)
+        if os.path.isfile(top):
+            files.append(top)
+            continue
+        for directory, dirnames, filenames in os.walk(top):
+            dirnames[:] = [name for name in dirnames if name not in SKIP_DIRS]
+            files.extend(os.path.join(directory, name) for name in filenames if name.endswith(".py"))
+    return files
+
+
+class ImportGraph:
+    """Which project modules import which, parsed from the source files"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.paths = {get_module_name(path, root): path for path in find_python_files(root)}
+        self.imports = {name: self._parse_imports(name, path) for name, path in self.paths.items()}
+
+    def _resolve(self, name: str) -> Set[str]:
+        # Importing a.b.c also runs a/__init__ and a/b/__init__
+        parts = name.split(".")
+        return {".".join(parts[:i]) for i in range(1, len(parts) + 1)} & set(self.paths)
+
+    def _parse_imports(self, module_name: str, path: str) -> Set[str]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            return set()
+        is_package = os.path.basename(path) == "__init__.py"
+        imported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imported |= self._resolve(alias.name)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    package = module_name.split(".")
+                    if not is_package:
+                        package = package[:-1]
+                    package = package[:len(package) - node.level + 1]
+                    base = ".".join(package + ([base] if base else []))
+                imported |= self._resolve(base)
+                # "from pkg import module" imports the submodule
+                for alias in node.names:
+                    imported |= self._resolve(f"{base}.{alias.name}" if base else alias.name)
+            elif isinstance(node, ast.Assign) and any(
+                    isinstance(target, ast.Name) and target.id == "pytest_plugins" for target in node.targets):
+                # Plugins listed in a conftest are imported by pytest
+                for element in getattr(node.value, "elts", []):
+                    if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                        imported |= self._resolve(element.value)
+        imported.discard(module_name)
+        return imported
+
+    def get_dependents(self, modules: Set[str]) -> Set[str]:
+        """Get the given modules and every project module importing them, directly or not"""
+        importers = {}
+        for name, imported in self.imports.items():
+            for dependency in imported:
+                importers.setdefault(dependency, set()).add(name)
+        found = set(modules)
+        pending = list(modules)
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in found:
+                    found.add(importer)
+                    pending.append(importer)
+        return found
+
+    def is_test_module(self, name: str) -> bool:
+        """Whether a module is a test file pytest collects"""
+        path = self.paths.get(name)
+        return path is not None and os.path.basename(path).startswith("test_")
+
+
+class WatchSession:
+    """Playwright, browsers and logins kept alive between watch iterations"""
+
+    def __init__(self):
+        self._playwright = None
+        self.browser_managers = {}
+
+    @property
+    def playwright(self) -> Playwright:
+        """The Playwright instance, started on first use"""
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        return self._playwright
+
+    def get_browser_manager(self, browser_engine: str, factory: Callable[[], BrowserManager]) -> BrowserManager:
+        """Get the engine's browser manager, created by the first run that needs it"""
+        if browser_engine not in self.browser_managers:
+            self.browser_managers[browser_engine] = factory()
+        return self.browser_managers[browser_engine]
+
+    def reset(self):
+        """Close the browsers and forget cached logins"""
+        for manager in self.browser_managers.values():
+            manager.close()
+        self.browser_managers = {}
+        invalidate_auth_state()
+
+    def close(self):
+        """Close the browsers and stop Playwright"""
+        self.reset()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+def snapshot(root: str, paths: List[str]) -> Dict[str, float]:
+    """Modification times of the watched .py files"""
+    mtimes = {}
+    for path in find_python_files(root, paths):
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            continue
+    return mtimes
+
+
+def get_changed_files(before: Dict[str, float], after: Dict[str, float]) -> List[str]:
+    """Files added, modified or removed between two snapshots"""
+    return sorted(path for path in set(before) | set(after) if before.get(path) != after.get(path))
+
+
+def unload_modules(names: Set[str]) -> List[str]:
+    """Remove modules from sys.modules so the next pytest run imports them fresh"""
+    return [name for name in sorted(names) if name not in KEEP_ALIVE_MODULES and sys.modules.pop(name, None)]
+
+
+def run_pytest(pytest_args: List[str], targets: List[str], iteration: int) -> int:
+    """Run pytest in this process, as its own result-stream run"""
+    os.environ[RUN_ID_ENV] = f"watch-{iteration}-{uuid4().hex[:6]}"
+    return int(pytest.main([*pytest_args, *targets]))
+
+
+def watch(root: str, paths: List[str], pytest_args: List[str], interval: float):
+    """Run the tests, then rerun the affected ones on every change until interrupted"""
+    global _session
+    _session = WatchSession()
+    # Paths given on the command line limit the first run; reruns pick their own test files
+    option_args = [arg for arg in pytest_args if not os.path.exists(arg.split("::")[0])]
+    watched = ", ".join(paths)
+    iteration = 1
+    try:
+        run_pytest(pytest_args, [], iteration)
+        before = snapshot(root, paths)
+        while True:
+            print(f"\nWatching {watched} for changes (Ctrl+C to stop)")
+            changed = []
+            while not changed:
+                time.sleep(interval)
+                after = snapshot(root, paths)
+                changed = get_changed_files(before, after)
+            # Let editors finish saving related files before reloading
+            time.sleep(interval)
+            after = snapshot(root, paths)
+            changed = get_changed_files(before, after)
+            before = after
+
+            graph = ImportGraph(root)
+            changed_modules = {get_module_name(path, root) for path in changed}
+            stale = graph.get_dependents(changed_modules)
+            unload_modules(stale)
+            if any(name == "config" or name.startswith("config.") for name in changed_modules):
+                print("Config changed: relaunching browsers and logging in again")
+                _session.reset()
+
+            iteration += 1
+            print(f"Changed: {', '.join(os.path.relpath(path, root) for path in changed)}")
+            if "conftest" in stale:
+                print("conftest.py is affected, rerunning all tests")
+                run_pytest(pytest_args, [], iteration)
+                continue
+            targets = [
+                os.path.relpath(graph.paths[name], root) for name in sorted(stale)
+                if graph.is_test_module(name) and os.path.exists(graph.paths[name])
+            ]
+            if not targets:
+                print("No tests depend on the change")
+                continue
+            print(f"Rerunning {len(targets)} affected test file(s)")
+            run_pytest(option_args, targets, iteration)
+    except KeyboardInterrupt:
+        print("\nStopping watch mode")
+    finally:
+        _session.close()
+        _session = None
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Rerun affected tests on change, keeping browsers and logins alive")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_WATCH_PATHS, help="Directories to watch")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between checks for changes")
+    # Everything after "--" is passed to pytest
+    own_args, pytest_args = split_passthrough_args(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(own_args)
+    # Logins are what watch mode keeps alive; set before config is first imported
+    os.environ.setdefault("AUTH_CACHE", "true")
+    watch(os.getcwd(), args.paths, pytest_args, args.interval)
+
+
+if __name__ == "__main__":
+    # Run from the importable module, so conftest.py sees the same watch session
+    from utils.watch import main as watch_main
+    watch_main()